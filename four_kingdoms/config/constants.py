@@ -1,3 +1,5 @@
+import os
+
 import pygame
 
 pygame.font.init()
@@ -103,9 +105,41 @@ MODE_LABELS = {
 AI_DIFFICULTY_EASY = 'easy'
 AI_DIFFICULTY_NORMAL = 'normal'
 AI_DIFFICULTY_HARD = 'hard'
+AI_DIFFICULTY_MCTS = 'mcts'
 AI_DIFFICULTY_DEFAULT = AI_DIFFICULTY_NORMAL
 AI_DIFFICULTY_LABELS = {
     AI_DIFFICULTY_EASY: '简单',
     AI_DIFFICULTY_NORMAL: '普通',
     AI_DIFFICULTY_HARD: '困难',
+    AI_DIFFICULTY_MCTS: '蒙特卡洛',
+}
+
+# AI 根节点并行搜索的工作进程数，0 表示关闭（单进程串行搜索）
+AI_PARALLEL_WORKERS = 0
+
+# 开局库：前若干轮（每回合 3 步）按本方象限局面直接查表，跳过搜索
+OPENING_BOOK_ROUNDS = 5
+OPENING_BOOK_MAP_SEEDS = 16  # 经典地图：各关卡编号 0..N-1 的固定种子地图，开局库覆盖这些地图
+OPENING_BOOK_BUILD_BUDGET_MS = 600  # 离线生成时每步的搜索时间预算（毫秒）
+OPENING_BOOK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'opening_book.npz')
+
+# AI 预算标定：测量本机批量打分的耗时，结合各难度的每步目标耗时推导思考时间、搜索宽度与深度；
+# 测量结果按硬件指纹保存在用户目录，硬件或运行环境变化时在后台重新标定
+AI_BUDGET_PATH = os.path.join(os.path.expanduser('~'), '.four_kingdoms', 'ai_budget.json')
+AI_CALIBRATION_DURATION_MS = 200  # 标定测量时长（毫秒）
+
+# AI 走子调度：每步从上一步执行起按目标耗时执行，思考只能用到执行时刻之前，剩余时间作为展示间隔
+AI_TARGET_MOVE_LATENCY_MS = {  # 每步目标耗时（思考 + 行动间隔，毫秒）
+    AI_DIFFICULTY_EASY: 400,
+    AI_DIFFICULTY_NORMAL: 260,
+    AI_DIFFICULTY_HARD: 280,
+    AI_DIFFICULTY_MCTS: 300,
 }
+AI_DEADLINE_MARGIN_MS = 25  # 思考截止时间相对执行时刻的提前量，留给计划收尾与逐帧轮询
+AI_MIN_THINK_BUDGET_MS = 20  # 执行时刻已近或已过时，仍给思考留出的最少时间
+
+# AI 决策追踪（默认关闭）：启用后每次决策记录候选走法的分项得分、展开节点数与耗时，
+# 保存在固定容量的环形缓冲区中，可导出为 JSONL 供离线分析
+AI_TRACE_PATH = os.path.join(os.path.expanduser('~'), '.four_kingdoms', 'ai_trace.jsonl')
+AI_TRACE_CAPACITY = 512  # 环形缓冲区保留的最近决策条数
+AI_TRACE_TOP_N = 5  # 每次决策记录的候选走法数
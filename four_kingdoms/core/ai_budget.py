@@ -0,0 +1,188 @@
+import json
+import math
+import os
+import platform
+import time
+
+import numpy as np
+
+from ..config.constants import (
+    AI_BUDGET_PATH,
+    AI_CALIBRATION_DURATION_MS,
+    AI_DEADLINE_MARGIN_MS,
+    AI_DIFFICULTY_HARD,
+    AI_DIFFICULTY_MCTS,
+    AI_DIFFICULTY_NORMAL,
+    AI_TARGET_MOVE_LATENCY_MS,
+    BOARD_SIZE,
+)
+from .ai_logic import (
+    HARD_ENEMY_BEAM_WIDTH,
+    HARD_NODE_BEAM_WIDTH,
+    HARD_ROOT_BEAM_WIDTH,
+    HARD_SEARCH_MAX_DEPTH,
+    MCTS_ROLLOUT_BUDGET,
+    NORMAL_BEAM_WIDTH,
+)
+
+
+AI_BUDGET_VERSION = 3  # 推导规则变化时递增，旧的标定结果随之作废
+AI_REFERENCE_BATCH_MS = 0.52  # 参考机在标定局面上一次批量排序的耗时（毫秒），尚未标定时按此推导
+AI_CALIBRATION_GARRISON_HP = 3  # 标定局面：各首都周围 3x3 格都驻有此血量的士兵
+AI_CALIBRATION_STEPS = 6  # 标定局面的剩余行动点
+# 各难度的耗时模型（以一次批量排序为单位）
+AI_NORMAL_THINK_SHARE = 0.06  # 普通难度只用每步思考时间的这一比例，保持轻快，其余留作展示间隔
+AI_NORMAL_CANDIDATE_COST = 1.7  # 普通难度每个根候选的耗时（走子 + 后续估计 + 分摊的整回合规划）
+AI_SEARCH_NODE_COST = 2.0  # 困难难度每个搜索节点的耗时（排序之外还有走子/撤销、置换表与走法排序）
+AI_HARD_REFERENCE_NODES = 240  # 困难难度默认宽度与深度所针对的每步节点数
+AI_MAX_SPEED_LEVEL = 2  # 按可用节点数相对默认值的 2 的整数次幂分档，最多放大/缩小到 4 倍
+AI_MCTS_ROLLOUT_COST = 1.5  # 蒙特卡洛每次模拟的耗时
+
+
+def hardware_fingerprint():
+    """标定结果对应的硬件与运行环境，任一项变化都需重新标定"""
+    return {
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'system': platform.system(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+    }
+
+
+def build_reference_position(game):
+    """标定局面：当前地图上各首都周围 3x3 格全部驻兵，走法数与地图关系不大，测量结果稳定"""
+    board_state = game.board.copy()
+    for player, (x, y) in game.capitals.items():
+        for i in range(max(0, x - 1), min(BOARD_SIZE, x + 2)):
+            for j in range(max(0, y - 1), min(BOARD_SIZE, y + 2)):
+                board_state[i, j, 0] = player
+                board_state[i, j, 1] = AI_CALIBRATION_GARRISON_HP
+    return board_state, np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int), AI_CALIBRATION_STEPS
+
+
+def measure_batch_ms(game, duration_ms=AI_CALIBRATION_DURATION_MS):
+    """在标定局面上轮流为各玩家做批量打分排序（即搜索每个节点的主要开销），返回每次的耗时（毫秒）。
+
+    取各轮中最快一轮的平均值，排除其他进程与线程造成的抖动。
+    在棋盘副本上进行，不加噪声、不消耗随机数，不影响对局的可复现性。
+    """
+    board_state, move_count_state, steps_left = build_reference_position(game)
+
+    def run_pass():
+        for player in game.players:
+            game._rank_actions_for_player(
+                player, board_state, move_count_state, steps_left, limit=HARD_NODE_BEAM_WIDTH, add_noise=False
+            )
+
+    # 先跑一遍预热缓存，再计时
+    run_pass()
+    fastest = math.inf
+    deadline = time.perf_counter() + duration_ms / 1000.0
+    while True:
+        start = time.perf_counter()
+        run_pass()
+        now = time.perf_counter()
+        fastest = min(fastest, now - start)
+        if now >= deadline:
+            break
+    return fastest * 1000.0 / len(game.players)
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def _speed_level(ratio):
+    return _clamp(round(math.log2(max(ratio, 1e-6))), -AI_MAX_SPEED_LEVEL, AI_MAX_SPEED_LEVEL)
+
+
+def derive_ai_budget(batch_ms):
+    """由批量排序耗时与各难度的每步目标耗时推导各难度设置 {难度: {属性名: 值}}（属性名即 AIMixin 上的同名属性）。
+
+    每步思考时间为目标耗时减去截止提前量，困难与蒙特卡洛难度用满；再按各难度的耗时模型换算为
+    普通难度的根候选数、困难难度的搜索宽度与迭代加深上限、蒙特卡洛的模拟次数上限。
+    宽度与深度都按 2 的整数次幂分档缩放，测量抖动不会让同一台机器的设置来回变化。
+    """
+    budget = {}
+    for difficulty, latency_ms in AI_TARGET_MOVE_LATENCY_MS.items():
+        think_ms = latency_ms - AI_DEADLINE_MARGIN_MS
+        settings = {
+            'ai_search_budget_ms': think_ms,
+            'ai_mcts_budget_ms': think_ms,
+            'ai_normal_beam': NORMAL_BEAM_WIDTH,
+            'ai_hard_root_beam': HARD_ROOT_BEAM_WIDTH,
+            'ai_hard_node_beam': HARD_NODE_BEAM_WIDTH,
+            'ai_hard_enemy_beam': HARD_ENEMY_BEAM_WIDTH,
+            'ai_search_max_depth': HARD_SEARCH_MAX_DEPTH,
+            'ai_mcts_rollouts': MCTS_ROLLOUT_BUDGET,
+        }
+        if difficulty == AI_DIFFICULTY_NORMAL:
+            candidates = think_ms * AI_NORMAL_THINK_SHARE / (batch_ms * AI_NORMAL_CANDIDATE_COST)
+            scale = 2.0 ** _speed_level(candidates / NORMAL_BEAM_WIDTH)
+            settings['ai_normal_beam'] = _clamp(round(NORMAL_BEAM_WIDTH * scale), 4, 32)
+        elif difficulty == AI_DIFFICULTY_HARD:
+            nodes = think_ms / (batch_ms * AI_SEARCH_NODE_COST)
+            level = _speed_level(nodes / AI_HARD_REFERENCE_NODES)
+            scale = 2.0 ** level
+            # 代价随候选宽度按层相乘增长，宽度只按开方缩放，其余交给迭代加深深度
+            settings['ai_hard_root_beam'] = _clamp(round(HARD_ROOT_BEAM_WIDTH * math.sqrt(scale)), 4, 16)
+            settings['ai_hard_node_beam'] = _clamp(round(HARD_NODE_BEAM_WIDTH * math.sqrt(scale)), 3, 12)
+            settings['ai_hard_enemy_beam'] = _clamp(round(HARD_ENEMY_BEAM_WIDTH * scale ** 0.25), 2, 5)
+            settings['ai_search_max_depth'] = _clamp(HARD_SEARCH_MAX_DEPTH + level, 4, 8)
+        elif difficulty == AI_DIFFICULTY_MCTS:
+            rollouts = think_ms / (batch_ms * AI_MCTS_ROLLOUT_COST)
+            settings['ai_mcts_rollouts'] = _clamp(round(rollouts), 100, 2000)
+        budget[difficulty] = settings
+    return budget
+
+
+def load_ai_budget(path=None):
+    """读取保存的测量结果并推导各难度设置（目标耗时调整后无需重新测量）；
+    文件缺失、损坏、版本不符或硬件指纹变化时返回 None。path 缺省为调用时的 AI_BUDGET_PATH"""
+    path = AI_BUDGET_PATH if path is None else path
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            record = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(record, dict):
+        return None
+    if record.get('version') != AI_BUDGET_VERSION or record.get('fingerprint') != hardware_fingerprint():
+        return None
+    batch_ms = record.get('batch_ms')
+    if not isinstance(batch_ms, (int, float)) or batch_ms <= 0:
+        return None
+    return derive_ai_budget(batch_ms)
+
+
+def save_ai_budget(batch_ms, path=None):
+    """保存测量结果；用户目录不可写时静默放弃（下次启动重新标定）"""
+    path = AI_BUDGET_PATH if path is None else path
+    record = {
+        'version': AI_BUDGET_VERSION,
+        'fingerprint': hardware_fingerprint(),
+        'batch_ms': round(batch_ms, 4),
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(record, handle, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
+
+
+def default_ai_budget():
+    """尚未标定时使用的设置：按参考机的批量排序耗时推导"""
+    return derive_ai_budget(AI_REFERENCE_BATCH_MS)
+
+
+def calibrate_ai_budget(game, path=None):
+    """在标定局面上测量本机的批量排序耗时，保存并返回推导出的各难度设置。
+
+    测量约需 AI_CALIBRATION_DURATION_MS，对局中放到 AI 决策线程上执行（见 Game.start_ai_calibration）。
+    """
+    batch_ms = measure_batch_ms(game)
+    save_ai_budget(batch_ms, path)
+    return derive_ai_budget(batch_ms)
@@ -1,19 +1,55 @@
+import logging
+import math
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import numpy as np
 import pygame
 
 from ..config.constants import (
+    AI_DEADLINE_MARGIN_MS,
     AI_DIFFICULTY_EASY,
     AI_DIFFICULTY_HARD,
     AI_DIFFICULTY_LABELS,
+    AI_DIFFICULTY_MCTS,
     AI_DIFFICULTY_NORMAL,
+    AI_MIN_THINK_BUDGET_MS,
+    AI_PARALLEL_WORKERS,
+    AI_TARGET_MOVE_LATENCY_MS,
+    AI_TRACE_CAPACITY,
+    AI_TRACE_PATH,
+    AI_TRACE_TOP_N,
     BOARD_SIZE,
     CITY_CAPITAL,
     CITY_MAJOR,
     CITY_SMALL,
+    OPENING_BOOK_ROUNDS,
     RESOURCE_GOLD_MINE,
 )
+from .decision_trace import DecisionTracer
+from .endgame import ENDGAME_MIN_PLIES, ENDGAME_UNIT_LIMIT, ENDGAME_WIN, END_TURN, EndgameSolver, count_live_units
+from .evaluation import EVAL_SCALE, BoardEvaluator
+from .influence_map import InfluenceGraph, InfluenceMap, nearest_distance_field, strategic_distance_fields
+from .mcts import MCTSNode
+from .opening_book import canonical_flips, get_opening_book, opening_position_key, to_canonical
+from .parallel_search import ParallelRootSearch, make_search_position
+from .threat_field import PLAYER_SLOTS, ThreatField
+from .threat_space import ThreatSearchInconclusive, ThreatSpaceSearch, capital_reach_fields
+from .turn_planner import TURN_PLAN_BRANCHES, TURN_PLAN_UNITS, MoveChain, solve_turn_knapsack
+from .transposition import (
+    BOUND_EXACT,
+    BOUND_LOWER,
+    BOUND_UPPER,
+    ZOBRIST_KEYS,
+    TranspositionTable,
+)
+from .zone_planner import build_target_values, build_zone_grid, build_zone_plan
+
+
+logger = logging.getLogger(__name__)
 
 
 # ========== AI 评分常量 ==========
@@ -66,22 +102,261 @@ SCORE_THREAT_PER_HP_DIFF = 8  # 每点血量差扣分
 SCORE_THREAT_LOW_PER_DIFF = 4  # 低威胁每点差扣分
 SCORE_THREAT_SURVIVOR_FACTOR = 0.6  # 幸存者血量系数
 
+# 兵力影响场：驻军血量沿走法图传播，每点行动点消耗衰减一次
+INFLUENCE_DECAY = 0.5  # 每点行动点消耗的衰减系数
+INFLUENCE_RADIUS = 3  # 传播步数（约一到两回合的机动范围）
+SCORE_EXPOSURE_PER_HP = 2  # 停在敌方影响占优的格子，每点影响差扣分
+
 # 行动点效率
 SCORE_ACTION_POINT_EFFICIENCY = 9  # 每点额外行动点消耗扣分
 
 # 随机噪声
 NOISE_SCALE = 0.2  # 简单/普通难度随机噪声范围
 
+# 打分分项（按累加顺序），决策追踪按此记录各候选的得分构成
+SCORE_TERMS = (
+    'base',  # 扩张/进攻基础收益
+    'mine',  # 金矿价值
+    'capture',  # 城市/首都占领
+    'capital_distance',  # 接近敌方首都
+    'exposure',  # 停在敌方影响占优处扣分
+    'strategic',  # 接近战略目标
+    'chain',  # 连击潜力
+    'capital_guard',  # 离开/回防己方首都
+    'mine_guard',  # 回防己方金矿
+    'threat',  # 敌方威胁扣分
+    'efficiency',  # 行动点效率扣分
+)
+
+
+# 缓存上限
+STRATEGIC_DISTANCE_CACHE_LIMIT = 4096  # 战略目标距离图缓存条目上限
+UNIT_INFLUENCE_CACHE_LIMIT = 1024  # 兵力影响场缓存条目上限
+TRANSPOSITION_TABLE_SIZE = 1 << 16  # 困难模式置换表槽位数
+
+# 困难模式迭代加深
+HARD_SEARCH_TIME_BUDGET_MS = 120  # 每步思考时间预算（毫秒）
+HARD_SEARCH_MAX_DEPTH = 6  # 迭代加深最大层数（己方/敌方各算一层）
+# 以下宽度与深度为参考机上的取值，实际使用的值由 ai_budget 按本机性能标定
+NORMAL_BEAM_WIDTH = 16  # 普通难度根节点候选数
+HARD_ROOT_BEAM_WIDTH = 10  # 困难难度根节点候选数
+HARD_NODE_BEAM_WIDTH = 8  # 困难难度搜索中己方节点候选数
+HARD_ENEMY_BEAM_WIDTH = 3  # 困难难度搜索中每个敌方的反制候选数
+KILLER_SLOTS = 2  # 每层保留的杀手走法数
+FOLLOWUP_FIRST_CHUNK = 8  # 后续得分估计首批精确打分的走法数（按上界从高到低）
+FOLLOWUP_WEIGHT = 0.82  # 普通难度：总分 = 首步得分 + 该权重 × 最佳后续得分
+ZONE_PLAN_MIN_BRANCHING = 40  # 己方候选走法多于此数时才按分区计划裁剪（困难/蒙特卡洛）
+
+# 蒙特卡洛树搜索
+MCTS_TIME_BUDGET_MS = 150  # 每步思考时间预算（毫秒）
+MCTS_ROLLOUT_BUDGET = 600  # 每步模拟次数上限（与时间预算先到者为准）
+MCTS_EXPLORATION = 1.2  # UCT 探索系数
+MCTS_BRANCH_LIMIT = 8  # 每个节点只展开批量评分最高的若干走法
+MCTS_ENEMY_ROLLOUT_STEPS = 3  # 模拟中每个敌方的反击步数
+MCTS_VALUE_SCALE = 300.0  # 局面评估差值到 [0, 1] 收益的缩放尺度
+MCTS_POLICY_WIN_WEIGHT = 6.0  # 轻量策略：能吃掉敌军的走法权重加成
+MCTS_POLICY_STRATEGIC_WEIGHT = 4.0  # 轻量策略：走向非己方城市/金矿的权重加成
+MCTS_POLICY_LOSING_WEIGHT = 0.2  # 轻量策略：以弱攻强的走法权重
+
+# 人类回合的后台预思考
+PONDER_MAX_POSITIONS = 12  # 人类每走一步后最多推演的 AI 局面数
+PONDER_CACHE_LIMIT = 32  # 预思考结果缓存条数上限（超出时清空）
+
+class SearchTimeout(Exception):
+    """迭代加深中本轮搜索超出时间预算"""
+
 
 class AIMixin:
+    ai_search_budget_ms = HARD_SEARCH_TIME_BUDGET_MS
+    ai_search_max_depth = HARD_SEARCH_MAX_DEPTH
+    ai_normal_beam = NORMAL_BEAM_WIDTH
+    ai_hard_root_beam = HARD_ROOT_BEAM_WIDTH
+    ai_hard_node_beam = HARD_NODE_BEAM_WIDTH
+    ai_hard_enemy_beam = HARD_ENEMY_BEAM_WIDTH
+    ai_parallel_workers = AI_PARALLEL_WORKERS
+    parallel_search = None
+    search_deadline = None
+    ai_decision_executor = None
+    pending_ai_decision = None
+    ai_decision_generation = 0
+    turn_plan = None
+    mcts_tree = None
+    ai_mcts_budget_ms = MCTS_TIME_BUDGET_MS
+    ai_mcts_rollouts = MCTS_ROLLOUT_BUDGET
+    opening_book_enabled = True
+    zone_planning_enabled = True
+    turn_knapsack_enabled = True
+    endgame_solver_enabled = True
+    zone_plan = None
+    ponder_task = None
+    ponder_next = None
+    ponder_origin = None
+    ponder_budget = 0
+    decision_tracer = None
+    move_deadline = None  # 本步决策的截止时刻（time.perf_counter），由 plan_ai_turn 按调度器给出的预算设置
+    search_cancel = None  # 后台任务的中断标志（threading.Event），由 plan_ai_turn 设置，与截止时间一同检查
+    search_context = None  # (规划线程标识, 局面快照)，由 plan_ai_turn 设置；该线程上搜索中的轮次与存活玩家从快照读取
+    ai_move_latency_ms = AI_TARGET_MOVE_LATENCY_MS[AI_DIFFICULTY_NORMAL]
+    ai_move_schedule = None  # (决策标识, 本步执行时刻)，见 maybe_run_ai_turn
+    search_line = ()  # 本次决策的搜索对首步之后己方后续走法的评估结果 [(起点, 终点), ...]，见 plan_ai_turn
+    ai_search_nodes = 0  # 累计展开节点数（批量打分的局面、蒙特卡洛模拟、残局求解节点），决策追踪按差值统计
+
+    def apply_ai_budget(self, difficulty):
+        """采用该难度的每步目标耗时，以及据此和本机性能推导的思考时间、搜索宽度与深度（见 ai_budget）"""
+        self.ai_move_latency_ms = AI_TARGET_MOVE_LATENCY_MS[difficulty]
+        for name, value in self.ai_budget[difficulty].items():
+            setattr(self, name, value)
+
+    def enable_decision_trace(self, capacity=AI_TRACE_CAPACITY, top_n=AI_TRACE_TOP_N):
+        """开启决策追踪（见 DecisionTracer），返回追踪器"""
+        self.decision_tracer = DecisionTracer(capacity, top_n)
+        return self.decision_tracer
+
+    def disable_decision_trace(self):
+        self.decision_tracer = None
+
+    def dump_decision_trace(self, path=AI_TRACE_PATH):
+        """把已记录的决策导出为 JSONL，返回写入条数；未开启追踪时返回 0"""
+        if self.decision_tracer is None:
+            return 0
+        return self.decision_tracer.dump_jsonl(path)
+
+    def remaining_move_budget_ms(self, budget_ms):
+        """本步剩余的思考时间（毫秒），不超过 budget_ms；没有截止时间时原样返回 budget_ms"""
+        if self.search_cancelled():
+            return 0.0
+        if self.move_deadline is None:
+            return budget_ms
+        return max(0.0, min(budget_ms, (self.move_deadline - time.perf_counter()) * 1000.0))
+
+    def move_deadline_passed(self):
+        if self.search_cancelled():
+            return True
+        return self.move_deadline is not None and time.perf_counter() >= self.move_deadline
+
+    def _search_position(self):
+        context = self.search_context
+        if context is None or context[0] != threading.get_ident():
+            return None
+        return context[1]
+
+    def search_players(self):
+        """搜索中的存活玩家：规划期间取自局面快照，后台线程不读主线程可能同时改动的 players；
+        其他线程（如主线程计算兜底计划）仍读当前状态"""
+        position = self._search_position()
+        return self.players if position is None else position['players']
+
+    def search_round_count(self):
+        """搜索中的轮次，取值方式同 search_players"""
+        position = self._search_position()
+        return self.round_count if position is None else position['round_count']
+
+    def search_steps_per_turn(self):
+        """搜索中敌方下一回合的行动点（按 search_round_count 计算）"""
+        return self.steps_per_turn_for_round(self.search_round_count())
+
+    def search_cancelled(self):
+        """后台任务已被主线程中断（过期的预思考、局面已变的决策等），搜索按到达截止时间处理"""
+        return self.search_cancel is not None and self.search_cancel.is_set()
+
+    def reset_ai_caches(self):
+        """城市与金矿布置完成后调用：建立战略格索引并清空与棋盘相关的缓存"""
+        # 后台线程可能仍在读取下面要重建的表，先中断并等它退出
+        self.stop_background_ai()
+        self.cancel_ai_decision()
+        strategic_mask = (self.board.city > 0) | (self.resource_map == RESOURCE_GOLD_MINE)
+        self.strategic_xs, self.strategic_ys = np.nonzero(strategic_mask)
+        self.strategic_is_capital = self.board.city[self.strategic_xs, self.strategic_ys] == CITY_CAPITAL
+        self.strategic_cell_mask = strategic_mask.reshape(-1)
+        self.capital_cell_mask = self.board.city.reshape(-1) == CITY_CAPITAL
+        self.gold_mine_cells = np.array(
+            [i * BOARD_SIZE + j for i, j in self.gold_mine_positions], dtype=np.int64
+        )
+        self.gold_mine_mask = self.resource_map.reshape(-1) == RESOURCE_GOLD_MINE
+        # 走法边按起点排列，move_edge_offsets[c]:move_edge_offsets[c + 1] 为格 c 出发的全部边
+        self.move_edge_offsets = np.searchsorted(self.move_edges.src, np.arange(BOARD_SIZE * BOARD_SIZE + 1))
+        self.zone_grid = build_zone_grid(self.capitals, self.get_zone_owner)
+        self.zone_target_values = build_target_values(self.board.city, self.resource_map)
+        self.capital_reach = {
+            player: capital_reach_fields(self.move_sources, x * BOARD_SIZE + y)
+            for player, (x, y) in self.capitals.items()
+        }
+        self.board_evaluator = BoardEvaluator(self.board.city, self.resource_map)
+        self.influence_graph = InfluenceGraph(self.move_edges, INFLUENCE_DECAY, INFLUENCE_RADIUS)
+        self.strategic_distance_cache = {}
+        self.capital_distance_cache = {}
+        self.unit_influence_cache = {}
+        self.transposition_table = TranspositionTable(TRANSPOSITION_TABLE_SIZE)
+        self.transposition_context = None
+        self.killer_moves = {}
+        self.history_scores = {}
+        # 工作进程缓存的是上一张地图的静态数据，换图后需重建进程池
+        self.shutdown_parallel_search()
+        self.ponder_cache = {}
+        self.endgame_cache = {}
+
+    def export_search_static_state(self):
+        """并行搜索工作进程所需的静态地图数据（城市类型通道用于建立战略格索引）"""
+        return {
+            'terrain': self.terrain,
+            'capitals': dict(self.capitals),
+            'resource_map': self.resource_map,
+            'gold_mine_positions': list(self.gold_mine_positions),
+            'board': self.board.copy(),
+            'players': list(self.search_players()),
+            'round_count': self.search_round_count(),
+        }
+
+    def export_search_settings(self):
+        """随难度与标定变化的搜索参数，随每个并行任务发给工作进程"""
+        return {
+            'ai_hard_node_beam': self.ai_hard_node_beam,
+            'ai_hard_enemy_beam': self.ai_hard_enemy_beam,
+            'ai_search_max_depth': self.ai_search_max_depth,
+            'zone_planning_enabled': self.zone_planning_enabled,
+        }
+
+    def parallel_deadline(self):
+        """本步截止时刻换算为墙钟时间（各进程的 perf_counter 起点不同），没有截止时间时为 None"""
+        if self.move_deadline is None:
+            return None
+        return time.time() + (self.move_deadline - time.perf_counter())
+
+    def get_parallel_search(self):
+        if self.ai_parallel_workers <= 0:
+            return None
+        if self.parallel_search is None:
+            self.parallel_search = ParallelRootSearch(
+                type(self),
+                self.export_search_static_state(),
+                self.ai_parallel_workers,
+            )
+        return self.parallel_search
+
+    def shutdown_parallel_search(self):
+        if self.parallel_search is not None:
+            self.parallel_search.shutdown()
+            self.parallel_search = None
+
+    def _disable_parallel_search(self):
+        # 进程池不可用时退回串行搜索，不影响对局
+        self.shutdown_parallel_search()
+        self.ai_parallel_workers = 0
+
+    def prepare_transposition_table(self):
+        """新一次搜索前调用：轮次或存活玩家变化会改变敌方步数与反制集合，此时整表作废"""
+        context = (self.search_round_count(), tuple(self.search_players()))
+        if context != self.transposition_context:
+            self.transposition_table.clear()
+            self.transposition_context = context
+        self.transposition_table.new_search()
+
+    def compute_position_hash(self, board_state, move_count_state):
+        return ZOBRIST_KEYS.board_hash(board_state), ZOBRIST_KEYS.move_count_hash(move_count_state)
+
     def get_player_soldiers_from_state(self, player, board_state, move_count_state):
-        soldiers = []
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                owner, hp, _, _ = board_state[i, j]
-                if owner == player and hp > 0 and move_count_state[i, j] < 3:
-                    soldiers.append((i, j))
-        return soldiers
+        xs, ys = np.nonzero((board_state.owner == player) & (board_state.hp > 0) & (move_count_state < 3))
+        return list(zip(xs.tolist(), ys.tolist()))
 
     def get_possible_moves_for_state(self, player, pos, board_state, move_count_state, steps_left):
         x, y = pos
@@ -91,96 +366,94 @@ class AIMixin:
         if move_count_state[x, y] >= 3:
             return []
 
+        owner_grid = board_state.owner
+        hp_grid = board_state.hp
         possible_moves = []
-        for target in self.get_move_candidates(pos):
-            tx, ty = target
-            target_player, target_hp, _, _ = board_state[tx, ty]
-            if target_player == player and target_hp > 0:
-                continue
-
-            terrain_cost, error = self.get_terrain_cost(pos, target)
-            if error:
-                continue
+        for tx, ty, terrain_cost in self.move_targets[x * BOARD_SIZE + y]:
             if steps_left < terrain_cost:
                 continue
-            possible_moves.append(target)
+            if owner_grid[tx, ty] == player and hp_grid[tx, ty] > 0:
+                continue
+            possible_moves.append((tx, ty))
 
         return possible_moves
 
     def distance_to_nearest_enemy_capital(self, player, pos):
-        enemy_caps = [self.capitals[p] for p in self.players if p != player and p in self.capitals]
+        enemy_caps = [self.capitals[p] for p in self.search_players() if p != player and p in self.capitals]
         if not enemy_caps:
             return 0
         x, y = pos
         return min(abs(x - cx) + abs(y - cy) for cx, cy in enemy_caps)
 
-    def distance_to_nearest_strategic_target(self, player, pos, board_state):
-        x, y = pos
-        best_distance = 10**9
+    def get_strategic_distance_fields(self, player, board_state):
+        """玩家到最近战略目标（非己方城市/首都/金矿）的曼哈顿距离场及目标格易主后的距离场（扁平）。
 
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                owner, _, city_type, _ = board_state[i, j]
-                has_mine = self.resource_map[i, j] == RESOURCE_GOLD_MINE
+        以战略格归属为键缓存，归属不变的棋盘（含同一局面下的所有候选）共用一组。
+        """
+        owners = board_state.owner[self.strategic_xs, self.strategic_ys]
+        cache_key = (player, owners.tobytes())
+        fields = self.strategic_distance_cache.get(cache_key)
+        if fields is not None:
+            return fields
 
-                is_target = False
-                if city_type == CITY_CAPITAL and owner > 0 and owner != player:
-                    is_target = True
-                elif city_type in (CITY_MAJOR, CITY_SMALL) and owner != player:
-                    is_target = True
-                elif has_mine and owner != player:
-                    is_target = True
+        # 首都需有主才算目标；普通城市与金矿只要不归己方即可
+        is_target = (owners != player) & ((owners > 0) | ~self.strategic_is_capital)
+        fields = strategic_distance_fields(self.strategic_xs[is_target], self.strategic_ys[is_target])
 
-                if is_target:
-                    distance = abs(x - i) + abs(y - j)
-                    if distance < best_distance:
-                        best_distance = distance
+        if len(self.strategic_distance_cache) >= STRATEGIC_DISTANCE_CACHE_LIMIT:
+            self.strategic_distance_cache.clear()
+        self.strategic_distance_cache[cache_key] = fields
+        return fields
 
-        return 0 if best_distance == 10**9 else best_distance
+    def get_strategic_distance_map(self, player, board_state):
+        return self.get_strategic_distance_fields(player, board_state)[0].reshape(BOARD_SIZE, BOARD_SIZE)
+
+    def distance_to_nearest_strategic_target(self, player, pos, board_state):
+        return int(self.get_strategic_distance_map(player, board_state)[pos[0], pos[1]])
 
     def count_strategic_targets_in_reach(self, player, from_pos, board_state, steps_left):
         if steps_left <= 0:
             return 0
 
+        owner_grid = board_state.owner
+        city_grid = board_state.city
         count = 0
-        for target in self.get_move_candidates(from_pos):
-            terrain_cost, error = self.get_terrain_cost(from_pos, target)
-            if error or terrain_cost > steps_left:
+        for tx, ty, terrain_cost in self.move_targets[from_pos[0] * BOARD_SIZE + from_pos[1]]:
+            if terrain_cost > steps_left:
                 continue
-
-            tx, ty = target
-            target_owner, _, target_city_type, _ = board_state[tx, ty]
-            target_has_mine = self.resource_map[tx, ty] == RESOURCE_GOLD_MINE
-            if target_owner == player:
+            if owner_grid[tx, ty] == player:
                 continue
-
-            if target_city_type > 0 or target_has_mine:
+            if city_grid[tx, ty] > 0 or self.resource_map[tx, ty] == RESOURCE_GOLD_MINE:
                 count += 1
 
         return count
 
     def get_max_enemy_threat_against(self, player, target_pos, board_state, enemy_steps):
         target_x, target_y = target_pos
+        target_owner, target_hp, _, _ = board_state[target_x, target_y]
+        target_occupied = target_hp > 0
+        owner_grid = board_state.owner
+        hp_grid = board_state.hp
         max_threat_hp = 0
 
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                enemy_player, enemy_hp, _, _ = board_state[i, j]
-                if enemy_player <= 0 or enemy_player == player or enemy_hp <= 0:
-                    continue
-
-                target_owner, target_hp, _, _ = board_state[target_x, target_y]
-                if target_owner == enemy_player and target_hp > 0:
-                    continue
-
-                terrain_cost, error = self.get_terrain_cost((i, j), target_pos)
-                if error or terrain_cost > enemy_steps:
-                    continue
-                if enemy_hp > max_threat_hp:
-                    max_threat_hp = enemy_hp
+        # 反向走法表：只检查能一步到达目标格的来源格
+        for i, j, terrain_cost in self.move_sources[target_x * BOARD_SIZE + target_y]:
+            if terrain_cost > enemy_steps:
+                continue
+            enemy_player = int(owner_grid[i, j])
+            enemy_hp = int(hp_grid[i, j])
+            if enemy_player <= 0 or enemy_player == player or enemy_hp <= 0:
+                continue
+            if target_owner == enemy_player and target_occupied:
+                continue
+            if enemy_hp > max_threat_hp:
+                max_threat_hp = enemy_hp
 
         return max_threat_hp
 
+    def build_threat_field(self, board_state):
+        return ThreatField.from_board(board_state, self.move_edges, self.search_steps_per_turn())
+
     def estimate_mine_production_gain(self, board_state, pos, player):
         x, y = pos
         if self.resource_map[x, y] != RESOURCE_GOLD_MINE:
@@ -194,20 +467,7 @@ class AIMixin:
             return max(0, min(5, 99 - int(hp)))
         return 5
 
-    def simulate_ai_move(self, player, from_pos, to_pos, board_state, move_count_state, steps_left):
-        resolved, error = self._resolve_move_on_state(
-            board_state,
-            move_count_state,
-            from_pos,
-            to_pos,
-            player,
-            steps_left,
-            copy_state=True,
-        )
-        if error:
-            return None
-
-        x2, y2 = to_pos
+    def _describe_resolved_move(self, player, from_pos, to_pos, resolved, steps_left):
         attacker_survived = resolved['attacker_survived']
         target_player = resolved['target_player']
         target_city_type = resolved['target_city_type']
@@ -232,10 +492,98 @@ class AIMixin:
             'to_pos': to_pos,
         }
 
-    def score_ai_move(self, player, from_pos, to_pos, board_state, move_count_state, steps_left, add_noise=True):
-        simulated = self.simulate_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+    def simulate_ai_move(self, player, from_pos, to_pos, board_state, move_count_state, steps_left):
+        resolved, error = self._resolve_move_on_state(
+            board_state,
+            move_count_state,
+            from_pos,
+            to_pos,
+            player,
+            steps_left,
+            copy_state=True,
+        )
+        if error:
+            return None
+        return self._describe_resolved_move(player, from_pos, to_pos, resolved, steps_left)
+
+    def apply_ai_move(self, player, from_pos, to_pos, board_state, move_count_state, steps_left):
+        """原地走子（make）：返回 (模拟结果, 撤销记录)，非法走法返回 (None, None)。
+
+        走子只改动起点与终点两格，撤销记录仅保存这两格及其移动次数，交给 undo_ai_move 精确还原。
+        """
+        x1, y1 = from_pos
+        x2, y2 = to_pos
+        if not (0 <= x1 < BOARD_SIZE and 0 <= y1 < BOARD_SIZE and 0 <= x2 < BOARD_SIZE and 0 <= y2 < BOARD_SIZE):
+            return None, None
+
+        undo = (
+            from_pos,
+            to_pos,
+            list(board_state.cell(x1, y1)),
+            list(board_state.cell(x2, y2)),
+            move_count_state[x1, y1],
+            move_count_state[x2, y2],
+        )
+        resolved, error = self._resolve_move_on_state(
+            board_state,
+            move_count_state,
+            from_pos,
+            to_pos,
+            player,
+            steps_left,
+            copy_state=False,
+        )
+        if error:
+            return None, None
+        return self._describe_resolved_move(player, from_pos, to_pos, resolved, steps_left), undo
+
+    def undo_ai_move(self, board_state, move_count_state, undo):
+        """撤销 apply_ai_move（unmake）"""
+        (x1, y1), (x2, y2), from_cell, to_cell, from_move_count, to_move_count = undo
+        board_state[x2, y2] = to_cell
+        board_state[x1, y1] = from_cell
+        move_count_state[x2, y2] = to_move_count
+        move_count_state[x1, y1] = from_move_count
+
+    def score_ai_move(
+        self,
+        player,
+        from_pos,
+        to_pos,
+        board_state,
+        move_count_state,
+        steps_left,
+        add_noise=True,
+        threat_field=None,
+    ):
+        # 同一棋盘的候选共享威胁场，走子后只增量更新两格
+        if threat_field is None:
+            threat_field = self.build_threat_field(board_state)
+        # 走子前的距离与影响场须在原地走子之前取得
+        before_obj_dist = self.distance_to_nearest_strategic_target(player, from_pos, board_state)
+        influence = self.get_influence_map(player, board_state)
+
+        simulated, undo = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
         if simulated is None:
             return -10**9, None
+        try:
+            score = self._score_applied_move(
+                player, from_pos, to_pos, simulated, threat_field, before_obj_dist, influence
+            )
+        finally:
+            self.undo_ai_move(board_state, move_count_state, undo)
+        # 棋盘已还原，结果中不再携带原地棋盘
+        del simulated['board']
+        del simulated['move_count']
+
+        # 普通/简单难度允许轻微随机打破同分；困难模式会关闭噪声。
+        if add_noise:
+            score += random.random() * NOISE_SCALE
+        return score, simulated
+
+    def _score_applied_move(self, player, from_pos, to_pos, simulated, threat_field, before_obj_dist, influence):
+        """对已原地执行的走子打分（simulated['board'] 为走子后的棋盘）"""
+        threats_after = threat_field.after_move(simulated['board'], from_pos, to_pos)
 
         score = 0.0
         target_player = simulated['target_player']
@@ -300,8 +648,14 @@ class AIMixin:
         elif after_dist > before_dist:
             score += SCORE_AWAY_FROM_ENEMY_CAPITAL
 
+        # 停在敌方兵力影响占优处：威胁评估只看一步，影响场覆盖之后一两回合的机动范围
+        if attacker_survived:
+            exposure = influence.exposure_after(
+                from_pos[0] * BOARD_SIZE + from_pos[1], to_pos[0] * BOARD_SIZE + to_pos[1], simulated['survivor_hp']
+            )
+            score -= exposure * SCORE_EXPOSURE_PER_HP
+
         # 接近战略目标（城市/首都/金矿）的价值
-        before_obj_dist = self.distance_to_nearest_strategic_target(player, from_pos, board_state)
         after_obj_dist = self.distance_to_nearest_strategic_target(player, to_pos, simulated['board'])
         if after_obj_dist < before_obj_dist:
             score += (before_obj_dist - after_obj_dist) * SCORE_APPROACH_STRATEGIC_PER_STEP
@@ -326,12 +680,7 @@ class AIMixin:
         # 若己方首都受威胁，鼓励回防
         own_capital = self.capitals.get(player)
         if own_capital is not None:
-            cap_threat = self.get_max_enemy_threat_against(
-                player,
-                own_capital,
-                simulated['board'],
-                self.calculate_steps_per_turn(),
-            )
+            cap_threat = threats_after.threat_against(player, own_capital)
             if cap_threat > 0:
                 before_own_dist = abs(from_pos[0] - own_capital[0]) + abs(from_pos[1] - own_capital[1])
                 after_own_dist = abs(to_pos[0] - own_capital[0]) + abs(to_pos[1] - own_capital[1])
@@ -342,21 +691,12 @@ class AIMixin:
 
         # 若己方金矿受威胁，鼓励回防（金矿是重要资源）
         own_mines = []
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                if self.resource_map[i, j] == RESOURCE_GOLD_MINE:
-                    mine_owner = simulated['board'][i, j, 0]
-                    mine_hp = simulated['board'][i, j, 1]
-                    if mine_owner == player and mine_hp > 0:
-                        own_mines.append((i, j))
+        for i, j in self.gold_mine_positions:
+            if simulated['board'][i, j, 0] == player and simulated['board'][i, j, 1] > 0:
+                own_mines.append((i, j))
 
         for mine_pos in own_mines:
-            mine_threat = self.get_max_enemy_threat_against(
-                player,
-                mine_pos,
-                simulated['board'],
-                self.calculate_steps_per_turn(),
-            )
+            mine_threat = threats_after.threat_against(player, mine_pos)
             if mine_threat > 0:
                 before_mine_dist = abs(from_pos[0] - mine_pos[0]) + abs(from_pos[1] - mine_pos[1])
                 after_mine_dist = abs(to_pos[0] - mine_pos[0]) + abs(to_pos[1] - mine_pos[1])
@@ -367,8 +707,7 @@ class AIMixin:
 
         # 威胁评估：避免走到下一手可被轻易反杀的位置
         if attacker_survived:
-            enemy_steps = self.calculate_steps_per_turn()
-            threat_hp = self.get_max_enemy_threat_against(player, to_pos, simulated['board'], enemy_steps)
+            threat_hp = threats_after.threat_against(player, to_pos)
             survivor_hp = simulated['survivor_hp']
             if target_is_enemy_capital:
                 risk_factor = RISK_FACTOR_ENEMY_CAPITAL
@@ -388,11 +727,7 @@ class AIMixin:
 
         # 行动点效率
         score -= (simulated['terrain_cost'] - 1) * SCORE_ACTION_POINT_EFFICIENCY
-
-        # 普通/简单难度允许轻微随机打破同分；困难模式会关闭噪声。
-        if add_noise:
-            score += random.random() * NOISE_SCALE
-        return score, simulated
+        return score
 
     def enumerate_ai_actions(self, player, board_state, move_count_state, steps_left):
         actions = []
@@ -402,59 +737,505 @@ class AIMixin:
                 actions.append((from_pos, to_pos))
         return actions
 
-    def estimate_best_followup_score(self, player, board_state, move_count_state, steps_left, limit=24):
-        if steps_left <= 0:
-            return 0.0
+    def enumerate_ai_action_edges(self, player, board_state, move_count_state, steps_left):
+        """enumerate_ai_actions 的数组形式：返回走法边编号，顺序与 enumerate_ai_actions 一致"""
+        edges = self.move_edges
+        owner = board_state.owner.reshape(-1)
+        hp = board_state.hp.reshape(-1)
+        own_soldier = (owner == player) & (hp > 0)
+        movable = own_soldier & (move_count_state.reshape(-1) < 3)
+        legal = movable[edges.src] & (edges.cost <= steps_left) & ~own_soldier[edges.dst]
+        return np.nonzero(legal)[0]
+
+    def edge_action(self, edge_id):
+        edges = self.move_edges
+        return divmod(int(edges.src[edge_id]), BOARD_SIZE), divmod(int(edges.dst[edge_id]), BOARD_SIZE)
+
+    def draw_score_noise(self, count):
+        # 与逐个调用 score_ai_move 时的随机数消耗顺序一致
+        return np.array([random.random() for _ in range(count)], dtype=float) * NOISE_SCALE
+
+    def get_enemy_capital_distance_map(self, player):
+        enemy_caps = tuple(self.capitals[p] for p in self.search_players() if p != player and p in self.capitals)
+        distance_map = self.capital_distance_cache.get(enemy_caps)
+        if distance_map is None:
+            cap_xs, cap_ys = np.array(enemy_caps, dtype=int).reshape(-1, 2).T
+            distance_map = nearest_distance_field(cap_xs, cap_ys)
+            distance_map.flags.writeable = False
+            self.capital_distance_cache[enemy_caps] = distance_map
+        return distance_map
+
+    def get_unit_influence(self, board_state):
+        """各玩家的兵力影响场 (玩家槽位, 格)，以归属与血量为键缓存，同一局面下各方打分共用"""
+        owner = board_state.owner.reshape(-1)
+        hp = board_state.hp.reshape(-1)
+        cache_key = owner.tobytes() + hp.tobytes()
+        influence = self.unit_influence_cache.get(cache_key)
+        if influence is None:
+            influence = self.influence_graph.propagate(owner.astype(np.int64), hp.astype(float))
+            influence.flags.writeable = False
+            if len(self.unit_influence_cache) >= UNIT_INFLUENCE_CACHE_LIMIT:
+                self.unit_influence_cache.clear()
+            self.unit_influence_cache[cache_key] = influence
+        return influence
+
+    def get_influence_map(self, player, board_state):
+        strategic_distance, captured_distance = self.get_strategic_distance_fields(player, board_state)
+        return InfluenceMap(
+            player,
+            self.get_enemy_capital_distance_map(player),
+            strategic_distance,
+            captured_distance,
+            self.get_unit_influence(board_state),
+            self.influence_graph,
+            self.influence_graph.unit_sources(board_state.owner.reshape(-1), board_state.hp.reshape(-1)),
+        )
 
-        scored = []
-        for from_pos, to_pos in self.enumerate_ai_actions(player, board_state, move_count_state, steps_left):
-            score, _ = self.score_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
-            scored.append(score)
+    def plan_zone_objectives(self, player, board_state):
+        """分区级战略层：返回本次决策的 ZonePlan，未开启或没有目标时返回 None"""
+        if not self.zone_planning_enabled:
+            return None
+        pressure = self.get_influence_map(player, board_state).enemy_pressure(self.build_threat_field(board_state))
+        return build_zone_plan(
+            player,
+            board_state,
+            self.zone_grid,
+            self.zone_target_values,
+            self.capital_cell_mask,
+            self.gold_mine_mask,
+            pressure,
+        )
 
-        if not scored:
-            return 0.0
+    def _strategic_target_captured(self, player, batch):
+        """终点是战略目标且走子后不再是目标（被己方拿下，或敌方首都同归于尽后无主）"""
+        dst = batch['dst']
+        to_owner = batch['to_owner']
+        changed = self.strategic_cell_mask[dst] & (to_owner != batch['target_player'])
+        still_target = (to_owner != player) & ((to_owner > 0) | ~self.capital_cell_mask[dst])
+        return changed & ~still_target
+
+    def _chain_target_counts(self, player, board_state):
+        """[格, 剩余步数] -> 一步可达的非己方战略目标数（count_strategic_targets_in_reach 的查表形式）"""
+        edges = self.move_edges
+        owner = board_state.owner.reshape(-1)
+        is_target = self.strategic_cell_mask[edges.dst] & (owner[edges.dst] != player)
+        max_cost = int(edges.cost.max())
+        counts = np.zeros((BOARD_SIZE * BOARD_SIZE, max_cost + 1), dtype=int)
+        np.add.at(counts, (edges.src[is_target], edges.cost[is_target]), 1)
+        return np.cumsum(counts, axis=1)
+
+    def _batch_threat_against(self, player, ranked_reach, enemy_steps, query, occupant, dst, to_owner, to_hp):
+        """ThreatField.threat_against 的批量形式：query 为每个走法各自的查询格（走子后）。
+
+        走子只会移走或削弱终点格的敌方驻军（起点格是己方，不计入威胁），
+        因此以终点为最大值来源时换用次大值，再并入终点格走子后的贡献。
+        """
+        best, best_src, second = ranked_reach
+        link_cost = self.move_cost_matrix[dst, query]
+        to_reaches = (link_cost > 0) & (link_cost <= enemy_steps) & (to_hp > 0)
+        threat = np.zeros(query.shape, dtype=int)
+        for enemy in range(1, PLAYER_SLOTS):
+            if enemy == player:
+                continue
+            reach = np.where(best_src[enemy, query] == dst, second[enemy, query], best[enemy, query])
+            reach = np.where(to_reaches & (to_owner == enemy), np.maximum(reach, to_hp), reach)
+            reach[occupant == enemy] = 0
+            threat = np.maximum(threat, reach)
+        return threat
+
+    def score_ai_actions_batch(
+        self,
+        player,
+        board_state,
+        move_count_state,
+        steps_left,
+        edge_ids=None,
+        threat_field=None,
+        terms=None,
+    ):
+        """批量打分：返回 (走法边编号, 得分向量)，与逐个调用 score_ai_move(add_noise=False) 的结果逐位相同。
+
+        各项收益按 _score_applied_move 的顺序逐项累加，不适用的项加 0，浮点结果不受影响。
+        terms 为字典时额外写入各项收益的分项向量（见 SCORE_TERMS），供决策追踪使用。
+        """
+        if edge_ids is None:
+            edge_ids = self.enumerate_ai_action_edges(player, board_state, move_count_state, steps_left)
+        batch, score = self._batch_score_head(player, board_state, steps_left, edge_ids, terms)
+        if threat_field is not None:
+            batch['threat_field'] = threat_field
+        return edge_ids, self._batch_score_tail(player, board_state, batch, score, terms=terms)
+
+    def _batch_score_head(self, player, board_state, steps_left, edge_ids, terms=None):
+        """批量打分前半段：战斗结算与只依赖起终点格的廉价项（基础收益、金矿、城市、敌方首都距离、影响场）。
+
+        返回 (走法数据, 前半段得分)，走法数据供 _batch_score_tail 与 _batch_score_upper_bound 继续使用。
+        """
+        self.ai_search_nodes += 1
+        edges = self.move_edges
+        src = edges.src[edge_ids]
+        dst = edges.dst[edge_ids]
+        cost = edges.cost[edge_ids]
+        # 血量通道为 uint8，参与减法前先转为有符号整数
+        owner = board_state.owner.reshape(-1).astype(int)
+        hp = board_state.hp.reshape(-1).astype(int)
+        city = board_state.city.reshape(-1)
+        source_hp = hp[src]
+        target_player = owner[dst]
+        target_hp = hp[dst]
+        target_city_type = city[dst]
+
+        # 战斗结算（与 _resolve_move_on_state 一致）；to_owner/to_hp 为终点格走子后的归属与血量
+        fight = (target_player != 0) & (target_hp > 0)
+        attacker_survived = ~fight | (source_hp > target_hp)
+        defender_survived = fight & (source_hp < target_hp)
+        survivor_hp = np.where(fight, np.abs(source_hp - target_hp), source_hp)
+        to_owner = np.where(attacker_survived, player, np.where(defender_survived, target_player, 0))
+
+        target_is_enemy = (target_player > 0) & (target_player != player)
+        target_is_neutral = target_player == 0
+        target_has_mine = self.resource_map.reshape(-1)[dst] == RESOURCE_GOLD_MINE
+        target_is_city = (target_city_type == CITY_MAJOR) | (target_city_type == CITY_SMALL)
+
+        score = np.zeros(edge_ids.shape[0], dtype=float)
 
-        scored.sort(reverse=True)
-        return scored[0] if len(scored) <= limit else scored[:limit][0]
+        # 扩张/进攻基础收益
+        combat_score = np.where(
+            attacker_survived,
+            SCORE_ATTACK_WIN_BASE + np.minimum(SCORE_ATTACK_WIN_MAX_HP_BONUS, target_hp * SCORE_ATTACK_WIN_PER_HP),
+            np.where(defender_survived, SCORE_ATTACK_LOSS, SCORE_ATTACK_DRAW),
+        )
+        base_score = np.where(
+            target_is_neutral,
+            SCORE_MOVE_TO_NEUTRAL,
+            np.where(target_is_enemy & (target_hp > 0), combat_score, 0),
+        )
+        score += base_score
+
+        # 金矿价值
+        mine_gain = np.maximum(0, np.minimum(5, 99 - survivor_hp))
+        mine_scored = target_has_mine & attacker_survived & (mine_gain > 0)
+        mine_parts = (
+            np.where(
+                mine_scored,
+                np.where(
+                    target_has_mine & target_is_enemy,
+                    SCORE_ENEMY_MINE,
+                    np.where(target_has_mine & target_is_neutral, SCORE_NEUTRAL_MINE, SCORE_OWN_EMPTY_MINE),
+                ),
+                0,
+            ),
+            np.where(mine_scored, mine_gain * SCORE_MINE_GAIN_PER_HP, 0),
+            np.where(mine_scored & (mine_gain == 5), SCORE_MINE_FULL_BONUS, 0),
+        )
+        # 三项分别累加，与逐个打分的加法顺序一致
+        for part in mine_parts:
+            score += part
 
-    def evaluate_board_state(self, player, board_state):
+        # 城市/首都价值
+        captured_city = attacker_survived & (target_city_type > 0) & (target_player != player)
+        capture_score = np.select(
+            [target_city_type == CITY_CAPITAL, target_city_type == CITY_MAJOR, target_city_type == CITY_SMALL],
+            [SCORE_CAPTURE_CAPITAL, SCORE_CAPTURE_MAJOR_CITY, SCORE_CAPTURE_SMALL_CITY],
+            0,
+        )
+        capture_score = np.where(captured_city, capture_score, 0)
+        score += capture_score
+
+        # 接近敌方首都的长期价值
+        influence = self.get_influence_map(player, board_state)
+        capital_distance = influence.capital_distance
+        before_dist = capital_distance[src]
+        after_dist = capital_distance[dst]
+        capital_distance_score = np.where(
+            after_dist < before_dist,
+            (before_dist - after_dist) * SCORE_APPROACH_ENEMY_CAPITAL_PER_STEP,
+            np.where(after_dist > before_dist, SCORE_AWAY_FROM_ENEMY_CAPITAL, 0),
+        )
+        score += capital_distance_score
+
+        exposure_penalty = np.where(
+            attacker_survived, influence.exposure_after(src, dst, survivor_hp) * SCORE_EXPOSURE_PER_HP, 0
+        )
+        score -= exposure_penalty
+        if terms is not None:
+            terms['base'] = base_score
+            terms['mine'] = mine_parts[0] + mine_parts[1] + mine_parts[2]
+            terms['capture'] = capture_score
+            terms['capital_distance'] = capital_distance_score
+            terms['exposure'] = 0.0 - exposure_penalty
+
+        risk_factor = np.select(
+            [
+                (target_city_type == CITY_CAPITAL) & target_is_enemy,
+                (target_is_city | target_has_mine) & target_is_enemy,
+                (target_is_city | target_has_mine) & target_is_neutral,
+            ],
+            [RISK_FACTOR_ENEMY_CAPITAL, RISK_FACTOR_ENEMY_CITY_OR_MINE, RISK_FACTOR_NEUTRAL_CITY_OR_MINE],
+            RISK_FACTOR_DEFAULT,
+        )
+        batch = {
+            'src': src,
+            'dst': dst,
+            'cost': cost,
+            'steps_after': steps_left - cost,
+            'target_player': target_player,
+            'attacker_survived': attacker_survived,
+            'survivor_hp': survivor_hp,
+            'to_owner': to_owner,
+            'risk_factor': risk_factor,
+            'owner': owner,
+            'hp': hp,
+            'threat_field': None,
+            'influence': influence,
+        }
+        return batch, score
+
+    def _batch_score_tail(self, player, board_state, batch, score, subset=None, terms=None):
+        """批量打分后半段：战略目标、连击、回防与威胁等代价较高的项。
+
+        subset 为走法下标数组时只对这些走法继续打分（score 须为对应的前半段得分）。
+        """
+        if subset is None:
+            pick = lambda values: values
+        else:
+            pick = lambda values: values[subset]
+        src = pick(batch['src'])
+        dst = pick(batch['dst'])
+        cost = pick(batch['cost'])
+        steps_after = pick(batch['steps_after'])
+        target_player = pick(batch['target_player'])
+        attacker_survived = pick(batch['attacker_survived'])
+        survivor_hp = pick(batch['survivor_hp'])
+        to_owner = pick(batch['to_owner'])
+        to_hp = survivor_hp
+        owner = batch['owner']
+        hp = batch['hp']
+        influence = batch['influence']
+
+        # 接近战略目标：仅当终点目标格易主后不再是目标时，走子后的距离图才在终点与走子前不同
+        before_obj_dist = influence.strategic_distance[src]
+        after_obj_dist = influence.strategic_distance_after(dst, pick(self._strategic_target_captured(player, batch)))
+        strategic_score = np.where(
+            after_obj_dist < before_obj_dist,
+            (before_obj_dist - after_obj_dist) * SCORE_APPROACH_STRATEGIC_PER_STEP,
+            np.where(after_obj_dist > before_obj_dist, SCORE_AWAY_FROM_STRATEGIC, 0),
+        )
+        score += strategic_score
+
+        chain_score = self._batch_chain_score(player, board_state, batch, subset)
+        score += chain_score
+
+        from_xs, from_ys = np.divmod(src, BOARD_SIZE)
+        to_xs, to_ys = np.divmod(dst, BOARD_SIZE)
+        if batch['threat_field'] is None:
+            batch['threat_field'] = self.build_threat_field(board_state)
+        threat_field = batch['threat_field']
+        ranked_reach = threat_field.ranked_reach()
+        enemy_steps = threat_field.enemy_steps
+        # 敌方压力为 0 的资产走子后也不受威胁，回防项为 0，不必逐个查询
+        pressure = influence.enemy_pressure(threat_field)
+        occupant_before = np.where(hp > 0, owner, 0)
+
+        def occupant_after(query):
+            return np.where(
+                query == dst,
+                np.where(to_hp > 0, to_owner, 0),
+                np.where(query == src, 0, occupant_before[query]),
+            )
+
+        def threat_after(query):
+            # query 可为 (资产数, 走法数) 的二维数组，一次查询多个资产
+            return self._batch_threat_against(
+                player, ranked_reach, enemy_steps, query, occupant_after(query), dst, to_owner, to_hp
+            )
+
+        # 保护己方首都
+        capital_guard_parts = []
+        own_capital = self.capitals.get(player)
+        if own_capital is not None:
+            capital_index = own_capital[0] * BOARD_SIZE + own_capital[1]
+            capital_guard_parts.append(np.where(src == capital_index, SCORE_LEAVE_CAPITAL_PENALTY, 0))
+
+            if pressure[capital_index] > 0:
+                cap_threat = threat_after(np.full(src.shape[0], capital_index))
+                before_own_dist = np.abs(from_xs - own_capital[0]) + np.abs(from_ys - own_capital[1])
+                after_own_dist = np.abs(to_xs - own_capital[0]) + np.abs(to_ys - own_capital[1])
+                capital_guard_parts.append(np.where(
+                    cap_threat > 0,
+                    np.where(
+                        after_own_dist < before_own_dist,
+                        SCORE_DEFEND_CAPITAL_APPROACH,
+                        np.where(after_own_dist > before_own_dist, SCORE_DEFEND_CAPITAL_AWAY, 0),
+                    ),
+                    0,
+                ))
+        for part in capital_guard_parts:
+            score += part
+
+        # 己方金矿受威胁时鼓励回防：受压金矿合并为一次二维查询
+        mine_cells = self.gold_mine_cells[pressure[self.gold_mine_cells] > 0]
+        defend_score = ()
+        if mine_cells.size:
+            owned_before = (owner[mine_cells] == player) & (hp[mine_cells] > 0)
+            query = np.broadcast_to(mine_cells[:, None], (mine_cells.shape[0], src.shape[0]))
+            owned_after = np.where(query == dst, attacker_survived, (query != src) & owned_before[:, None])
+            mine_threat = threat_after(query)
+            mine_xs, mine_ys = np.divmod(mine_cells[:, None], BOARD_SIZE)
+            before_mine_dist = np.abs(from_xs - mine_xs) + np.abs(from_ys - mine_ys)
+            after_mine_dist = np.abs(to_xs - mine_xs) + np.abs(to_ys - mine_ys)
+            defend_score = np.where(
+                owned_after & (mine_threat > 0),
+                np.where(after_mine_dist < before_mine_dist, 12, np.where(after_mine_dist > before_mine_dist, -8, 0)),
+                0,
+            )
+            # 按金矿顺序逐行累加，浮点结果与逐个金矿打分一致
+            for row in defend_score:
+                score += row
+
+        # 威胁评估
+        threat_hp = threat_after(dst)
+        risk_factor = pick(batch['risk_factor'])
+        high_threat = attacker_survived & (threat_hp >= survivor_hp) & (threat_hp > 0)
+        low_threat = attacker_survived & ~high_threat & (threat_hp > 0)
+        threat_penalty = np.where(
+            high_threat,
+            (SCORE_THREAT_BASE + (threat_hp - survivor_hp) * SCORE_THREAT_PER_HP_DIFF) * risk_factor,
+            np.where(
+                low_threat,
+                np.maximum(0, (threat_hp - survivor_hp * SCORE_THREAT_SURVIVOR_FACTOR) * SCORE_THREAT_LOW_PER_DIFF)
+                * risk_factor,
+                0,
+            ),
+        )
+        score -= threat_penalty
+
+        # 行动点效率
+        efficiency_penalty = (cost - 1) * SCORE_ACTION_POINT_EFFICIENCY
+        score -= efficiency_penalty
+        if terms is not None:
+            zero = np.zeros(src.shape[0])
+            terms['strategic'] = strategic_score
+            terms['chain'] = chain_score
+            terms['capital_guard'] = sum(capital_guard_parts, zero)
+            terms['mine_guard'] = sum(defend_score, zero)
+            terms['threat'] = 0.0 - threat_penalty
+            terms['efficiency'] = 0.0 - efficiency_penalty
+        return score
+
+    def _batch_chain_score(self, player, board_state, batch, subset=None):
+        """连击潜力（起点格走后仍归己方，终点格不是自身的落点，故可直接用走子前的归属）"""
+        if 'chain_score' not in batch:
+            chain_counts = self._chain_target_counts(player, board_state)
+            steps_after = batch['steps_after']
+            chain_targets = chain_counts[batch['dst'], np.minimum(steps_after, chain_counts.shape[1] - 1)]
+            batch['chain_score'] = np.where(
+                batch['attacker_survived'] & (steps_after > 0) & (chain_targets > 0),
+                np.minimum(SCORE_CHAIN_MAX, SCORE_CHAIN_BASE + chain_targets * SCORE_CHAIN_PER_TARGET),
+                0,
+            )
+        chain_score = batch['chain_score']
+        return chain_score if subset is None else chain_score[subset]
+
+    def _batch_score_upper_bound(self, player, board_state, batch, score):
+        """后半段各项的廉价上界：按与精确打分相同的顺序累加，每项取可能的最大值。
+
+        回防按"靠近即加分"计，威胁扣分按 0 计（战略距离与连击项直接用精确值）；
+        浮点加法单调，因此上界逐项不小于 _batch_score_tail 的精确结果。
+        """
+        src = batch['src']
+        dst = batch['dst']
+        attacker_survived = batch['attacker_survived']
+
+        influence = batch['influence']
+        before_obj_dist = influence.strategic_distance[src]
+        after_obj_dist = influence.strategic_distance_after(dst, self._strategic_target_captured(player, batch))
+        score += np.where(
+            after_obj_dist < before_obj_dist,
+            (before_obj_dist - after_obj_dist) * SCORE_APPROACH_STRATEGIC_PER_STEP,
+            np.where(after_obj_dist > before_obj_dist, SCORE_AWAY_FROM_STRATEGIC, 0),
+        )
+        score += self._batch_chain_score(player, board_state, batch)
+
+        from_xs, from_ys = np.divmod(src, BOARD_SIZE)
+        to_xs, to_ys = np.divmod(dst, BOARD_SIZE)
         own_capital = self.capitals.get(player)
-        if own_capital is not None and board_state[own_capital[0], own_capital[1], 0] != player:
+        if own_capital is not None:
+            capital_index = own_capital[0] * BOARD_SIZE + own_capital[1]
+            score += np.where(src == capital_index, SCORE_LEAVE_CAPITAL_PENALTY, 0)
+            before_own_dist = np.abs(from_xs - own_capital[0]) + np.abs(from_ys - own_capital[1])
+            after_own_dist = np.abs(to_xs - own_capital[0]) + np.abs(to_ys - own_capital[1])
+            score += np.where(after_own_dist < before_own_dist, SCORE_DEFEND_CAPITAL_APPROACH, 0)
+
+        for i, j in self.gold_mine_positions:
+            mine_index = i * BOARD_SIZE + j
+            owned_before = batch['owner'][mine_index] == player and batch['hp'][mine_index] > 0
+            owned_after = np.where(dst == mine_index, attacker_survived, (src != mine_index) & owned_before)
+            before_mine_dist = np.abs(from_xs - i) + np.abs(from_ys - j)
+            after_mine_dist = np.abs(to_xs - i) + np.abs(to_ys - j)
+            score += np.where(owned_after & (after_mine_dist < before_mine_dist), 12, 0)
+
+        score -= (batch['cost'] - 1) * SCORE_ACTION_POINT_EFFICIENCY
+        return score
+
+    def estimate_best_followup_score(self, player, board_state, move_count_state, steps_left, floor=-math.inf):
+        """最佳后续走法得分（含噪声），见 estimate_best_followup"""
+        return self.estimate_best_followup(player, board_state, move_count_state, steps_left, floor)[0]
+
+    def estimate_best_followup(self, player, board_state, move_count_state, steps_left, floor=-math.inf):
+        """最佳后续走法：返回 (得分（含噪声）, (起点, 终点))。
+
+        先用廉价上界给全部走法排序，按上界从高到低分批精确打分，剩余上界都不超过已得最好分时停止。
+        floor 为调用方关心的下限：所有上界都不超过 floor 时不再精确打分，直接返回上界最大值
+        （此时只保证它是上界，走法为 None）；否则结果与全部打分后取最大值相同。没有后续走法时返回 (0.0, None)。
+        """
+        if steps_left <= 0:
+            return 0.0, None
+
+        edge_ids = self.enumerate_ai_action_edges(player, board_state, move_count_state, steps_left)
+        if edge_ids.shape[0] == 0:
+            return 0.0, None
+        # 噪声按走法顺序一次抽完，随机数消耗与全量打分一致
+        noise = self.draw_score_noise(edge_ids.shape[0])
+        batch, head_score = self._batch_score_head(player, board_state, steps_left, edge_ids)
+        bounds = self._batch_score_upper_bound(player, board_state, batch, head_score.copy()) + noise
+        order = np.argsort(-bounds, kind='stable')
+        if bounds[order[0]] <= floor:
+            return float(bounds[order[0]]), None
+
+        best = -math.inf
+        best_edge = None
+        start = 0
+        chunk = FOLLOWUP_FIRST_CHUNK
+        while start < order.shape[0] and bounds[order[start]] > max(best, floor):
+            # 首批之后一次处理剩余全部仍可能更优的走法，精确打分的固定开销最多付两次
+            subset = order[start:start + chunk]
+            subset = subset[bounds[subset] > max(best, floor)]
+            scores = self._batch_score_tail(player, board_state, batch, head_score[subset], subset) + noise[subset]
+            top = int(np.argmax(scores))
+            # 同分取排序靠前者，与全部打分后取最大值的结果一致
+            if scores[top] > best:
+                best = float(scores[top])
+                best_edge = edge_ids[subset[top]]
+            start += chunk
+            chunk = order.shape[0]
+        return best, None if best_edge is None else self.edge_action(best_edge)
+
+    def evaluate_board_state(self, player, board_state, material=None):
+        """局面评估：material 为 BoardEvaluator 的格子部分（1/100 分），
+        搜索中沿路径增量累加后传入，省去全盘计算。"""
+        own_capital = self.capitals.get(player)
+        if own_capital is not None and board_state.owner[own_capital[0], own_capital[1]] != player:
             return -10**8
 
-        score = 0.0
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                owner, hp, city_type, _ = board_state[i, j]
-                has_mine = self.resource_map[i, j] == RESOURCE_GOLD_MINE
-                hp = int(hp)
-
-                if owner == player:
-                    score += 6 + hp * 1.35
-                    if city_type == CITY_CAPITAL:
-                        score += 260
-                    elif city_type == CITY_MAJOR:
-                        score += 72
-                    elif city_type == CITY_SMALL:
-                        score += 40
-                    if has_mine:
-                        score += 98
-                elif owner > 0:
-                    score -= 4 + hp * 1.1
-                    if city_type == CITY_CAPITAL:
-                        score -= 200
-                    elif city_type == CITY_MAJOR:
-                        score -= 52
-                    elif city_type == CITY_SMALL:
-                        score -= 28
-                    if has_mine:
-                        score -= 72
+        if material is None:
+            material = self.board_evaluator.material(player, board_state)
+        score = material / EVAL_SCALE
 
         enemy_caps_alive = 0
         for enemy, cap_pos in self.capitals.items():
             if enemy == player:
                 continue
-            if board_state[cap_pos[0], cap_pos[1], 0] == enemy:
+            if board_state.owner[cap_pos[0], cap_pos[1]] == enemy:
                 enemy_caps_alive += 1
         score += (3 - enemy_caps_alive) * 180
         return score
@@ -467,31 +1248,29 @@ class AIMixin:
         steps_left,
         limit=16,
         add_noise=True,
+        zone_plan=None,
     ):
-        ranked = []
-        for from_pos, to_pos in self.enumerate_ai_actions(player, board_state, move_count_state, steps_left):
-            action_score, simulated = self.score_ai_move(
-                player,
-                from_pos,
-                to_pos,
-                board_state,
-                move_count_state,
-                steps_left,
-                add_noise=add_noise,
-            )
-            if simulated is None:
-                continue
-            ranked.append((action_score, from_pos, to_pos, simulated))
-
-        ranked.sort(key=lambda item: item[0], reverse=True)
-        return ranked[:limit]
+        edge_ids = None
+        if zone_plan is not None:
+            # 分支较多时只对与士兵分区目标相关的走法打分
+            edge_ids = self.enumerate_ai_action_edges(player, board_state, move_count_state, steps_left)
+            if edge_ids.shape[0] > ZONE_PLAN_MIN_BRANCHING:
+                edge_ids = zone_plan.relevant_edges(self.move_edges, board_state, edge_ids, limit)
+        edge_ids, scores = self.score_ai_actions_batch(
+            player, board_state, move_count_state, steps_left, edge_ids=edge_ids
+        )
+        if add_noise:
+            scores = scores + self.draw_score_noise(scores.shape[0])
+        # 稳定排序：同分时保持枚举顺序
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return [(float(scores[index]),) + self.edge_action(edge_ids[index]) for index in order.tolist()]
 
     def _rank_enemy_counter_actions(self, player, board_state, per_enemy_limit=3):
-        enemy_steps = self.calculate_steps_per_turn()
+        enemy_steps = self.search_steps_per_turn()
         enemy_move_count = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
         counters = []
 
-        for enemy in self.players:
+        for enemy in self.search_players():
             if enemy == player:
                 continue
             ranked = self._rank_actions_for_player(
@@ -502,78 +1281,261 @@ class AIMixin:
                 limit=per_enemy_limit,
                 add_noise=False,
             )
-            for action_score, from_pos, to_pos, simulated in ranked:
-                counters.append((action_score, enemy, from_pos, to_pos, simulated))
+            for action_score, from_pos, to_pos in ranked:
+                counters.append((action_score, enemy, from_pos, to_pos))
 
         counters.sort(key=lambda item: item[0], reverse=True)
         return counters
 
-    def _alphabeta_value(self, player, board_state, move_count_state, steps_left, depth, alpha, beta, maximizing):
-        if depth <= 0:
-            return self.evaluate_board_state(player, board_state)
+    def prepare_move_ordering(self):
+        """新一次搜索前调用：杀手走法只在本次搜索内有效，历史分减半后继续沿用"""
+        self.killer_moves = {}
+        self.history_scores = {
+            action: score // 2 for action, score in self.history_scores.items() if score > 1
+        }
 
+    def _record_cutoff(self, killer_key, action, depth):
+        killers = self.killer_moves.setdefault(killer_key, [])
+        if action in killers:
+            killers.remove(action)
+        killers.insert(0, action)
+        del killers[KILLER_SLOTS:]
+        history_key = action[-2:]
+        self.history_scores[history_key] = self.history_scores.get(history_key, 0) + depth * depth
+
+    def _legal_killer_moves(self, player, board_state, move_count_state, steps_left, killer_key):
+        """同层杀手走法在当前局面仍合法的部分，无需打分即可先行搜索"""
+        killers = []
+        for action in self.killer_moves.get(killer_key, ()):
+            if killer_key[1]:
+                actor, from_pos, to_pos = player, action[0], action[1]
+                moves = self.get_possible_moves_for_state(actor, from_pos, board_state, move_count_state, steps_left)
+            else:
+                actor, from_pos, to_pos = action
+                if actor == player or actor not in self.search_players():
+                    continue
+                moves = self.get_possible_moves_for_state(
+                    actor,
+                    from_pos,
+                    board_state,
+                    np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int),
+                    self.search_steps_per_turn(),
+                )
+            if to_pos in moves:
+                killers.append(action)
+        return killers
+
+    def _ordered_node_actions(self, player, board_state, move_count_state, steps_left, maximizing, exclude):
+        """完整候选：批量评分取前若干个，去掉已搜索的杀手走法后按历史分排序（同分保持评分顺序）"""
         if maximizing:
             ranked = self._rank_actions_for_player(
                 player,
                 board_state,
                 move_count_state,
                 steps_left,
-                limit=8,
+                limit=self.ai_hard_node_beam,
                 add_noise=False,
+                zone_plan=self.zone_plan,
             )
-            if not ranked:
-                return self.evaluate_board_state(player, board_state)
+            actions = [(from_pos, to_pos) for _, from_pos, to_pos in ranked]
+        else:
+            counters = self._rank_enemy_counter_actions(
+                player, board_state, per_enemy_limit=self.ai_hard_enemy_beam
+            )
+            actions = [(enemy, from_pos, to_pos) for _, enemy, from_pos, to_pos in counters]
 
-            value = -10**9
-            for _, _, _, simulated in ranked:
-                child_value = self._alphabeta_value(
-                    player,
-                    simulated['board'],
-                    simulated['move_count'],
-                    simulated['steps_left'],
-                    depth - 1,
-                    alpha,
-                    beta,
-                    maximizing=False,
-                )
-                if child_value > value:
-                    value = child_value
-                if value > alpha:
-                    alpha = value
-                if beta <= alpha:
-                    break
+        history_scores = self.history_scores
+        actions = [action for action in actions if action not in exclude]
+        actions.sort(key=lambda action: history_scores.get(action[-2:], 0), reverse=True)
+        return actions
+
+    def _search_child(self, player, board_state, move_count_state, steps_left, depth, alpha, beta, maximizing, action,
+                      position_hash, material=None):
+        board_hash, move_hash = position_hash
+        if maximizing:
+            from_pos, to_pos = action
+            simulated, undo = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+            board_delta, move_delta = ZOBRIST_KEYS.move_delta(board_state, move_count_state, undo)
+            if material is not None:
+                material += self.board_evaluator.move_delta(player, board_state, undo)
+            child_value = self._alphabeta_value(
+                player,
+                board_state,
+                move_count_state,
+                simulated['steps_left'],
+                depth - 1,
+                alpha,
+                beta,
+                maximizing=False,
+                position_hash=(board_hash ^ board_delta, move_hash ^ move_delta),
+                material=material,
+            )
+            self.undo_ai_move(board_state, move_count_state, undo)
+            return child_value
+
+        # 敌方反制使用全新的移动计数网格，其哈希为 0
+        enemy, from_pos, to_pos = action
+        enemy_steps = self.search_steps_per_turn()
+        enemy_move_count = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+        _, undo = self.apply_ai_move(enemy, from_pos, to_pos, board_state, enemy_move_count, enemy_steps)
+        board_delta, move_delta = ZOBRIST_KEYS.move_delta(board_state, enemy_move_count, undo)
+        if material is not None:
+            material += self.board_evaluator.move_delta(player, board_state, undo)
+        child_value = self._alphabeta_value(
+            player,
+            board_state,
+            enemy_move_count,
+            steps_left,
+            depth - 1,
+            alpha,
+            beta,
+            maximizing=True,
+            position_hash=(board_hash ^ board_delta, move_delta),
+            material=material,
+        )
+        self.undo_ai_move(board_state, enemy_move_count, undo)
+        return child_value
+
+    def _alphabeta_value(
+        self,
+        player,
+        board_state,
+        move_count_state,
+        steps_left,
+        depth,
+        alpha,
+        beta,
+        maximizing,
+        position_hash=None,
+        material=None,
+    ):
+        """material 为当前局面的格子评估（见 BoardEvaluator），由上层沿路径增量维护；
+        为 None 时叶节点全盘计算"""
+        search_deadline = self.search_deadline
+        if search_deadline is not None and (time.perf_counter() > search_deadline or self.search_cancelled()):
+            raise SearchTimeout()
+
+        if position_hash is None:
+            position_hash = self.compute_position_hash(board_state, move_count_state)
+        board_hash, move_hash = position_hash
+        table = self.transposition_table
+        # 分区计划会裁剪己方节点的候选，不同计划下的同一局面不能共用记录
+        plan_key = None if self.zone_plan is None else self.zone_plan.key
+        table_key = (player, board_hash, move_hash, steps_left, maximizing, plan_key)
+
+        # 置换表命中：深度足够时按边界类型直接返回；否则至少复用上次的候选排序
+        entry = table.probe(table_key)
+        cached_actions = None
+        if entry is not None:
+            _, entry_depth, entry_value, entry_bound, cached_actions, _ = entry
+            if entry_depth >= depth:
+                if entry_bound == BOUND_EXACT:
+                    return entry_value
+                if entry_bound == BOUND_LOWER and entry_value >= beta:
+                    return entry_value
+                if entry_bound == BOUND_UPPER and entry_value <= alpha:
+                    return entry_value
+
+        if depth <= 0:
+            value = self.evaluate_board_state(player, board_state, material)
+            table.store(table_key, 0, value, BOUND_EXACT, cached_actions)
             return value
 
-        counters = self._rank_enemy_counter_actions(player, board_state, per_enemy_limit=3)
-        if not counters:
-            return self.evaluate_board_state(player, board_state)
+        alpha_start = alpha
+        beta_start = beta
+        killer_key = (depth, maximizing)
+
+        # 走法排序：置换表记录的顺序优先；否则先试仍合法的杀手走法，
+        # 只有它们没有引发剪枝时才对整个节点做批量评分
+        actions = cached_actions
+        complete = actions is not None
+        if not complete:
+            actions = self._legal_killer_moves(player, board_state, move_count_state, steps_left, killer_key)
+
+        value = -10**9 if maximizing else 10**9
+        best_index = 0
+        index = 0
+        while True:
+            if index >= len(actions):
+                if complete:
+                    break
+                complete = True
+                actions = actions + self._ordered_node_actions(
+                    player, board_state, move_count_state, steps_left, maximizing, actions
+                )
+                continue
 
-        value = 10**9
-        for _, _, _, _, simulated in counters:
-            child_value = self._alphabeta_value(
+            action = actions[index]
+            child_value = self._search_child(
                 player,
-                simulated['board'],
-                simulated['move_count'],
+                board_state,
+                move_count_state,
                 steps_left,
-                depth - 1,
+                depth,
                 alpha,
                 beta,
-                maximizing=True,
+                maximizing,
+                action,
+                position_hash,
+                material,
             )
-            if child_value < value:
-                value = child_value
-            if value < beta:
-                beta = value
+            if maximizing:
+                if child_value > value:
+                    value = child_value
+                    best_index = index
+                if value > alpha:
+                    alpha = value
+            else:
+                if child_value < value:
+                    value = child_value
+                    best_index = index
+                if value < beta:
+                    beta = value
             if beta <= alpha:
+                self._record_cutoff(killer_key, action, depth)
                 break
+            index += 1
+
+        if not actions:
+            value = self.evaluate_board_state(player, board_state, material)
+            table.store(table_key, depth, value, BOUND_EXACT, actions)
+            return value
+
+        # 最佳子节点前置，下一轮迭代加深优先搜索；杀手走法阶段就剪枝时候选不完整，不写入置换表
+        if complete:
+            if best_index > 0:
+                actions = [actions[best_index]] + actions[:best_index] + actions[best_index + 1:]
+        else:
+            actions = None
+
+        if value <= alpha_start:
+            bound = BOUND_UPPER
+        elif value >= beta_start:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        table.store(table_key, depth, value, bound, actions)
         return value
 
-    def choose_ai_action_easy(self, player):
-        ranked = self._rank_actions_for_player(
-            player,
+    def snapshot_search_position(self):
+        """复制搜索所需的局面：搜索在快照上原地走子/撤销，不会触碰真实棋盘"""
+        return make_search_position(
             self.board,
             self.move_count_grid,
             self.steps_left,
+            self.round_count,
+            self.players,
+            self.players_who_played_this_round,
+        )
+
+    def choose_ai_action_easy(self, player, position=None):
+        if position is None:
+            position = self.snapshot_search_position()
+        ranked = self._rank_actions_for_player(
+            player,
+            position['board'],
+            position['move_count'],
+            position['steps_left'],
             limit=12,
             add_noise=True,
         )
@@ -588,95 +1550,1024 @@ class AIMixin:
         picked = random.choices(pool, weights=weights, k=1)[0]
         return (picked[1], picked[2]), picked[0]
 
-    def choose_ai_action_normal(self, player):
-        first_actions = self.enumerate_ai_actions(player, self.board, self.move_count_grid, self.steps_left)
-        if not first_actions:
-            return None, None
+    def evaluate_followups(self, player, board_state, move_count_state, steps_left, candidates, seeds=None):
+        """按顺序为各候选 (首步得分, 起点, 终点) 计算 (最佳后续得分, 后续走法)。
 
-        beam_width = 16
-        candidates = []
-
-        for from_pos, to_pos in first_actions:
-            immediate_score, simulated = self.score_ai_move(
-                player, from_pos, to_pos, self.board, self.move_count_grid, self.steps_left
+        已算出的最好总分推出后续得分的下限，达不到的候选只得到上界（不会被选中）；
+        到达截止时间后剩余候选为 None。seeds 给出时每个候选先重设随机种子，
+        并行工作进程借此使结果与候选的分配方式无关。
+        """
+        results = []
+        best_total_score = -10**9
+        for index, (immediate_score, from_pos, to_pos) in enumerate(candidates):
+            # 到达截止时间后不再评估剩余候选，沿用已评估中的最佳者
+            if index > 0 and self.move_deadline_passed():
+                results.extend([None] * (len(candidates) - index))
+                break
+            if seeds is not None:
+                random.seed(seeds[index])
+            simulated, undo = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+            # 只有后续得分超过该下限才可能改变选择（留出浮点余量）
+            floor = (best_total_score - immediate_score) / FOLLOWUP_WEIGHT - 1e-6
+            followup = self.estimate_best_followup(
+                player, board_state, move_count_state, simulated['steps_left'], floor=floor
             )
-            if simulated is None:
-                continue
-            candidates.append((immediate_score, from_pos, to_pos, simulated))
-
+            self.undo_ai_move(board_state, move_count_state, undo)
+            best_total_score = max(best_total_score, immediate_score + FOLLOWUP_WEIGHT * followup[0])
+            results.append(followup)
+        return results
+
+    def choose_ai_action_normal(self, player, position=None):
+        if position is None:
+            position = self.snapshot_search_position()
+        board_state = position['board']
+        move_count_state = position['move_count']
+        steps_left = position['steps_left']
+
+        beam_width = self.ai_normal_beam
+        candidates = self._rank_actions_for_player(
+            player,
+            board_state,
+            move_count_state,
+            steps_left,
+            limit=beam_width,
+            add_noise=True,
+        )
         if not candidates:
             return None, None
 
-        candidates.sort(key=lambda item: item[0], reverse=True)
-        candidates = candidates[:beam_width]
+        followups = self._parallel_followups(player, position, candidates)
+        if followups is None:
+            followups = self.evaluate_followups(player, board_state, move_count_state, steps_left, candidates)
 
         best_action = None
+        best_followup = None
         best_total_score = -10**9
-
-        for immediate_score, from_pos, to_pos, simulated in candidates:
-            followup_score = self.estimate_best_followup_score(
-                player,
-                simulated['board'],
-                simulated['move_count'],
-                simulated['steps_left'],
-            )
-            total_score = immediate_score + 0.82 * followup_score
+        for (immediate_score, from_pos, to_pos), followup in zip(candidates, followups):
+            # 截止前没有算完的候选不参与比较
+            if followup is None:
+                continue
+            followup_score, followup_action = followup
+            total_score = immediate_score + FOLLOWUP_WEIGHT * followup_score
             if total_score > best_total_score:
                 best_total_score = total_score
                 best_action = (from_pos, to_pos)
+                best_followup = followup_action
 
+        if best_action is None:
+            # 截止前一个候选都没有算完：取排序第一的走法
+            best_total_score, from_pos, to_pos = candidates[0]
+            return (from_pos, to_pos), best_total_score
+        # 选中走法的后续得分必定是精确打分得出的，其对应走法即搜索假设的第二步
+        self.search_line = [] if best_followup is None else [best_followup]
         return best_action, best_total_score
 
-    def choose_ai_action_hard(self, player):
+    def _unit_edge_ids(self, player, board_state, steps_left, cell):
+        """格 cell 上的己方士兵在剩余行动点内的合法走法边"""
+        edges = self.move_edges
+        start = self.move_edge_offsets[cell]
+        end = self.move_edge_offsets[cell + 1]
+        dst = edges.dst[start:end]
+        own_soldier = (board_state.owner.reshape(-1)[dst] == player) & (board_state.hp.reshape(-1)[dst] > 0)
+        return np.arange(start, end)[(edges.cost[start:end] <= steps_left) & ~own_soldier]
+
+    def _collect_unit_chains(self, player, board_state, move_count_state, steps_left, threat_field, edge_id, score,
+                             prefix, chains):
+        """沿一个士兵连走：每步只对该士兵的走法批量打分（威胁场增量更新），正分链条收入 chains"""
+        from_pos, to_pos = self.edge_action(edge_id)
+        simulated, undo = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+        if simulated is None:
+            return
+        try:
+            moves = prefix.moves + [(from_pos, to_pos, float(score))]
+            chain = MoveChain(
+                moves,
+                prefix.cost + simulated['terrain_cost'],
+                prefix.value + float(score),
+                prefix.cells | {from_pos, to_pos},
+            )
+            if chain.value > 0:
+                chains.append(chain)
+
+            depth = len(moves)
+            if (
+                depth >= len(TURN_PLAN_BRANCHES)
+                or not simulated['attacker_survived']
+                or simulated['steps_left'] <= 0
+                or move_count_state[to_pos[0], to_pos[1]] >= 3
+            ):
+                return
+            edge_ids = self._unit_edge_ids(player, board_state, simulated['steps_left'], to_pos[0] * BOARD_SIZE + to_pos[1])
+            if edge_ids.shape[0] == 0:
+                return
+            next_field = threat_field.after_move(board_state, from_pos, to_pos)
+            edge_ids, scores = self.score_ai_actions_batch(
+                player, board_state, move_count_state, simulated['steps_left'], edge_ids=edge_ids, threat_field=next_field
+            )
+            for index in np.argsort(-scores, kind='stable')[:TURN_PLAN_BRANCHES[depth]].tolist():
+                self._collect_unit_chains(
+                    player,
+                    board_state,
+                    move_count_state,
+                    simulated['steps_left'],
+                    next_field,
+                    edge_ids[index],
+                    scores[index],
+                    chain,
+                    chains,
+                )
+        finally:
+            self.undo_ai_move(board_state, move_count_state, undo)
+
+    def plan_turn_knapsack(self, player, board_state, move_count_state, steps_left):
+        """整回合规划：为首步得分最高的若干士兵各枚举至多 3 步的连走链条，
+        再把行动点当作背包容量，在互不冲突的链条中选出总分最高的一组。
+
+        返回 [(起点, 终点, 得分), ...]，同一士兵的走法连续排列；没有正分链条时返回空列表。
+        """
+        threat_field = self.build_threat_field(board_state)
+        edge_ids, scores = self.score_ai_actions_batch(
+            player, board_state, move_count_state, steps_left, threat_field=threat_field
+        )
+        # 各士兵的首步候选，士兵按其首步最高分排序
+        first_moves = {}
+        src = self.move_edges.src[edge_ids]
+        for index in np.argsort(-scores, kind='stable').tolist():
+            candidates = first_moves.setdefault(int(src[index]), [])
+            if len(candidates) < TURN_PLAN_BRANCHES[0]:
+                candidates.append(index)
+
+        empty = MoveChain([], 0, 0.0, frozenset())
+        unit_chains = []
+        # 每个士兵至少花 1 点行动点，参与规划的士兵数不必超过剩余行动点
+        for candidates in list(first_moves.values())[:min(TURN_PLAN_UNITS, steps_left)]:
+            # 到达截止时间时只在已枚举的链条中规划
+            if self.move_deadline_passed():
+                break
+            chains = []
+            for index in candidates:
+                self._collect_unit_chains(
+                    player, board_state, move_count_state, steps_left, threat_field, edge_ids[index], scores[index],
+                    empty, chains,
+                )
+            unit_chains.append(chains)
+        return [move for chain in solve_turn_knapsack(unit_chains, steps_left) for move in chain.moves]
+
+    def find_forced_capital_line(self, player, board_state, move_count_state, steps_left):
+        """威胁空间搜索：本回合能必然攻陷敌方首都时返回该走子序列；
+        否则若己方首都会在敌方下一回合被必然攻陷，返回化解序列。都没有时返回 None。
+
+        查询没有结论（超出节点上限或到达截止时间）按未知处理：攻陷查询无结论时仍检查己方首都，
+        威胁查询无结论时返回 None 交回常规搜索，不当作首都安全。"""
+        search = ThreatSpaceSearch(self, deadline=self.move_deadline)
+        try:
+            line = search.find_capture(player, board_state, move_count_state, steps_left, self.search_players())
+        except ThreatSearchInconclusive:
+            line = None
+        if line is not None:
+            return line
+        enemies = [enemy for enemy in self.search_players() if enemy != player]
+        try:
+            _, defense = search.find_defense(
+                player, board_state, move_count_state, steps_left, enemies, self.search_steps_per_turn()
+            )
+        except ThreatSearchInconclusive:
+            return None
+        return defense
+
+    def choose_forced_capital_action(self, player, board_state, move_count_state, steps_left):
+        """有必胜或必须化解的首都序列时返回 (首步, 走完整个序列后的局面评估)，序列其余各步记入 search_line；
+        否则返回 None"""
+        line = self.find_forced_capital_line(player, board_state, move_count_state, steps_left)
+        if line is None:
+            return None
+        self.search_line = line[1:]
+        undo_stack = []
+        for from_pos, to_pos in line:
+            simulated, undo = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+            undo_stack.append(undo)
+            steps_left = simulated['steps_left']
+        value = self.evaluate_board_state(player, board_state)
+        for undo in reversed(undo_stack):
+            self.undo_ai_move(board_state, move_count_state, undo)
+        return line[0], value
+
+    def choose_endgame_action(self, player, position):
+        """残局（全场士兵很少且有士兵逼近首都）时精确求解：返回 (走法, 评估)，走法为 None 表示结束回合。
+        不在残局、或节点预算内搜不到足够深度且未分出胜负时返回 None，交回常规搜索。
+
+        轮次、存活玩家与本轮已行动的玩家都取自局面快照：预思考的局面在真实对局之前，不能读当前状态。"""
+        board_state = position['board']
+        if not self.endgame_solver_enabled or count_live_units(board_state) > ENDGAME_UNIT_LIMIT:
+            return None
+        round_count = position['round_count']
+        players = position['players']
+        solver = EndgameSolver(self, time_budget_ms=self.remaining_move_budget_ms(self.ai_search_budget_ms))
+        if not solver.is_capital_race(player, board_state, self.steps_per_turn_for_round(round_count), players):
+            return None
+        result = solver.solve(
+            player,
+            board_state,
+            position['move_count'],
+            position['steps_left'],
+            round_count,
+            players,
+            position['played'],
+        )
+        self.ai_search_nodes += solver.nodes
+        if result is None:
+            return None
+        action, value, depth = result
+        if depth < ENDGAME_MIN_PLIES and abs(value) < ENDGAME_WIN // 2:
+            return None
+        return (None if action == END_TURN else action), value
+
+    def choose_ai_action_hard(self, player, time_budget_ms=None, position=None):
+        if position is None:
+            position = self.snapshot_search_position()
+        board_state = position['board']
+        move_count_state = position['move_count']
+        steps_left = position['steps_left']
+
+        # 先做威胁空间搜索：能必然攻陷首都（或必须化解首都威胁）时不再进入主搜索
+        forced = self.choose_forced_capital_action(player, board_state, move_count_state, steps_left)
+        if forced is not None:
+            return forced
+        endgame = self.choose_endgame_action(player, position)
+        if endgame is not None:
+            return endgame
+
+        zone_plan = self.plan_zone_objectives(player, board_state)
         ranked = self._rank_actions_for_player(
             player,
-            self.board,
-            self.move_count_grid,
-            self.steps_left,
-            limit=10,
+            board_state,
+            move_count_state,
+            steps_left,
+            limit=self.ai_hard_root_beam,
             add_noise=False,
+            zone_plan=zone_plan,
         )
         if not ranked:
             return None, None
 
+        if time_budget_ms is None:
+            time_budget_ms = self.remaining_move_budget_ms(self.ai_search_budget_ms)
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+
+        # 超时中断会在棋盘上残留未撤销的走子，搜索用副本，保持快照完整
+        board_state = board_state.copy()
+        move_count_state = move_count_state.copy()
+        self.prepare_transposition_table()
+        self.prepare_move_ordering()
+        position_hash = self.compute_position_hash(board_state, move_count_state)
+
+        # 迭代加深：第 1 层总是完整搜完（本步有截止时间时除外）；之后每层都在截止时间内尝试，超时则沿用上一层的结果
+        root_moves = ranked
+        parallel_result = self._parallel_deepen_root_moves(player, position, root_moves, time_budget_ms)
+        if parallel_result is not None:
+            return parallel_result
+
+        best_action = None
+        best_value = None
+        # 搜索中己方节点沿用根节点的分区计划
+        self.zone_plan = zone_plan
+        try:
+            for depth in range(1, self.ai_search_max_depth + 1):
+                self.search_deadline = None if depth == 1 and self.move_deadline is None else deadline
+                try:
+                    best_action, best_value, root_moves = self._search_root(
+                        player,
+                        root_moves,
+                        board_state,
+                        move_count_state,
+                        steps_left,
+                        position_hash,
+                        depth,
+                    )
+                except SearchTimeout:
+                    # 超时中断的这一层结果不完整，沿用上一层
+                    break
+                finally:
+                    self.search_deadline = None
+                if time.perf_counter() >= deadline or self.search_cancelled():
+                    break
+        finally:
+            self.zone_plan = None
+
+        if best_action is None:
+            # 第 1 层都没搜完：沿用根节点排序的最佳走法
+            best_value, from_pos, to_pos = ranked[0]
+            best_action = (from_pos, to_pos)
+        return best_action, best_value
+
+    def _parallel_followups(self, player, position, candidates):
+        """普通难度根节点并行，返回各候选的 (后续得分, 后续走法)，截止前没有算完的候选为 None；
+        未开启或进程池故障时返回 None 走串行路径"""
+        parallel_search = self.get_parallel_search()
+        if parallel_search is None:
+            return None
+
+        # 各任务的随机种子由主进程随机数派生，保证同一随机状态下结果可复现
+        seed = random.getrandbits(32)
+        try:
+            return parallel_search.followups(
+                position,
+                player,
+                candidates,
+                seed,
+                self.parallel_deadline(),
+                self.export_search_settings(),
+                self.search_cancelled,
+            )
+        except (BrokenProcessPool, OSError):
+            self._disable_parallel_search()
+            return None
+
+    def _parallel_deepen_root_moves(self, player, position, root_moves, time_budget_ms):
+        """困难难度根节点并行：各根走法独立迭代加深，取全部根走法都完成的最深一层比较。
+
+        与串行路径相同，第 1 层只在本步有截止时间时受限；有根走法连第 1 层都没搜完（超时或被中断）时
+        沿用根节点排序的最佳走法。未开启或进程池故障时返回 None 走串行路径。
+        """
+        parallel_search = self.get_parallel_search()
+        if parallel_search is None:
+            return None
+
+        deadline = time.time() + time_budget_ms / 1000.0
+        first_deadline = None if self.move_deadline is None else deadline
+        try:
+            depth_values = parallel_search.deepen_root_moves(
+                position,
+                player,
+                root_moves,
+                deadline,
+                first_deadline,
+                self.export_search_settings(),
+                self.search_cancelled,
+            )
+        except (BrokenProcessPool, OSError):
+            self._disable_parallel_search()
+            return None
+
+        common_depth = min(len(values) if values else 0 for values in depth_values)
+        if common_depth == 0:
+            best_value, from_pos, to_pos = root_moves[0]
+            return (from_pos, to_pos), best_value
+
+        best_action = None
+        best_value = -10**9
+        for (immediate_score, from_pos, to_pos), values in zip(root_moves, depth_values):
+            combined = values[common_depth - 1] + immediate_score * 0.2
+            if combined > best_value:
+                best_value = combined
+                best_action = (from_pos, to_pos)
+        return best_action, best_value
+
+    def _search_root(self, player, root_moves, board_state, move_count_state, steps_left, position_hash, depth):
+        """按给定顺序搜索根节点，返回最佳动作、评估值及按本轮评估重排后的根走法"""
+        board_hash, move_hash = position_hash
+        material = self.board_evaluator.material(player, board_state)
         best_action = None
         best_value = -10**9
         alpha = -10**9
         beta = 10**9
+        root_values = []
 
-        for immediate_score, from_pos, to_pos, simulated in ranked:
+        for immediate_score, from_pos, to_pos in root_moves:
+            simulated, undo = self.apply_ai_move(
+                player, from_pos, to_pos, board_state, move_count_state, steps_left
+            )
+            board_delta, move_delta = ZOBRIST_KEYS.move_delta(board_state, move_count_state, undo)
             reply_value = self._alphabeta_value(
                 player,
-                simulated['board'],
-                simulated['move_count'],
+                board_state,
+                move_count_state,
                 simulated['steps_left'],
-                depth=1,
+                depth=depth,
                 alpha=alpha,
                 beta=beta,
                 maximizing=False,
+                position_hash=(board_hash ^ board_delta, move_hash ^ move_delta),
+                material=material + self.board_evaluator.move_delta(player, board_state, undo),
             )
+            self.undo_ai_move(board_state, move_count_state, undo)
             combined = reply_value + immediate_score * 0.2
+            root_values.append((combined, immediate_score, from_pos, to_pos))
             if combined > best_value:
                 best_value = combined
                 best_action = (from_pos, to_pos)
             if best_value > alpha:
                 alpha = best_value
 
-        return best_action, best_value
+        root_values.sort(key=lambda item: item[0], reverse=True)
+        reordered = [(immediate_score, from_pos, to_pos) for _, immediate_score, from_pos, to_pos in root_values]
+        return best_action, best_value, reordered
+
+    def _light_policy_weights(self, player, board_state, edge_ids):
+        """模拟用的轻量策略：只看终点格归属与血量，不调用完整评分"""
+        edges = self.move_edges
+        owner = board_state.owner.reshape(-1)
+        hp = board_state.hp.reshape(-1)
+        src = edges.src[edge_ids]
+        dst = edges.dst[edge_ids]
+        source_hp = hp[src]
+        target_owner = owner[dst]
+        target_hp = hp[dst]
+
+        enemy_unit = (target_owner > 0) & (target_owner != player) & (target_hp > 0)
+        weights = np.ones(edge_ids.shape[0], dtype=float)
+        weights += np.where(enemy_unit & (source_hp > target_hp), MCTS_POLICY_WIN_WEIGHT, 0.0)
+        weights += np.where(
+            self.strategic_cell_mask[dst] & (target_owner != player) & ~enemy_unit,
+            MCTS_POLICY_STRATEGIC_WEIGHT,
+            0.0,
+        )
+        return np.where(enemy_unit & (source_hp < target_hp), MCTS_POLICY_LOSING_WEIGHT, weights)
 
-    def choose_ai_action(self, player):
+    def _light_playout(self, player, board_state, move_count_state, steps_left, max_moves, undo_stack, perspective):
+        """轻量策略连走若干步，撤销记录压入 undo_stack；返回以 perspective 一方计的格子评估增量"""
+        material_delta = 0
+        for _ in range(max_moves):
+            if steps_left <= 0:
+                break
+            edge_ids = self.enumerate_ai_action_edges(player, board_state, move_count_state, steps_left)
+            if edge_ids.shape[0] == 0:
+                break
+            cumulative = np.cumsum(self._light_policy_weights(player, board_state, edge_ids))
+            index = int(np.searchsorted(cumulative, random.random() * cumulative[-1], side='right'))
+            from_pos, to_pos = self.edge_action(edge_ids[min(index, edge_ids.shape[0] - 1)])
+            simulated, undo = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+            if simulated is None:
+                break
+            undo_stack.append((move_count_state, undo))
+            material_delta += self.board_evaluator.move_delta(perspective, board_state, undo)
+            steps_left = simulated['steps_left']
+        return material_delta
+
+    def _mcts_rollout(self, player, board_state, move_count_state, steps_left, root_value, material):
+        """走完己方剩余步数，再让每个敌方用轻量策略反击几步，按局面评估给出 [0, 1] 收益"""
+        undo_stack = []
+        material += self._light_playout(
+            player, board_state, move_count_state, steps_left, steps_left, undo_stack, player
+        )
+        enemy_steps = self.search_steps_per_turn()
+        for enemy in self.search_players():
+            if enemy == player:
+                continue
+            enemy_move_count = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+            material += self._light_playout(
+                enemy, board_state, enemy_move_count, enemy_steps, MCTS_ENEMY_ROLLOUT_STEPS, undo_stack, player
+            )
+        value = self.evaluate_board_state(player, board_state, material)
+        for grid, undo in reversed(undo_stack):
+            self.undo_ai_move(board_state, grid, undo)
+        return 0.5 + 0.5 * np.tanh((value - root_value) / MCTS_VALUE_SCALE)
+
+    def _mcts_tree_key(self, player, board_state, move_count_state, steps_left):
+        board_hash, move_hash = self.compute_position_hash(board_state, move_count_state)
+        return (player, self.search_round_count(), tuple(self.search_players()), board_hash, move_hash, steps_left)
+
+    def choose_ai_action_mcts(self, player, position=None, time_budget_ms=None, rollout_budget=None):
+        """蒙特卡洛树搜索：树内按 UCT 选择己方本回合的连续走子，叶节点用轻量策略模拟。
+
+        同一回合内，选中走法对应的子树会保存下来，下一步局面与预测一致时直接作为新根继续搜索。
+        """
+        if position is None:
+            position = self.snapshot_search_position()
+        board_state = position['board']
+        move_count_state = position['move_count']
+        steps_left = position['steps_left']
+        if time_budget_ms is None:
+            time_budget_ms = self.remaining_move_budget_ms(self.ai_mcts_budget_ms)
+        if rollout_budget is None:
+            rollout_budget = self.ai_mcts_rollouts
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+
+        forced = self.choose_forced_capital_action(player, board_state, move_count_state, steps_left)
+        if forced is None:
+            forced = self.choose_endgame_action(player, position)
+        if forced is not None:
+            self.mcts_tree = None
+            return forced
+
+        tree_key = self._mcts_tree_key(player, board_state, move_count_state, steps_left)
+        root = None
+        if self.mcts_tree is not None and self.mcts_tree[0] == tree_key:
+            root = self.mcts_tree[1]
+        if root is None:
+            root = MCTSNode()
+        root_material = self.board_evaluator.material(player, board_state)
+        root_value = self.evaluate_board_state(player, board_state, root_material)
+        zone_plan = self.plan_zone_objectives(player, board_state)
+
+        rollouts = 0
+        while rollouts < rollout_budget and (
+            rollouts == 0 or (time.perf_counter() < deadline and not self.search_cancelled())
+        ):
+            node = root
+            node_steps = steps_left
+            node_material = root_material
+            path_undo = []
+
+            # 选择：沿完全展开的节点按 UCT 下行
+            while node.is_fully_expanded() and node.children:
+                node = node.select_child(MCTS_EXPLORATION)
+                simulated, undo = self.apply_ai_move(
+                    player, node.action[0], node.action[1], board_state, move_count_state, node_steps
+                )
+                path_undo.append(undo)
+                node_material += self.board_evaluator.move_delta(player, board_state, undo)
+                node_steps = simulated['steps_left']
+
+            # 展开：候选按批量评分取前若干个
+            if node.untried is None:
+                ranked = []
+                if node_steps > 0:
+                    ranked = self._rank_actions_for_player(
+                        player,
+                        board_state,
+                        move_count_state,
+                        node_steps,
+                        limit=MCTS_BRANCH_LIMIT,
+                        add_noise=False,
+                        zone_plan=zone_plan,
+                    )
+                node.untried = [(from_pos, to_pos) for _, from_pos, to_pos in reversed(ranked)]
+            if node.untried:
+                action = node.untried.pop()
+                simulated, undo = self.apply_ai_move(
+                    player, action[0], action[1], board_state, move_count_state, node_steps
+                )
+                path_undo.append(undo)
+                node_material += self.board_evaluator.move_delta(player, board_state, undo)
+                node_steps = simulated['steps_left']
+                node = node.expand(action)
+
+            reward = self._mcts_rollout(
+                player, board_state, move_count_state, node_steps, root_value, node_material
+            )
+            node.backpropagate(reward)
+            for undo in reversed(path_undo):
+                self.undo_ai_move(board_state, move_count_state, undo)
+            rollouts += 1
+        self.ai_search_nodes += rollouts
+
+        best_child = root.most_visited_child()
+        if best_child is None:
+            self.mcts_tree = None
+            return None, None
+
+        # 保存选中走法的子树，键为走子后的预测局面
+        simulated, undo = self.apply_ai_move(
+            player, best_child.action[0], best_child.action[1], board_state, move_count_state, steps_left
+        )
+        child_key = self._mcts_tree_key(player, board_state, move_count_state, simulated['steps_left'])
+        self.undo_ai_move(board_state, move_count_state, undo)
+        self.mcts_tree = (child_key, best_child.detach())
+        return best_child.action, best_child.mean_value() * 100
+
+    def lookup_opening_book(self, player, board_state, move_count_state, steps_left):
+        """前若干轮查开局库：命中且在当前局面合法时返回 ((起点, 终点), 评估)，否则返回 None"""
+        if not self.opening_book_enabled or self.search_round_count() > OPENING_BOOK_ROUNDS:
+            return None
+        key = opening_position_key(self, player, board_state, move_count_state, steps_left)
+        if key is None:
+            return None
+        entry = get_opening_book().lookup(key)
+        if entry is None:
+            return None
+        flips = canonical_flips(self.capitals[player])
+        from_pos = to_canonical(entry[0], flips)
+        to_pos = to_canonical(entry[1], flips)
+        if to_pos not in self.get_possible_moves_for_state(player, from_pos, board_state, move_count_state, steps_left):
+            return None
+        return (from_pos, to_pos), entry[2]
+
+    def choose_ai_action(self, player, position=None):
+        """按当前难度决策，返回 (走法, 评估)；搜索评估过的己方后续走法记入 search_line"""
+        self.search_line = []
         difficulty = getattr(self, 'ai_difficulty', AI_DIFFICULTY_NORMAL)
         if difficulty == AI_DIFFICULTY_EASY:
-            return self.choose_ai_action_easy(player)
+            return self.choose_ai_action_easy(player, position=position)
+        # 简单难度本就不搜索；其余难度先查开局库
+        if position is None:
+            position = self.snapshot_search_position()
+        book_entry = self.lookup_opening_book(
+            player, position['board'], position['move_count'], position['steps_left']
+        )
+        if book_entry is not None:
+            return book_entry
         if difficulty == AI_DIFFICULTY_HARD:
-            return self.choose_ai_action_hard(player)
-        return self.choose_ai_action_normal(player)
+            return self.choose_ai_action_hard(player, position=position)
+        if difficulty == AI_DIFFICULTY_MCTS:
+            return self.choose_ai_action_mcts(player, position=position)
+        return self.choose_ai_action_normal(player, position=position)
+
+    def explain_ai_candidates(self, player, board_state, move_count_state, steps_left, limit, chosen=None):
+        """按不加噪声的批量打分取前 limit 个候选并给出分项得分；chosen 不在其中时追加在末尾。
+
+        只在决策追踪时调用，不消耗随机数，不影响对局的可复现性。
+        """
+        terms = {}
+        edge_ids, scores = self.score_ai_actions_batch(player, board_state, move_count_state, steps_left, terms=terms)
+        picked = np.argsort(-scores, kind='stable')[:limit].tolist()
+        if chosen is not None:
+            edges = self.move_edges
+            match = np.nonzero(
+                (edges.src[edge_ids] == chosen[0][0] * BOARD_SIZE + chosen[0][1])
+                & (edges.dst[edge_ids] == chosen[1][0] * BOARD_SIZE + chosen[1][1])
+            )[0].tolist()
+            if match and match[0] not in picked:
+                picked.append(match[0])
+
+        candidates = []
+        for index in picked:
+            from_pos, to_pos = self.edge_action(edge_ids[index])
+            candidates.append({
+                'from': list(from_pos),
+                'to': list(to_pos),
+                'score': round(float(scores[index]), 2),
+                'terms': {name: round(float(terms[name][index]), 2) for name in SCORE_TERMS},
+                'chosen': (from_pos, to_pos) == chosen,
+            })
+        return candidates
+
+    def _trace_decision(self, tracer, player, position, action, value, elapsed, nodes):
+        """写入一条决策记录；nodes 为本次决策的展开节点数（见 ai_search_nodes，不含并行工作进程）"""
+        tracer.record({
+            'round': position['round_count'],
+            'player': player,
+            'difficulty': getattr(self, 'ai_difficulty', AI_DIFFICULTY_NORMAL),
+            'steps_left': position['steps_left'],
+            'action': None if action is None else [list(action[0]), list(action[1])],
+            'value': None if value is None else round(float(value), 2),
+            'nodes': nodes,
+            'wall_ms': round(elapsed * 1000.0, 2),
+            'candidates': self.explain_ai_candidates(
+                player,
+                position['board'],
+                position['move_count'],
+                position['steps_left'],
+                tracer.top_n,
+                chosen=action,
+            ),
+        })
+
+    def plan_ai_turn(self, player, position=None, time_budget_ms=None, cancel=None):
+        """规划本回合的连续行动：首步由当前难度完整搜索得出，后续只收入搜索实际评估过的己方走法
+        （普通难度的最佳后续走法或整回合背包规划、威胁空间搜索的必胜/化解序列、开局库），
+        其余步数轮到时重新搜索。
+
+        返回 [(起点, 终点, 评估, 走前剩余步数, 起点格(归属, 血量), 终点格(归属, 血量)), ...]，
+        后两项用于执行前校验实际棋盘是否仍与预测一致。
+
+        time_budget_ms 为本次规划的时间上限：各阶段的搜索只用截止前剩余的时间，到点即沿用已有的最佳结果；
+        计划在截止时截断，其余步数轮到时重新规划。cancel（threading.Event）被置位时按已到截止时间处理，
+        后台任务借此尽快让出工作线程，其结果由调用方丢弃。
+        """
+        if position is None:
+            position = self.snapshot_search_position()
+        self.move_deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000.0
+        self.search_cancel = cancel
+        self.search_context = (threading.get_ident(), position)
+        try:
+            return self._plan_ai_turn(player, position)
+        finally:
+            self.move_deadline = None
+            self.search_cancel = None
+            self.search_context = None
+
+    def _plan_ai_turn(self, player, position):
+        board_state = position['board']
+        move_count_state = position['move_count']
+        steps_left = position['steps_left']
+
+        # 人类回合中已对同一局面预思考过时直接复用
+        cached_plan = self.ponder_cache.get(self.ponder_key(player, position))
+        if cached_plan is not None:
+            return list(cached_plan)
+
+        tracer = self.decision_tracer
+        if tracer is not None:
+            started = time.perf_counter()
+            search_nodes = self.ai_search_nodes
+        best_action, plan_score = self.choose_ai_action(player, position=position)
+        if tracer is not None:
+            self._trace_decision(
+                tracer,
+                player,
+                position,
+                best_action,
+                plan_score,
+                time.perf_counter() - started,
+                self.ai_search_nodes - search_nodes,
+            )
+        if best_action is None:
+            return []
+
+        plan = []
+        difficulty = getattr(self, 'ai_difficulty', AI_DIFFICULTY_NORMAL)
+        # 普通难度首步之后按剩余局面做一次整回合背包规划，依次取用；其余难度沿用搜索评估过的后续走法。
+        # 困难难度的搜索树里己方走一步即轮到敌方反制，没有可沿用的己方后续，因此逐步重新搜索
+        # （逐步搜索与接背包规划的自对弈结果相当，逐步搜索略优）
+        knapsack = difficulty == AI_DIFFICULTY_NORMAL and self.turn_knapsack_enabled
+        followups = [] if knapsack else list(self.search_line)
+        queued = None
+        while True:
+            from_pos, to_pos = best_action
+            plan.append((
+                from_pos,
+                to_pos,
+                plan_score,
+                steps_left,
+                board_state.cell(*from_pos)[:2],
+                board_state.cell(*to_pos)[:2],
+            ))
+            # 简单难度每步只需一次排序且带随机性；蒙特卡洛难度逐步搜索并复用子树。二者都不做整回合规划
+            if difficulty in (AI_DIFFICULTY_EASY, AI_DIFFICULTY_MCTS) or self.move_deadline_passed():
+                break
+            simulated, _ = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+            if simulated is None or simulated['steps_left'] <= 0:
+                break
+            steps_left = simulated['steps_left']
+            if followups:
+                from_pos, to_pos = followups.pop(0)
+                if to_pos not in self.get_possible_moves_for_state(
+                    player, from_pos, board_state, move_count_state, steps_left
+                ):
+                    break
+                best_action = (from_pos, to_pos)
+                continue
+            book_entry = self.lookup_opening_book(player, board_state, move_count_state, steps_left)
+            if book_entry is not None:
+                best_action, plan_score = book_entry
+                queued = None
+                continue
+            if knapsack:
+                if queued is None:
+                    queued = self.plan_turn_knapsack(player, board_state, move_count_state, steps_left)
+                if queued:
+                    from_pos, to_pos, plan_score = queued.pop(0)
+                    if to_pos in self.get_possible_moves_for_state(
+                        player, from_pos, board_state, move_count_state, steps_left
+                    ):
+                        best_action = (from_pos, to_pos)
+                        continue
+                    queued = []
+            # 搜索没有评估过的后续步不进计划，轮到时按实际局面重新搜索
+            break
+        return plan
+
+    def store_turn_plan(self, player, plan):
+        self.turn_plan = {
+            'key': (self.ai_decision_generation, player, self.round_count),
+            'history': len(self.move_history),
+            'steps': plan,
+        }
+
+    def peek_planned_action(self):
+        """校验计划中的下一步：局面未按预测发展或走法已不合法时返回 None，需重新搜索"""
+        plan = self.turn_plan
+        if plan is None:
+            return None
+        if plan['key'] != (self.ai_decision_generation, self.current_player, self.round_count):
+            return None
+        index = len(self.move_history) - plan['history']
+        if index < 0 or index >= len(plan['steps']):
+            return None
+
+        from_pos, to_pos, plan_score, steps_left, from_cell, to_cell = plan['steps'][index]
+        if steps_left != self.steps_left:
+            return None
+        if self.board.cell(*from_pos)[:2] != from_cell:
+            return None
+        if self.board.cell(*to_pos)[:2] != to_cell:
+            return None
+        moves = self.get_possible_moves_for_state(
+            self.current_player, from_pos, self.board, self.move_count_grid, self.steps_left
+        )
+        if to_pos not in moves:
+            return None
+        return (from_pos, to_pos), plan_score
+
+    def ai_decision_key(self):
+        """后台决策的有效性标识：开局重置、换人或局面推进后与提交时不一致，结果作废"""
+        return (
+            self.ai_decision_generation,
+            self.current_player,
+            self.round_count,
+            self.steps_left,
+            len(self.move_history),
+        )
+
+    def get_ai_decision_executor(self):
+        # 决策与预思考共用单个工作线程；主线程要自己搜索或改动搜索状态前先调用 stop_background_ai
+        if self.ai_decision_executor is None:
+            self.ai_decision_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-decision')
+        return self.ai_decision_executor
+
+    def ai_think_budget_ms(self, due_ms, now):
+        """距本步执行时刻还剩的思考时间，扣除轮询与收尾的余量"""
+        return max(AI_MIN_THINK_BUDGET_MS, due_ms - now - AI_DEADLINE_MARGIN_MS)
+
+    def fallback_turn_plan(self, player, position):
+        """兜底计划：批量评分最高的一步（格式同 plan_ai_turn），后台决策到执行时刻仍未返回时采用。
+
+        只做一次批量评分，不碰置换表、杀手/历史表等搜索状态，工作线程正在搜索时也可在主线程上计算。"""
+        board_state = position['board']
+        steps_left = position['steps_left']
+        ranked = self._rank_actions_for_player(
+            player, board_state, position['move_count'], steps_left, limit=1, add_noise=False
+        )
+        if not ranked:
+            return []
+        score, from_pos, to_pos = ranked[0]
+        return [(from_pos, to_pos, score, steps_left, board_state.cell(*from_pos)[:2], board_state.cell(*to_pos)[:2])]
+
+    def submit_ai_decision(self, player, time_budget_ms=None):
+        """在后台线程上对局面快照做决策，主线程继续绘制与处理事件。
+
+        返回并记录 (决策标识, future, 中断标志, 兜底计划)。"""
+        position = self.snapshot_search_position()
+        fallback = self.fallback_turn_plan(player, position)
+        cancel = threading.Event()
+        future = self.get_ai_decision_executor().submit(self.plan_ai_turn, player, position, time_budget_ms, cancel)
+        self.pending_ai_decision = (self.ai_decision_key(), future, cancel, fallback)
+        return self.pending_ai_decision
+
+    def cancel_ai_decision(self):
+        # 提升代数使结果在轮询时被丢弃；正在执行的搜索在下一次检查截止时间时中断
+        self.ai_decision_generation += 1
+        self.turn_plan = None
+        self.mcts_tree = None
+        if self.pending_ai_decision is not None:
+            self.pending_ai_decision[1].cancel()
+            self.pending_ai_decision[2].set()
+            self.pending_ai_decision = None
+
+    def stop_background_ai(self):
+        """中断后台的决策与预思考并等待工作线程空闲。之后主线程可以直接搜索或重建搜索缓存，
+        不会与工作线程同时改动置换表、杀手/历史表、分区计划与截止时间等搜索状态。"""
+        if self.pending_ai_decision is not None:
+            self.pending_ai_decision[1].cancel()
+            self.pending_ai_decision[2].set()
+            self.pending_ai_decision = None
+        self.cancel_pondering()
+        if self.ai_decision_executor is not None:
+            # 单个工作线程按提交顺序执行，空任务完成即说明此前的任务都已结束或被取消
+            self.ai_decision_executor.submit(int).result()
+
+    def ponder_key(self, player, position):
+        """预思考缓存的键：难度 + 局面快照（含轮次、存活玩家与本轮已行动的玩家）"""
+        board_hash, move_hash = self.compute_position_hash(position['board'], position['move_count'])
+        return (
+            getattr(self, 'ai_difficulty', AI_DIFFICULTY_NORMAL),
+            player,
+            position['round_count'],
+            position['players'],
+            position['played'],
+            board_hash,
+            move_hash,
+            position['steps_left'],
+        )
+
+    def cancel_pondering(self):
+        if self.ponder_task is not None:
+            self.ponder_task[4].cancel()
+            self.ponder_task[5].set()
+        self.ponder_task = None
+        self.ponder_next = None
+        self.ponder_origin = None
+
+    def _next_ponder_position(self, player, position, plan):
+        """按计划走完后推测下一个需要决策的 AI 局面：本方还有步数则继续本方，否则轮到本轮下一个 AI"""
+        board_state = position['board'].copy()
+        move_count_state = position['move_count'].copy()
+        steps_left = position['steps_left']
+        for from_pos, to_pos, *_ in plan:
+            simulated, _ = self.apply_ai_move(player, from_pos, to_pos, board_state, move_count_state, steps_left)
+            if simulated is None:
+                return None
+            steps_left = simulated['steps_left']
+        if plan and steps_left > 0:
+            return player, make_search_position(
+                board_state,
+                move_count_state,
+                steps_left,
+                position['round_count'],
+                position['players'],
+                position['played'],
+            )
+
+        # 轮末会进入生产阶段，只推演本轮剩余的 AI
+        players = position['players']
+        index = players.index(player) + 1
+        if index >= len(players) or players[index] not in self.ai_players:
+            return None
+        return players[index], make_search_position(
+            board_state,
+            np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int),
+            self.steps_per_turn_for_round(position['round_count']),
+            position['round_count'],
+            players,
+            position['played'] | {player},
+        )
+
+    def _harvest_ponder_task(self, task):
+        future = task[4]
+        # 被中断的任务只搜到一半，结果不入缓存
+        if future.cancelled() or task[5].is_set() or future.exception() is not None:
+            return None
+        plan = future.result()
+        if len(self.ponder_cache) >= PONDER_CACHE_LIMIT:
+            self.ponder_cache.clear()
+        self.ponder_cache[task[0]] = plan
+        return plan
+
+    def ponder_during_human_turn(self):
+        """人类回合每帧轮询：假设人类按当前棋盘结束回合，在后台依次为后续 AI 局面规划并缓存。
+
+        人类每走一步（局面标识变化）就中断正在计算的过期任务，从新棋盘重新推演。
+        """
+        if not self.ai_players:
+            return
+        origin = self.ai_decision_key()
+        task = self.ponder_task
+        if task is not None:
+            if task[1] != origin:
+                # 推演的局面已不会出现，中断任务让出工作线程
+                self.cancel_pondering()
+            elif not task[4].done():
+                return
+            else:
+                self.ponder_task = None
+                plan = self._harvest_ponder_task(task)
+                if plan is not None:
+                    self.ponder_next = self._next_ponder_position(task[2], task[3], plan)
+
+        if origin != self.ponder_origin:
+            self.ponder_origin = origin
+            self.ponder_budget = PONDER_MAX_POSITIONS
+            self.ponder_next = self._next_ponder_position(self.current_player, self.snapshot_search_position(), [])
+        if self.ponder_next is None or self.ponder_budget <= 0:
+            return
+
+        player, position = self.ponder_next
+        self.ponder_next = None
+        self.ponder_budget -= 1
+        key = self.ponder_key(player, position)
+        cached_plan = self.ponder_cache.get(key)
+        if cached_plan is not None:
+            self.ponder_next = self._next_ponder_position(player, position, cached_plan)
+            return
+        search_position = make_search_position(
+            position['board'],
+            position['move_count'],
+            position['steps_left'],
+            position['round_count'],
+            position['players'],
+            position['played'],
+        )
+        # 预思考的结果可能被 AI 回合直接接管，与正式决策使用相同的每步预算
+        cancel = threading.Event()
+        future = self.get_ai_decision_executor().submit(
+            self.plan_ai_turn, player, search_position, self.ai_move_latency_ms - AI_DEADLINE_MARGIN_MS, cancel
+        )
+        self.ponder_task = (key, origin, player, position, future, cancel)
+
+    def claim_pondered_decision(self):
+        """AI 回合开始时接管预思考：正在计算的正是当前局面则作为待决结果，已完成的结果写入缓存"""
+        task = self.ponder_task
+        self.ponder_task = None
+        self.ponder_next = None
+        self.ponder_origin = None
+        if task is None:
+            return None
+        if task[4].done():
+            self._harvest_ponder_task(task)
+            return None
+        position = self.snapshot_search_position()
+        if task[0] != self.ponder_key(self.current_player, position):
+            # 推演的不是当前局面：中断它，正式决策不必排在过期任务之后等待
+            task[4].cancel()
+            task[5].set()
+            return None
+        fallback = self.fallback_turn_plan(self.current_player, position)
+        self.pending_ai_decision = (self.ai_decision_key(), task[4], task[5], fallback)
+        return self.pending_ai_decision
 
     def perform_ai_action(self):
         if self.current_player not in self.ai_players:
             return False
 
-        best_action, plan_score = self.choose_ai_action(self.current_player)
+        # 优先执行已校验的回合计划，校验失败才重新完整搜索
+        decision = self.peek_planned_action()
+        if decision is None:
+            # 在主线程上搜索前先停下后台任务（如过期的预思考），两个线程不会同时改动搜索状态
+            self.stop_background_ai()
+            self.store_turn_plan(self.current_player, self.plan_ai_turn(self.current_player))
+            decision = self.peek_planned_action()
+        best_action, plan_score = decision if decision is not None else (None, None)
         if best_action is None:
             self.steps_left = 0
             self.log.append(f'玩家{self.current_player}(AI)无可执行动作，结束回合')
@@ -692,13 +2583,60 @@ class AIMixin:
         self.log.append(f'玩家{self.current_player}(AI)行动失败: {message}')
         return False
 
+    def schedule_ai_move(self, now):
+        """本步的执行时刻：上一步执行后再过一个目标耗时（思考 + 展示间隔）；
+        距上一步已超过目标耗时（如人类回合之后）则从现在算起。同一局面只定一次。"""
+        key = self.ai_decision_key()
+        schedule = self.ai_move_schedule
+        if schedule is None or schedule[0] != key:
+            due_ms = self.last_ai_action_ms + self.ai_move_latency_ms
+            if due_ms <= now:
+                due_ms = now + self.ai_move_latency_ms
+            schedule = (key, due_ms)
+            self.ai_move_schedule = schedule
+        return schedule[1]
+
     def maybe_run_ai_turn(self):
-        if self.game_over or self.current_player not in self.ai_players:
+        """每帧轮询：回合计划仍有效时直接执行下一步；否则在后台规划，与展示用的行动间隔重叠。
+        人类回合则转去预思考后续 AI 的局面。
+
+        每步按目标耗时调度：思考只用到执行时刻前的剩余时间，思考用掉的时间从展示间隔中扣除，
+        局面复杂与否都保持稳定的走子节奏。到执行时刻后台决策仍未返回时中断它，改走提交时算好的兜底计划。"""
+        if self.game_over:
+            return
+        if self.current_player not in self.ai_players:
+            self.ponder_during_human_turn()
             return
 
         now = pygame.time.get_ticks()
-        if now - self.last_ai_action_ms < self.ai_action_delay_ms:
+        due_ms = self.schedule_ai_move(now)
+        pending = self.pending_ai_decision
+        if pending is not None and pending[0] != self.ai_decision_key():
+            self.cancel_ai_decision()
+            pending = None
+        if pending is None and self.peek_planned_action() is None:
+            pending = self.claim_pondered_decision()
+            if pending is None:
+                pending = self.submit_ai_decision(self.current_player, self.ai_think_budget_ms(due_ms, now))
+
+        if now < due_ms:
             return
+        if pending is not None:
+            self.pending_ai_decision = None
+            future = pending[1]
+            if not future.done():
+                # 搜索停在不检查截止时间的阶段，或排在尚未退出的任务之后：不再等待
+                future.cancel()
+                pending[2].set()
+                plan = pending[3]
+            elif future.cancelled() or future.exception() is not None:
+                # 后台决策出错（搜索、评估或进程池故障）：记录异常后改走兜底计划，不让异常打断渲染循环
+                if not future.cancelled():
+                    logger.error('AI 后台决策失败，改走兜底计划', exc_info=future.exception())
+                plan = pending[3]
+            else:
+                plan = future.result()
+            self.store_turn_plan(self.current_player, plan)
         self.last_ai_action_ms = now
 
         moved = self.perform_ai_action()
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+CHANNEL_OWNER = 0
+CHANNEL_HP = 1
+CHANNEL_CITY = 2
+CHANNEL_UNIT = 3  # 兵种通道在规则中始终为 0，不再单独存储
+
+
+class CompactBoard:
+    """结构数组形式的棋盘：归属 int8、血量 uint8、城市类型 int8 各自连续存放。
+
+    每格 3 字节（原 (N, N, 4) int64 数组为 32 字节），搜索节点复制开销随之下降，
+    整通道的向量化运算直接用 owner / hp / city 三个数组即可。
+
+    为兼容旧代码保留 (N, N, 4) 数组的索引写法：
+    board[x, y] 返回 (归属, 血量, 城市, 兵种) 元组，board[x, y] = [...] 整格写入；
+    board[..., ..., c] 读写单个通道（支持切片与数组下标）。标量读取返回 Python int，
+    避免 uint8 运算溢出。
+    """
+
+    __slots__ = ('owner', 'hp', 'city', '_channels')
+
+    def __init__(self, size, owner=None, hp=None, city=None):
+        self.owner = np.zeros((size, size), dtype=np.int8) if owner is None else owner
+        self.hp = np.zeros((size, size), dtype=np.uint8) if hp is None else hp
+        self.city = np.zeros((size, size), dtype=np.int8) if city is None else city
+        self._channels = (self.owner, self.hp, self.city)
+
+    @classmethod
+    def from_array(cls, board_array):
+        board_array = np.asarray(board_array)
+        return cls(
+            board_array.shape[0],
+            owner=board_array[:, :, CHANNEL_OWNER].astype(np.int8),
+            hp=board_array[:, :, CHANNEL_HP].astype(np.uint8),
+            city=board_array[:, :, CHANNEL_CITY].astype(np.int8),
+        )
+
+    def __getstate__(self):
+        return self.owner, self.hp, self.city
+
+    def __setstate__(self, state):
+        self.owner, self.hp, self.city = state
+        self._channels = (self.owner, self.hp, self.city)
+
+    @property
+    def shape(self):
+        return self.owner.shape + (4,)
+
+    def copy(self):
+        return CompactBoard(self.owner.shape[0], self.owner.copy(), self.hp.copy(), self.city.copy())
+
+    def cell(self, x, y):
+        return int(self.owner[x, y]), int(self.hp[x, y]), int(self.city[x, y]), 0
+
+    def set_cell(self, x, y, owner, hp, city):
+        self.owner[x, y] = owner
+        self.hp[x, y] = hp
+        self.city[x, y] = city
+
+    def channel(self, index):
+        """按旧通道编号取整张通道数组（兵种通道返回全零副本）"""
+        if index == CHANNEL_UNIT:
+            return np.zeros(self.owner.shape, dtype=np.int8)
+        return self._channels[index]
+
+    def to_array(self):
+        """兼容视图：拼出旧的 (N, N, 4) int 数组（副本）"""
+        board_array = np.zeros(self.shape, dtype=int)
+        board_array[:, :, CHANNEL_OWNER] = self.owner
+        board_array[:, :, CHANNEL_HP] = self.hp
+        board_array[:, :, CHANNEL_CITY] = self.city
+        return board_array
+
+    def __array__(self, dtype=None, copy=None):
+        board_array = self.to_array()
+        return board_array if dtype is None else board_array.astype(dtype)
+
+    def __getitem__(self, key):
+        if len(key) == 2:
+            x, y = key
+            return int(self.owner[x, y]), int(self.hp[x, y]), int(self.city[x, y]), 0
+        x, y, index = key
+        value = self.channel(index)[x, y]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def __setitem__(self, key, value):
+        if len(key) == 2:
+            x, y = key
+            self.owner[x, y] = value[CHANNEL_OWNER]
+            self.hp[x, y] = value[CHANNEL_HP]
+            self.city[x, y] = value[CHANNEL_CITY]
+            return
+        x, y, index = key
+        if index == CHANNEL_UNIT:
+            return
+        self._channels[index][x, y] = value
@@ -0,0 +1,44 @@
+import json
+import os
+from collections import deque
+
+
+class DecisionTracer:
+    """AI 决策追踪：每次完整决策记录一条（玩家、难度、前若干候选的分项得分、展开节点数、耗时），
+    存入固定容量的环形缓冲区，旧记录自动覆盖，可随时导出为 JSONL。
+
+    只在启用时由 AIMixin 调用；未启用时打分路径不做任何额外计算。
+    """
+
+    def __init__(self, capacity, top_n):
+        self.top_n = top_n
+        self.records = deque(maxlen=capacity)
+        self.total = 0
+
+    @property
+    def capacity(self):
+        return self.records.maxlen
+
+    def record(self, entry):
+        # deque 追加是原子操作，后台决策线程写入、主线程导出不需要加锁
+        self.records.append(entry)
+        self.total += 1
+
+    def snapshot(self):
+        """当前缓冲区内的记录（从旧到新）"""
+        return list(self.records)
+
+    def clear(self):
+        self.records.clear()
+
+    def dump_jsonl(self, path):
+        """把缓冲区内的记录写成 JSONL（每行一条），返回写入条数"""
+        records = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as handle:
+            for entry in records:
+                handle.write(json.dumps(entry, ensure_ascii=False))
+                handle.write('\n')
+        return len(records)
@@ -0,0 +1,338 @@
+import math
+import time
+
+import numpy as np
+
+from ..config.constants import BOARD_SIZE, CITY_CAPITAL, CITY_MAJOR, CITY_SMALL
+from .threat_space import ThreatSearchInconclusive, ThreatSpaceSearch
+from .transposition import BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, ZOBRIST_KEYS
+
+
+ENDGAME_UNIT_LIMIT = 8  # 全场存活士兵不超过此数时启用残局求解
+ENDGAME_RACE_TURNS = 2  # 有士兵能在此回合数的行动点内走到对方首都，才算首都争夺残局
+ENDGAME_MAX_PLIES = 8  # 迭代加深的最大层数（每走一步或提前结束回合各算一层）
+ENDGAME_MIN_PLIES = 3  # 至少完整搜完此层数才采用求解结果（已分出胜负时不受限制）
+ENDGAME_NODE_LIMIT = 20000  # 单次求解最多展开的节点数（与时间预算先到者为准）
+ENDGAME_CACHE_LIMIT = 1 << 16  # 已求解局面缓存条目上限（超出时清空）
+ENDGAME_WIN = 10**8  # 胜负分值（与 evaluate_board_state 的首都失守分值同量级），按层数折算
+ENDGAME_CAPITAL_DANGER = 1000  # 叶节点上敌方下一回合可必然攻陷己方首都时的扣分
+
+END_TURN = 'end_turn'  # 提前结束回合
+
+# 回合末生产，与 production_phase 一致
+_CITY_GROWTH = np.zeros(CITY_CAPITAL + 1, dtype=np.int64)
+_CITY_GROWTH[CITY_SMALL] = 1
+_CITY_GROWTH[CITY_MAJOR] = 2
+_CITY_GROWTH[CITY_CAPITAL] = 2
+_MINE_GROWTH = 5
+_HP_LIMIT = 99
+
+_PROVEN = ENDGAME_WIN // 2
+
+
+def count_live_units(board_state):
+    return int(np.count_nonzero((board_state.owner > 0) & (board_state.hp > 0)))
+
+
+class EndgameSolver:
+    """残局求解：全场士兵很少时，按真实规则（共享行动点、每兵每回合 3 次移动、轮末生产、
+    首都易主即淘汰）对所有合法走法做有界深度的完整 alpha-beta 搜索，不做候选截断。
+
+    多方对局按偏执假设处理：所有敌方合力使 player 的评估最低。叶节点用 evaluate_board_state，
+    首都失守/消灭全部敌方记为按层数折算的胜负分。结果（值与最佳走法）写入 game.endgame_cache 跨步复用，
+    已分出胜负的局面不受剩余深度限制。超出时间预算或节点上限时沿用上一层迭代加深的结果。
+    """
+
+    def __init__(self, game, time_budget_ms=None, node_limit=ENDGAME_NODE_LIMIT):
+        self.game = game
+        self.time_budget_ms = game.ai_search_budget_ms if time_budget_ms is None else time_budget_ms
+        self.node_limit = node_limit
+        self.deadline = None
+        self.cache = game.endgame_cache
+        self.threat_search = ThreatSpaceSearch(game)
+        self.nodes = 0
+        self.player = None
+        self.owner_flat = None
+        self.hp_flat = None
+
+    def is_capital_race(self, player, board_state, steps_per_turn, players):
+        """有任何一方的士兵能在 ENDGAME_RACE_TURNS 回合的行动点内走到其他玩家的首都"""
+        reach = ENDGAME_RACE_TURNS * steps_per_turn
+        owner = board_state.owner.reshape(-1)
+        live = np.nonzero((owner > 0) & (board_state.hp.reshape(-1) > 0))[0].tolist()
+        for victim in players:
+            cost, _ = self.game.capital_reach[victim]
+            if any(owner[cell] != victim and cost[cell] <= reach for cell in live):
+                return True
+        return False
+
+    def solve(self, player, board_state, move_count_state, steps_left, round_count, players, played):
+        """返回 (最佳走法或 END_TURN, 评估, 完整搜完的层数)；第 1 层都没搜完时返回 None"""
+        self.player = player
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+        self.owner_flat = board_state.owner.reshape(-1)
+        self.hp_flat = board_state.hp.reshape(-1)
+        if len(self.cache) > ENDGAME_CACHE_LIMIT:
+            self.cache.clear()
+        players = tuple(players)
+        played = frozenset(played) & frozenset(players)
+        board_hash = ZOBRIST_KEYS.board_hash(board_state)
+        move_hash = ZOBRIST_KEYS.move_count_hash(move_count_state)
+
+        # 上一步求解的主变例上的局面已有足够深的精确结果时直接采用（回合内连续走子不必每步重搜）
+        key = (player, board_hash, move_hash, player, steps_left, round_count, players, played)
+        entry = self.cache.get(key)
+        if entry is not None:
+            entry_depth, entry_value, entry_bound, entry_action = entry
+            if entry_bound == BOUND_EXACT and (entry_depth >= ENDGAME_MIN_PLIES or abs(entry_value) >= _PROVEN):
+                return entry_action, entry_value, entry_depth
+
+        result = None
+        for depth in range(1, ENDGAME_MAX_PLIES + 1):
+            try:
+                value, action = self._search(
+                    board_state, move_count_state, player, steps_left, round_count, players, played,
+                    depth, 0, -math.inf, math.inf, board_hash, move_hash,
+                )
+            except _NodeLimit:
+                break
+            result = (action, value, depth)
+            if abs(value) >= _PROVEN:
+                break
+        return result
+
+    def _evaluate_leaf(self, board_state, round_count, players, board_hash):
+        game = self.game
+        enemy_steps = game.steps_per_turn_for_round(round_count)
+        # 叶节点只取决于棋盘，不同走子顺序到达的相同棋盘共用一次评估
+        key = ('leaf', self.player, board_hash, enemy_steps, players)
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        value = game.evaluate_board_state(self.player, board_state)
+        # 叶节点常停在回合中途：敌方下一回合能必然攻下己方首都时扣分，抵消只看静态评估的视界效应
+        fresh_move_count = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+        for enemy in players:
+            if enemy == self.player:
+                continue
+            try:
+                line = self.threat_search.find_capture(enemy, board_state, fresh_move_count, enemy_steps, [self.player])
+            except ThreatSearchInconclusive:
+                # 无法判断首都是否安全：放弃本层（与超出节点上限相同），沿用上一层结果或交回常规搜索
+                raise _NodeLimit
+            if line:
+                value -= ENDGAME_CAPITAL_DANGER
+                break
+        self.cache[key] = value
+        return value
+
+    def _search(self, board_state, move_count_state, side, steps_left, round_count, players, played,
+                depth, ply, alpha, beta, board_hash, move_hash):
+        self.nodes += 1
+        if self.nodes > self.node_limit or time.perf_counter() > self.deadline or self.game.search_cancelled():
+            raise _NodeLimit
+        if depth <= 0:
+            return self._evaluate_leaf(board_state, round_count, players, board_hash), None
+
+        key = (self.player, board_hash, move_hash, side, steps_left, round_count, players, played)
+        entry = self.cache.get(key)
+        first_action = None
+        if entry is not None:
+            entry_depth, entry_value, entry_bound, first_action = entry
+            # 胜负分按“距本局面的层数”存储，取出时换算回距根节点的层数
+            if entry_value >= _PROVEN:
+                entry_value -= ply
+            elif entry_value <= -_PROVEN:
+                entry_value += ply
+            if entry_depth >= depth or abs(entry_value) >= _PROVEN:
+                if entry_bound == BOUND_EXACT:
+                    return entry_value, first_action
+                if entry_bound == BOUND_LOWER and entry_value >= beta:
+                    return entry_value, first_action
+                if entry_bound == BOUND_UPPER and entry_value <= alpha:
+                    return entry_value, first_action
+
+        maximizing = side == self.player
+        alpha_start = alpha
+        beta_start = beta
+        best_value = -math.inf if maximizing else math.inf
+        best_action = None
+        for action in self._ordered_actions(board_state, move_count_state, side, steps_left, players, first_action):
+            if action is END_TURN:
+                value = self._end_turn(
+                    board_state, side, round_count, players, played, depth - 1, ply + 1, alpha, beta, board_hash
+                )
+            else:
+                value = self._play(
+                    board_state, move_count_state, side, steps_left, round_count, players, played, depth, ply,
+                    alpha, beta, board_hash, move_hash, action,
+                )
+            if maximizing:
+                if value > best_value:
+                    best_value, best_action = value, action
+                alpha = max(alpha, value)
+            else:
+                if value < best_value:
+                    best_value, best_action = value, action
+                beta = min(beta, value)
+            if beta <= alpha:
+                break
+
+        if best_value <= alpha_start:
+            bound = BOUND_UPPER
+        elif best_value >= beta_start:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        stored = best_value
+        if stored >= _PROVEN:
+            stored += ply
+        elif stored <= -_PROVEN:
+            stored -= ply
+        self.cache[key] = (depth, stored, bound, best_action)
+        return best_value, best_action
+
+    def _ordered_actions(self, board_state, move_count_state, side, steps_left, players, first_action):
+        """全部合法走法加提前结束回合；按攻首都、吃子、逼近对方首都、其余走法排序，缓存的最佳走法最先"""
+        game = self.game
+        owner_flat = self.owner_flat
+        hp_flat = self.hp_flat
+        # 偏执假设下敌方只以 player 的首都为目标；player 以全部敌方首都为目标
+        if side == self.player:
+            victims = [victim for victim in players if victim != side]
+        else:
+            victims = [self.player]
+        capital_cells = {}
+        costs = []
+        for victim in victims:
+            x, y = game.capitals[victim]
+            capital_cells[x * BOARD_SIZE + y] = victim
+            costs.append(game.capital_reach[victim][0])
+
+        ordered = []
+        move_count_flat = move_count_state.reshape(-1)
+        units = np.nonzero((owner_flat == side) & (hp_flat > 0) & (move_count_flat < 3))[0].tolist()
+        for source in units:
+            source_hp = int(hp_flat[source])
+            source_cost = min(cost[source] for cost in costs)
+            for tx, ty, terrain_cost in game.move_targets[source]:
+                if terrain_cost > steps_left:
+                    continue
+                target = tx * BOARD_SIZE + ty
+                target_owner = int(owner_flat[target])
+                target_hp = int(hp_flat[target])
+                if target_owner == side and target_hp > 0:
+                    continue
+                if target in capital_cells and (target_hp == 0 or source_hp >= target_hp):
+                    priority = 0
+                elif target_owner > 0 and target_hp > 0 and source_hp > target_hp:
+                    priority = 1
+                elif min(cost[target] for cost in costs) < source_cost:
+                    priority = 2
+                else:
+                    priority = 3
+                ordered.append((priority, -source_hp, divmod(source, BOARD_SIZE), (tx, ty)))
+        ordered.sort()
+        actions = [(from_pos, to_pos) for _, _, from_pos, to_pos in ordered]
+        actions.append(END_TURN)
+        if first_action in actions:
+            actions.remove(first_action)
+            actions.insert(0, first_action)
+        return actions
+
+    def _play(self, board_state, move_count_state, side, steps_left, round_count, players, played, depth, ply,
+              alpha, beta, board_hash, move_hash, action):
+        game = self.game
+        from_pos, to_pos = action
+        simulated, undo = game.apply_ai_move(side, from_pos, to_pos, board_state, move_count_state, steps_left)
+        board_delta, move_delta = ZOBRIST_KEYS.move_delta(board_state, move_count_state, undo)
+        wiped = []
+        try:
+            x, y = game.capitals[self.player]
+            if self.owner_flat[x * BOARD_SIZE + y] != self.player:
+                return -(ENDGAME_WIN - ply - 1)
+            board_hash ^= board_delta
+            survivors = []
+            for victim in players:
+                x, y = game.capitals[victim]
+                if self.owner_flat[x * BOARD_SIZE + y] == victim:
+                    survivors.append(victim)
+                else:
+                    wiped.append(self._eliminate(victim))
+            if wiped:
+                if len(survivors) == 1:
+                    return ENDGAME_WIN - ply - 1
+                players = tuple(survivors)
+                played = played & frozenset(survivors)
+                board_hash = ZOBRIST_KEYS.board_hash(board_state)
+
+            if simulated['steps_left'] <= 0:
+                return self._end_turn(board_state, side, round_count, players, played, depth - 1, ply + 1, alpha, beta,
+                                      board_hash)
+            value, _ = self._search(
+                board_state, move_count_state, side, simulated['steps_left'], round_count, players, played,
+                depth - 1, ply + 1, alpha, beta, board_hash, move_hash ^ move_delta,
+            )
+            return value
+        finally:
+            for cells, owners, hps in reversed(wiped):
+                self.owner_flat[cells] = owners
+                self.hp_flat[cells] = hps
+            game.undo_ai_move(board_state, move_count_state, undo)
+
+    def _eliminate(self, victim):
+        """与 remove_player 一致：被淘汰玩家的全部格子归为无主并清空驻军；返回撤销记录"""
+        cells = np.nonzero(self.owner_flat == victim)[0]
+        record = (cells, self.owner_flat[cells].copy(), self.hp_flat[cells].copy())
+        self.owner_flat[cells] = 0
+        self.hp_flat[cells] = 0
+        return record
+
+    def _end_turn(self, board_state, side, round_count, players, played, depth, ply, alpha, beta, board_hash):
+        """结束 side 的回合：轮到下一位玩家（新的移动计数与满行动点），一轮走完时先结算生产"""
+        played = played | {side}
+        next_side = players[(players.index(side) + 1) % len(players)]
+        saved_hp = None
+        if all(player in played for player in players):
+            saved_hp = self._production(board_state)
+            round_count += 1
+            played = frozenset()
+            board_hash = ZOBRIST_KEYS.board_hash(board_state)
+        try:
+            value, _ = self._search(
+                board_state,
+                np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int),
+                next_side,
+                self.game.steps_per_turn_for_round(round_count),
+                round_count,
+                players,
+                played,
+                depth,
+                ply,
+                alpha,
+                beta,
+                board_hash,
+                0,
+            )
+            return value
+        finally:
+            if saved_hp is not None:
+                self.hp_flat[:] = saved_hp
+
+    def _production(self, board_state):
+        """轮末生产（城市按等级加血、空城出 1 血驻军，金矿加 5 血），返回生产前的血量用于撤销"""
+        saved_hp = self.hp_flat.copy()
+        owned = self.owner_flat > 0
+        city = board_state.city.reshape(-1)
+        cities = np.nonzero(owned & (city > 0))[0]
+        hp = self.hp_flat[cities]
+        self.hp_flat[cities] = np.where(hp > 0, np.minimum(hp + _CITY_GROWTH[city[cities]], _HP_LIMIT), 1)
+        mines = np.nonzero(owned & self.game.gold_mine_mask)[0]
+        hp = self.hp_flat[mines]
+        self.hp_flat[mines] = np.where(hp > 0, np.minimum(hp + _MINE_GROWTH, _HP_LIMIT), _MINE_GROWTH)
+        return saved_hp
+
+
+class _NodeLimit(Exception):
+    """残局求解超出时间预算或节点上限，或叶节点的首都威胁查询没有结论"""
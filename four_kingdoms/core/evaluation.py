@@ -0,0 +1,77 @@
+import numpy as np
+
+from ..config.constants import BOARD_SIZE, CITY_CAPITAL, CITY_MAJOR, CITY_SMALL, RESOURCE_GOLD_MINE
+from .threat_field import PLAYER_SLOTS
+
+
+# 格子与评估方的关系
+RELATION_NONE = 0
+RELATION_OWN = 1
+RELATION_ENEMY = 2
+
+# 局面评估权重，按关系 (无主, 己方, 敌方) 排列；以 1/100 分为单位存为整数，增量累加不产生误差
+EVAL_SCALE = 100
+EVAL_CELL_WEIGHTS = (0, 600, -400)  # 占据格子
+EVAL_HP_WEIGHTS = (0, 135, -110)  # 每点驻军血量
+EVAL_CITY_WEIGHTS = {
+    CITY_CAPITAL: (0, 26000, -20000),
+    CITY_MAJOR: (0, 7200, -5200),
+    CITY_SMALL: (0, 4000, -2800),
+}
+EVAL_MINE_WEIGHTS = (0, 9800, -7200)  # 金矿
+
+
+class BoardEvaluator:
+    """局面评估查表：城市与金矿固定不变，每格按关系预先合并为一个静态权重，
+    评估时只需按归属查关系、再加上血量项。
+
+    material 为全盘向量化计算；move_delta 由撤销记录只重算走子改动的两格，
+    搜索中沿路径累加即可在叶节点 O(1) 得到评估值（与 ZobristKeys.move_delta 用法相同）。
+    """
+
+    def __init__(self, city_grid, resource_map):
+        cell_count = BOARD_SIZE * BOARD_SIZE
+        city = city_grid.reshape(-1)
+        has_mine = resource_map.reshape(-1) == RESOURCE_GOLD_MINE
+        weights = np.zeros((3, cell_count), dtype=np.int64)
+        for relation in (RELATION_OWN, RELATION_ENEMY):
+            weights[relation] = EVAL_CELL_WEIGHTS[relation] + has_mine * EVAL_MINE_WEIGHTS[relation]
+            for city_type, city_weights in EVAL_CITY_WEIGHTS.items():
+                weights[relation, city == city_type] += city_weights[relation]
+        self.cell_weights = weights
+        self.hp_weights = np.array(EVAL_HP_WEIGHTS, dtype=np.int64)
+
+        # relations[评估方, 归属] -> 关系
+        slots = np.arange(PLAYER_SLOTS)
+        self.relations = np.where(
+            slots[None, :] == slots[:, None],
+            RELATION_OWN,
+            np.where(slots[None, :] > 0, RELATION_ENEMY, RELATION_NONE),
+        )
+        self.relations[:, 0] = RELATION_NONE
+        self._cell_indices = np.arange(cell_count)
+        # 增量更新走 Python 热路径，预先转成嵌套列表
+        self._cell_rows = weights.T.tolist()
+        self._relation_rows = self.relations.tolist()
+
+    def material(self, player, board_state):
+        """全盘评估（1/100 分）：各格静态权重与血量项之和"""
+        relation = self.relations[player][board_state.owner.reshape(-1)]
+        hp = board_state.hp.reshape(-1)
+        return int(
+            self.cell_weights[relation, self._cell_indices].sum() + (self.hp_weights[relation] * hp).sum()
+        )
+
+    def move_delta(self, player, board_state, undo):
+        """由撤销记录与走子后的棋盘求评估增量（1/100 分）"""
+        (x1, y1), (x2, y2), from_cell, to_cell, _, _ = undo
+        relations = self._relation_rows[player]
+        delta = 0
+        for x, y, old_cell in ((x1, y1, from_cell), (x2, y2, to_cell)):
+            weights = self._cell_rows[x * BOARD_SIZE + y]
+            new_owner, new_hp, _, _ = board_state.cell(x, y)
+            new_relation = relations[new_owner]
+            old_relation = relations[old_cell[0]]
+            delta += weights[new_relation] + EVAL_HP_WEIGHTS[new_relation] * new_hp
+            delta -= weights[old_relation] + EVAL_HP_WEIGHTS[old_relation] * old_cell[1]
+        return delta
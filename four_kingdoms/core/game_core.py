@@ -1,3 +1,4 @@
+import random
 from collections import deque
 
 import numpy as np
@@ -7,6 +8,7 @@ from ..config.constants import (
     AI_DIFFICULTY_EASY,
     AI_DIFFICULTY_HARD,
     AI_DIFFICULTY_LABELS,
+    AI_DIFFICULTY_MCTS,
     AI_DIFFICULTY_NORMAL,
     BOARD_SIZE,
     CITY_CAPITAL,
@@ -31,8 +33,11 @@ from ..audio import (
     play_sound,
 )
 from ..stats import get_statistics_manager
+from .ai_budget import calibrate_ai_budget, default_ai_budget, load_ai_budget
 from .ai_logic import AIMixin
+from .compact_board import CompactBoard
 from .map_generation import MapGenerationMixin
+from .threat_field import build_move_edges
 from ..ui.renderer import Renderer
 
 
@@ -42,19 +47,44 @@ class Game(MapGenerationMixin, AIMixin):
         game_mode=MODE_SINGLE_AI,
         map_preset_id=DEFAULT_MAP_PRESET,
         ai_difficulty=AI_DIFFICULTY_DEFAULT,
+        map_seed=None,
     ):
         self.game_mode = game_mode
+        # 指定地图种子时地图生成可复现（经典地图即编号 0..OPENING_BOOK_MAP_SEEDS-1，开局库按这些地图离线生成）
+        self.map_seed = map_seed
         self.primary_human = 1
         self.map_preset = get_map_preset(map_preset_id)
         self.map_preset_id = self.map_preset['id']
         self.map_name = self.map_preset['name']
+        if map_seed is not None:
+            self.map_name += f' #{map_seed}'
         self.renderer = Renderer()
         self.ai_difficulty = AI_DIFFICULTY_DEFAULT
-        self.set_ai_difficulty(ai_difficulty, announce=False)
         self.stats_manager = get_statistics_manager()
         self.reset_game()
+        # 各难度的思考时间、搜索宽度与深度按本机性能和每步目标耗时推导；首次启动或硬件变化时
+        # 先用参考机的设置开局，在后台标定完成后再采用
+        budget = load_ai_budget()
+        self.ai_budget = default_ai_budget() if budget is None else budget
+        self.set_ai_difficulty(ai_difficulty, announce=False)
+        if budget is None:
+            self.start_ai_calibration()
+
+    def start_ai_calibration(self):
+        """在 AI 决策线程上标定：与搜索串行执行，不会在搜索途中改动搜索参数"""
+        def calibrate():
+            self.ai_budget = calibrate_ai_budget(self)
+            self.apply_ai_budget(self.ai_difficulty)
+
+        return self.get_ai_decision_executor().submit(calibrate)
         
     def reset_game(self):
+        # 地形、走法表等都会重建，先停下仍在读取它们的后台 AI 任务
+        self.stop_background_ai()
+        # 地图生成使用独立的随机数生成器，不重置 AI 噪声等全局随机序列；
+        # 未指定种子时从全局序列取一个，固定全局种子的对局仍可复现
+        map_seed = random.getrandbits(64) if self.map_seed is None else self.map_seed
+        self.map_rng = random.Random(map_seed)
         # 初始化地形
         self.generate_terrain()
         
@@ -66,11 +96,13 @@ class Game(MapGenerationMixin, AIMixin):
         }
         # 地形均衡，避免单侧大面积水域导致资源失衡
         self.rebalance_terrain_for_fairness(self.capitals)
+        # 地形此后不再变化，预生成走法表供移动与AI复用
+        self.build_move_tables()
         
         self.player_defeated = False  # 单人模式下玩家1被淘汰时用于观战提示
 
         # 初始化棋盘
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE, 4), dtype=int)
+        self.board = CompactBoard(BOARD_SIZE)
         
         # 士兵移动计数网格（替代ID系统）
         self.move_count_grid = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
@@ -100,6 +132,7 @@ class Game(MapGenerationMixin, AIMixin):
             capital_set,
             self.capitals
         )
+        self.reset_ai_caches()
         
         # 游戏状态
         self.players = [1, 2, 3, 4]
@@ -126,7 +159,7 @@ class Game(MapGenerationMixin, AIMixin):
         self.move_history = []
         self.last_move = None  # 最后一次移动 (from_pos, to_pos)
         self.last_ai_action_ms = 0
-        # ai_action_delay_ms 在 set_ai_difficulty 中设置
+        # 每步目标耗时 ai_move_latency_ms 在 set_ai_difficulty 中设置
         self.renderer.reset_effects()
         self.renderer.reset_ui_state()
         self.renderer.reset_board_cache()
@@ -204,27 +237,28 @@ class Game(MapGenerationMixin, AIMixin):
         
         # 可移动位置列表
         self.possible_moves = []
+        self.movable_soldiers_cache = None
         self.territories_dirty = False
         self.mark_territories_dirty(board_changed=True)
 
     def mark_territories_dirty(self, board_changed=False):
         self.territories_dirty = True
+        self.movable_soldiers_cache = None
         if board_changed:
             self.renderer.mark_board_dirty()
 
     def set_ai_difficulty(self, difficulty, announce=True):
-        if difficulty not in {AI_DIFFICULTY_EASY, AI_DIFFICULTY_NORMAL, AI_DIFFICULTY_HARD}:
-            return False
-        if self.ai_difficulty == difficulty:
+        if difficulty not in {AI_DIFFICULTY_EASY, AI_DIFFICULTY_NORMAL, AI_DIFFICULTY_HARD, AI_DIFFICULTY_MCTS}:
             return False
+        changed = self.ai_difficulty != difficulty
+        if changed:
+            # 后台任务按旧难度的搜索参数进行，切换前先停下
+            self.stop_background_ai()
         self.ai_difficulty = difficulty
-        # 根据难度设置 AI 思考延迟（毫秒）
-        self.ai_delays = {
-            AI_DIFFICULTY_EASY: 400,    # 400ms 每步
-            AI_DIFFICULTY_NORMAL: 250,  # 250ms 每步
-            AI_DIFFICULTY_HARD: 150,    # 150ms 每步
-        }
-        self.ai_action_delay_ms = self.ai_delays.get(difficulty, 250)
+        # 每步目标耗时、搜索宽度与深度随难度设置；与当前难度相同时也要设置（初始化时尚未设置过）
+        self.apply_ai_budget(difficulty)
+        if not changed:
+            return False
 
         if announce and hasattr(self, 'log'):
             self.log.append(f"AI难度切换为: {AI_DIFFICULTY_LABELS[difficulty]}")
@@ -314,13 +348,17 @@ class Game(MapGenerationMixin, AIMixin):
             self.renderer.mark_board_dirty()
         self.territories_dirty = False
     
-    def calculate_steps_per_turn(self):
-        if self.round_count <= 5:
+    @staticmethod
+    def steps_per_turn_for_round(round_count):
+        if round_count <= 5:
             return 3
-        elif self.round_count <= 10:
+        elif round_count <= 10:
             return 6
         else:
             return 10
+
+    def calculate_steps_per_turn(self):
+        return self.steps_per_turn_for_round(self.round_count)
     
     def update_territory_count(self):
         self.territory_count = {1: 0, 2: 0, 3: 0, 4: 0}
@@ -396,31 +434,56 @@ class Game(MapGenerationMixin, AIMixin):
         
         return candidates
     
+    def build_move_tables(self):
+        """按当前地形预计算每格的合法落点表 (目标索引, 消耗)，以及反向的来源表"""
+        cell_count = BOARD_SIZE * BOARD_SIZE
+        self.move_table = []
+        # move_targets/move_sources 为同一张表的元组形式，便于 Python 热循环直接解包
+        self.move_targets = []
+        self.move_sources = [[] for _ in range(cell_count)]
+
+        for index in range(cell_count):
+            pos = divmod(index, BOARD_SIZE)
+            entries = []
+            for target in self.get_move_candidates(pos):
+                terrain_cost, error = self.get_terrain_cost(pos, target)
+                if error:
+                    continue
+                tx, ty = target
+                entries.append((tx * BOARD_SIZE + ty, terrain_cost))
+                self.move_sources[tx * BOARD_SIZE + ty].append((pos[0], pos[1], terrain_cost))
+
+            self.move_table.append(np.array(entries, dtype=np.int16).reshape(-1, 2))
+            self.move_targets.append(
+                tuple((target_index // BOARD_SIZE, target_index % BOARD_SIZE, cost) for target_index, cost in entries)
+            )
+
+        self.move_sources = [tuple(sources) for sources in self.move_sources]
+        self.move_edges = build_move_edges(self.move_table)
+        # 稠密消耗矩阵 [来源, 落点]，0 表示一步不可达，供批量打分按下标查询
+        self.move_cost_matrix = np.zeros((cell_count, cell_count), dtype=np.int16)
+        for index, entries in enumerate(self.move_table):
+            self.move_cost_matrix[index, entries[:, 0]] = entries[:, 1]
+
     def get_possible_moves_for(self, pos):
-        x, y = pos
-        player, hp, _, _ = self.board[x, y]
-        if player != self.current_player or hp <= 0:
-            return []
-        if self.move_count_grid[x, y] >= 3:
-            return []
-        
-        possible_moves = []
-        for target in self.get_move_candidates(pos):
-            tx, ty = target
-            target_player, target_hp, _, _ = self.board[tx, ty]
-            
-            # 不显示己方士兵格，避免“可点但会失败”的体验问题
-            if target_player == player and target_hp > 0:
-                continue
-            
-            terrain_cost, error = self.get_terrain_cost(pos, target)
-            if error:
-                continue
-            if self.steps_left < terrain_cost:
-                continue
-            possible_moves.append(target)
-        
-        return possible_moves
+        return self.get_possible_moves_for_state(
+            self.current_player,
+            pos,
+            self.board,
+            self.move_count_grid,
+            self.steps_left,
+        )
+
+    def get_movable_soldiers(self, player):
+        """返回仍有合法落点的士兵（已排序），棋盘未变化时复用缓存"""
+        cache_key = (player, self.steps_left)
+        if self.movable_soldiers_cache is not None and self.movable_soldiers_cache[0] == cache_key:
+            return list(self.movable_soldiers_cache[1])
+
+        movable = [pos for pos in self.get_player_soldiers(player) if self.get_possible_moves_for(pos)]
+        movable.sort()
+        self.movable_soldiers_cache = (cache_key, movable)
+        return list(movable)
     
     def calculate_possible_moves(self, pos):
         """计算并存储可能的移动位置"""
@@ -678,6 +741,7 @@ class Game(MapGenerationMixin, AIMixin):
         # 重置选中位置和可移动范围
         self.selected_pos = None
         self.possible_moves = []
+        self.movable_soldiers_cache = None
         self.last_move = None  # 清除最后移动高亮
 
         if self.current_player in self.ai_players:
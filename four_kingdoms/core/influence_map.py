@@ -0,0 +1,131 @@
+import numpy as np
+
+from ..config.constants import BOARD_SIZE
+from .threat_field import PLAYER_SLOTS
+
+
+_CELL_XS, _CELL_YS = np.divmod(np.arange(BOARD_SIZE * BOARD_SIZE), BOARD_SIZE)
+
+
+def nearest_distance_field(target_xs, target_ys):
+    """各格到最近目标格的曼哈顿距离（扁平数组）；没有目标时全为 0"""
+    if target_xs.size == 0:
+        return np.zeros(BOARD_SIZE * BOARD_SIZE, dtype=int)
+    return (np.abs(_CELL_XS[None, :] - target_xs[:, None]) + np.abs(_CELL_YS[None, :] - target_ys[:, None])).min(axis=0)
+
+
+def strategic_distance_fields(target_xs, target_ys):
+    """战略目标距离场，以及“目标格被拿下后”的距离场。
+
+    后者只在目标格上与前者不同：取该格到其余目标的最近距离（没有其余目标时为 0），
+    即该目标格易主、不再是目标后，重新计算距离场在这一格上的取值。
+    """
+    distance = nearest_distance_field(target_xs, target_ys)
+    captured = distance.copy()
+    if target_xs.size:
+        target_cells = target_xs * BOARD_SIZE + target_ys
+        if target_xs.size == 1:
+            captured[target_cells] = 0
+        else:
+            pairwise = np.abs(target_xs[:, None] - target_xs[None, :]) + np.abs(target_ys[:, None] - target_ys[None, :])
+            np.fill_diagonal(pairwise, 2 * BOARD_SIZE)
+            captured[target_cells] = pairwise.min(axis=1)
+    distance.flags.writeable = False
+    captured.flags.writeable = False
+    return distance, captured
+
+
+class InfluenceGraph:
+    """兵力影响沿走法图的传播：每走一条边乘以 decay 的“行动点消耗”次方，同一格取各路径的最大值。
+
+    边与消耗来自地形走法表（森林八向、水域两格机动、上岸一格），衰减随地形而不同。
+    reach[s, c] 为强度 1 的源从格 s 出发、至多 radius 步后在格 c 的影响，换图时算一次；
+    每个局面只需按驻军所在格取行、乘以血量后按玩家取最大值。
+    """
+
+    def __init__(self, edges, decay, radius):
+        cell_count = BOARD_SIZE * BOARD_SIZE
+        order = np.argsort(edges.dst, kind='stable')
+        src = edges.src[order]
+        weight = decay ** edges.cost[order].astype(float)
+        cells, starts = np.unique(edges.dst[order], return_index=True)
+        reach = np.eye(cell_count)
+        for _ in range(radius):
+            reached = np.maximum.reduceat(reach[:, src] * weight, starts, axis=1)
+            np.maximum(reach[:, cells], reached, out=reached)
+            reach[:, cells] = reached
+        reach.flags.writeable = False
+        self.reach = reach
+
+    def propagate(self, owner, hp):
+        """各玩家的影响场 (玩家槽位, 格)：格上驻军以血量为源强度"""
+        influence = np.zeros((PLAYER_SLOTS, owner.shape[0]), dtype=float)
+        occupied = np.nonzero((hp > 0) & (owner > 0))[0]
+        if occupied.size:
+            unit_owner = owner[occupied]
+            contribution = self.reach[occupied] * hp[occupied, None]
+            for player in np.unique(unit_owner):
+                influence[player] = contribution[unit_owner == player].max(axis=0)
+        return influence
+
+    def unit_sources(self, owner, hp):
+        """影响源：各驻军所在格、归属与血量，与 propagate 取的源相同"""
+        occupied = np.nonzero((hp > 0) & (owner > 0))[0]
+        return occupied, owner[occupied], hp[occupied].astype(float)
+
+
+class InfluenceMap:
+    """某一玩家在单个棋盘状态下的位置场，均为按格子编号索引的扁平数组：
+
+    capital_distance    到最近敌方首都的距离
+    strategic_distance  到最近战略目标的距离；captured_distance 为目标格易主后该格的距离
+    own_influence       己方兵力影响；enemy_influence 为各敌方影响的最大值（见 InfluenceGraph）
+    enemy_pressure      敌方一步可打到该格的最大血量，由威胁场按需汇总
+    exposure_after      走子后落点的暴露程度，由各驻军的影响源在落点上按需重算
+
+    打分时按走法下标直接查表，代替逐个走法重算距离图和逐个资产查询威胁。
+    """
+
+    def __init__(
+        self, player, capital_distance, strategic_distance, captured_distance, unit_influence, graph, unit_sources
+    ):
+        self.player = player
+        self.capital_distance = capital_distance
+        self.strategic_distance = strategic_distance
+        self.captured_distance = captured_distance
+        enemies = [enemy for enemy in range(1, PLAYER_SLOTS) if enemy != player]
+        self.own_influence = unit_influence[player]
+        self.enemy_influence = unit_influence[enemies].max(axis=0)
+        self._graph = graph
+        self._unit_sources = unit_sources
+        self._pressure = None
+
+    def exposure_after(self, src, dst, survivor_hp):
+        """士兵从 src 走到 dst、以 survivor_hp 存活后，dst 上敌方影响超出己方的部分，按走子后的棋盘计：
+
+        敌方不计 dst 上被吃掉的驻军，己方不计该士兵留在 src 的影响、改为它在 dst 的血量。
+        只在落点上逐个驻军重算贡献，与走子后重新传播影响场在 dst 上的取值相同。
+        """
+        unit_cells, unit_owner, unit_hp = self._unit_sources
+        dst_cells = np.atleast_1d(dst)
+        contribution = self._graph.reach[unit_cells[:, None], dst_cells] * unit_hp[:, None]
+        own = (unit_owner == self.player)[:, None]
+        enemy = np.where(~own & (unit_cells[:, None] != dst_cells), contribution, 0.0).max(axis=0, initial=0.0)
+        ally = np.where(own & (unit_cells[:, None] != np.atleast_1d(src)), contribution, 0.0).max(axis=0, initial=0.0)
+        exposure = np.maximum(0.0, enemy - np.maximum(ally, survivor_hp))
+        return exposure if np.ndim(dst) else exposure[0]
+
+    def strategic_distance_after(self, dst, captured):
+        """走子后终点格到最近战略目标的距离；captured 标记终点目标格因走子不再是目标"""
+        return np.where(captured, self.captured_distance[dst], self.strategic_distance[dst])
+
+    def enemy_pressure(self, threat_field):
+        """敌方压力：不区分驻军归属取各敌方触及血量的最大值。
+
+        走子只会移走己方驻军或削弱终点驻军，不会让任何敌方的触及血量变大，
+        因此压力为 0 的格子走子后的威胁查询必为 0，可整格跳过。
+        """
+        if self._pressure is None:
+            enemies = [enemy for enemy in range(1, PLAYER_SLOTS) if enemy != self.player]
+            self._pressure = threat_field.reach[enemies].max(axis=0)
+        return self._pressure
@@ -1,5 +1,4 @@
 import math
-import random
 
 import numpy as np
 
@@ -137,7 +136,7 @@ class MapGenerationMixin:
             for i in range(max(0, cx - 3), min(BOARD_SIZE, cx + 4)):
                 for j in range(max(0, cy - 3), min(BOARD_SIZE, cy + 4)):
                     if abs(i - cx) + abs(j - cy) <= 3 and self.terrain[i][j] == TERRAIN_WATER:
-                        self.terrain[i][j] = TERRAIN_PLAIN if random.random() < 0.8 else TERRAIN_FOREST
+                        self.terrain[i][j] = TERRAIN_PLAIN if self.map_rng.random() < 0.8 else TERRAIN_FOREST
 
         # 硬约束：控制每个国家分区水域上限、山地上限和平原下限。
         max_zone_water_ratio = float(self.get_map_setting(('fairness', 'max_zone_water_ratio'), 0.28))
@@ -152,7 +151,7 @@ class MapGenerationMixin:
                 convert_count = len(water_cells) - allowed_water
                 water_cells.sort(key=lambda pos: abs(pos[0] - cap_x) + abs(pos[1] - cap_y))
                 for x, y in water_cells[:convert_count]:
-                    self.terrain[x][y] = TERRAIN_PLAIN if random.random() < 0.78 else TERRAIN_FOREST
+                    self.terrain[x][y] = TERRAIN_PLAIN if self.map_rng.random() < 0.78 else TERRAIN_FOREST
 
             mountain_cells = [(x, y) for x, y in cells if self.terrain[x][y] == TERRAIN_MOUNTAIN]
             allowed_mountain = int(len(cells) * max_zone_mountain_ratio)
@@ -160,7 +159,7 @@ class MapGenerationMixin:
                 convert_count = len(mountain_cells) - allowed_mountain
                 mountain_cells.sort(key=lambda pos: abs(pos[0] - cap_x) + abs(pos[1] - cap_y))
                 for x, y in mountain_cells[:convert_count]:
-                    self.terrain[x][y] = TERRAIN_PLAIN if random.random() < 0.62 else TERRAIN_FOREST
+                    self.terrain[x][y] = TERRAIN_PLAIN if self.map_rng.random() < 0.62 else TERRAIN_FOREST
 
             plain_cells = [(x, y) for x, y in cells if self.terrain[x][y] == TERRAIN_PLAIN]
             required_plain = int(len(cells) * min_zone_plain_ratio)
@@ -217,9 +216,9 @@ class MapGenerationMixin:
                     zone_mountain[zone_owner].append((i, j))
 
         for player in capital_map:
-            random.shuffle(zone_plain[player])
-            random.shuffle(zone_forest[player])
-            random.shuffle(zone_mountain[player])
+            self.map_rng.shuffle(zone_plain[player])
+            self.map_rng.shuffle(zone_forest[player])
+            self.map_rng.shuffle(zone_mountain[player])
 
         players = sorted(capital_map.keys())
 
@@ -260,7 +259,7 @@ class MapGenerationMixin:
         max_fill_ratio = max(min_fill_ratio, min(1.0, max_fill_ratio))
         min_cities = int(max_cities * min_fill_ratio)
         max_city_target = int(max_cities * max_fill_ratio)
-        target_total_cities = random.randint(min_cities, max_city_target)
+        target_total_cities = self.map_rng.randint(min_cities, max_city_target)
         guaranteed_total = sum(home_small_guaranteed.values())
         num_cities = max(0, target_total_cities - guaranteed_total)
         zone_available = {
@@ -387,13 +386,13 @@ class MapGenerationMixin:
                 zone_candidates[zone_owner].append((i, j))
 
         for player in players:
-            random.shuffle(zone_candidates[player])
+            self.map_rng.shuffle(zone_candidates[player])
 
         min_mine_count = int(self.get_map_setting(('mine', 'min_count'), 2))
         max_mine_count = int(self.get_map_setting(('mine', 'max_count'), 3))
         if min_mine_count > max_mine_count:
             min_mine_count, max_mine_count = max_mine_count, min_mine_count
-        mine_count = random.randint(min_mine_count, max_mine_count)
+        mine_count = self.map_rng.randint(min_mine_count, max_mine_count)
         selected = []
         zone_mine_count = {player: 0 for player in players}
         selected_set = set()
@@ -402,7 +401,7 @@ class MapGenerationMixin:
 
         # 第一阶段：尽量每个分区最多1个，且彼此保持一定距离。
         available_zones = [player for player in players if zone_candidates[player]]
-        random.shuffle(available_zones)
+        self.map_rng.shuffle(available_zones)
         for min_distance in primary_distances:
             for player in available_zones:
                 if len(selected) >= mine_count:
@@ -428,7 +427,7 @@ class MapGenerationMixin:
                 for pos in zone_candidates[player]:
                     if pos not in selected_set:
                         fallback.append((player, pos))
-            random.shuffle(fallback)
+            self.map_rng.shuffle(fallback)
 
             for min_distance in fallback_distances:
                 for player, pos in fallback:
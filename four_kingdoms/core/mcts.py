@@ -0,0 +1,55 @@
+import math
+
+
+class MCTSNode:
+    """蒙特卡洛搜索树节点：action 为到达该节点的己方走子 (起点, 终点)。
+
+    untried 为尚未展开的候选（按先验从差到好排列，pop() 先取最好的）；
+    None 表示还没生成过候选。
+    """
+
+    __slots__ = ('action', 'parent', 'children', 'untried', 'visits', 'value_sum')
+
+    def __init__(self, action=None, parent=None):
+        self.action = action
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.value_sum = 0.0
+
+    def mean_value(self):
+        return self.value_sum / self.visits if self.visits else 0.0
+
+    def is_fully_expanded(self):
+        return self.untried is not None and not self.untried
+
+    def select_child(self, exploration):
+        """UCT：平均收益 + exploration * sqrt(ln(父访问数) / 子访问数)"""
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.value_sum / child.visits + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+    def expand(self, action):
+        child = MCTSNode(action, self)
+        self.children.append(child)
+        return child
+
+    def backpropagate(self, reward):
+        node = self
+        while node is not None:
+            node.visits += 1
+            node.value_sum += reward
+            node = node.parent
+
+    def most_visited_child(self):
+        if not self.children:
+            return None
+        return max(self.children, key=lambda child: (child.visits, child.mean_value()))
+
+    def detach(self):
+        """作为下一步的根复用：断开父节点，回传不再越过新根"""
+        self.parent = None
+        return self
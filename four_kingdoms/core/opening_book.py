@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+
+import numpy as np
+
+from ..config.constants import (
+    AI_DIFFICULTY_HARD,
+    BOARD_SIZE,
+    MODE_HOTSEAT,
+    OPENING_BOOK_BUILD_BUDGET_MS,
+    OPENING_BOOK_MAP_SEEDS,
+    OPENING_BOOK_PATH,
+    OPENING_BOOK_ROUNDS,
+)
+from ..config.map_presets import MAP_PRESET_ORDER
+
+
+_QUADRANT = BOARD_SIZE // 2
+
+
+def canonical_flips(capital):
+    """把首都所在的角翻到左上角（玩家1的方位）所需的 (上下翻转, 左右翻转)"""
+    return capital[0] >= _QUADRANT, capital[1] >= _QUADRANT
+
+
+def _orient(grid, flips):
+    flip_x, flip_y = flips
+    if flip_x:
+        grid = grid[::-1]
+    if flip_y:
+        grid = grid[:, ::-1]
+    return grid
+
+
+def to_canonical(pos, flips):
+    """实际坐标与规范坐标互换（翻转是对合变换，同一函数可双向使用）"""
+    x, y = pos
+    return (BOARD_SIZE - 1 - x if flips[0] else x, BOARD_SIZE - 1 - y if flips[1] else y)
+
+
+def opening_position_key(game, player, board_state, move_count_state, steps_left):
+    """开局局面键：翻到玩家1方位后，取本方象限的地形、城市、金矿、归属关系、血量与移动次数做 64 位哈希。
+
+    开局阶段各方互不接触，只看本方象限可让其它象限（含人类玩家）的走法不影响命中；
+    本方领地越出象限时返回 None，不查库。城市与金矿随种子摆放，首都周边布局在不同地图间几乎不重复，
+    因此库只覆盖经典地图（固定种子）。
+    """
+    capital = game.capitals.get(player)
+    if capital is None:
+        return None
+    flips = canonical_flips(capital)
+    owner = _orient(board_state.owner, flips)
+    own = owner == player
+    if own[_QUADRANT:, :].any() or own[:, _QUADRANT:].any():
+        return None
+
+    relation = np.where(own, 1, np.where(owner > 0, 2, 0))
+    digest = hashlib.blake2b(digest_size=8)
+    for grid in (
+        _orient(game.terrain, flips),
+        _orient(board_state.city, flips),
+        _orient(game.resource_map, flips),
+        relation,
+        _orient(board_state.hp, flips),
+        _orient(move_count_state, flips),
+    ):
+        digest.update(np.ascontiguousarray(grid[:_QUADRANT, :_QUADRANT], dtype=np.uint8).tobytes())
+    digest.update(bytes([steps_left]))
+    return int.from_bytes(digest.digest(), 'little')
+
+
+class OpeningBook:
+    """开局库：局面键 -> 规范坐标下的走法及生成时的搜索评估。
+
+    磁盘格式为 npz：keys 为升序 uint64，moves 为 (n, 2) uint16 格子编号，scores 为 float32。
+    首次查询时才读取文件，文件缺失或损坏时视为空库。
+    """
+
+    def __init__(self, path=OPENING_BOOK_PATH):
+        self.path = path
+        self.keys = None
+        self.moves = None
+        self.scores = None
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                self.keys = data['keys']
+                self.moves = data['moves']
+                self.scores = data['scores']
+        except (OSError, KeyError, ValueError):
+            self.keys = np.zeros(0, dtype=np.uint64)
+            self.moves = np.zeros((0, 2), dtype=np.uint16)
+            self.scores = np.zeros(0, dtype=np.float32)
+
+    def __len__(self):
+        if self.keys is None:
+            self._load()
+        return self.keys.shape[0]
+
+    def lookup(self, key):
+        """返回 (规范起点, 规范终点, 评估)，未收录返回 None"""
+        if self.keys is None:
+            self._load()
+        key = np.uint64(key)
+        index = int(np.searchsorted(self.keys, key))
+        if index >= self.keys.shape[0] or self.keys[index] != key:
+            return None
+        from_index, to_index = self.moves[index]
+        return divmod(int(from_index), BOARD_SIZE), divmod(int(to_index), BOARD_SIZE), float(self.scores[index])
+
+    @staticmethod
+    def save(path, entries):
+        """entries: {局面键: (规范起点, 规范终点, 评估)}"""
+        keys = sorted(entries)
+        moves = [
+            (from_pos[0] * BOARD_SIZE + from_pos[1], to_pos[0] * BOARD_SIZE + to_pos[1])
+            for from_pos, to_pos, _ in (entries[key] for key in keys)
+        ]
+        np.savez_compressed(
+            path,
+            keys=np.array(keys, dtype=np.uint64),
+            moves=np.array(moves, dtype=np.uint16).reshape(-1, 2),
+            scores=np.array([entries[key][2] for key in keys], dtype=np.float32),
+        )
+
+
+_opening_book = None
+
+
+def get_opening_book():
+    global _opening_book
+    if _opening_book is None:
+        _opening_book = OpeningBook()
+    return _opening_book
+
+
+def build_opening_book(game_class, preset_ids, seeds, time_budget_ms=OPENING_BOOK_BUILD_BUDGET_MS):
+    """离线生成：逐个固定种子的地图让四方都由困难 AI 以较长时间预算搜索，记录前若干轮每一步的选择"""
+    entries = {}
+    for preset_id in preset_ids:
+        for seed in seeds:
+            game = game_class(MODE_HOTSEAT, map_preset_id=preset_id, ai_difficulty=AI_DIFFICULTY_HARD, map_seed=seed)
+            game.ai_players = set(game.players)
+            game.human_players = set()
+            game.opening_book_enabled = False
+            while not game.game_over and game.round_count <= OPENING_BOOK_ROUNDS:
+                player = game.current_player
+                key = opening_position_key(game, player, game.board, game.move_count_grid, game.steps_left)
+                action, score = game.choose_ai_action_hard(player, time_budget_ms=time_budget_ms)
+                if action is None:
+                    game.next_player()
+                    continue
+                if key is not None and key not in entries:
+                    flips = canonical_flips(game.capitals[player])
+                    entries[key] = (to_canonical(action[0], flips), to_canonical(action[1], flips), score)
+                success, _ = game.move_soldier(action[0], action[1])
+                if game.game_over:
+                    break
+                if not success or game.steps_left <= 0:
+                    game.next_player()
+            game.shutdown_parallel_search()
+            print(f'{preset_id} 种子{seed}: 累计 {len(entries)} 个局面')
+    return entries
+
+
+def main():
+    from .game_main import Game
+
+    parser = argparse.ArgumentParser(description='生成开局库')
+    parser.add_argument('--presets', nargs='*', default=MAP_PRESET_ORDER)
+    parser.add_argument('--seeds', type=int, default=OPENING_BOOK_MAP_SEEDS, help='每张地图预设使用种子 0..N-1')
+    parser.add_argument('--budget-ms', type=int, default=OPENING_BOOK_BUILD_BUDGET_MS)
+    parser.add_argument('--output', default=OPENING_BOOK_PATH)
+    args = parser.parse_args()
+
+    entries = build_opening_book(Game, args.presets, range(args.seeds), args.budget_ms)
+    OpeningBook.save(args.output, entries)
+    print(f'已写入 {args.output}: {len(entries)} 个局面')
+
+
+if __name__ == '__main__':
+    main()
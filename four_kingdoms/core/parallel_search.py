@@ -0,0 +1,194 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+
+# 工作进程在截止时刻停止后，结果回传到主进程的余量（秒）
+RESULT_GRACE_SECONDS = 0.01
+# 等待结果期间检查主线程中断请求的间隔（秒）
+CANCEL_POLL_SECONDS = 0.02
+
+
+# 工作进程内常驻的搜索对象（由 _init_worker 按地图静态数据构建）
+_worker_game = None
+
+
+def _init_worker(game_class, static_state):
+    """工作进程初始化：只装载地形、资源、首都等静态数据，不执行开局流程"""
+    global _worker_game
+    game = game_class.__new__(game_class)
+    for name, value in static_state.items():
+        setattr(game, name, value)
+    game.ai_parallel_workers = 0
+    game.build_move_tables()
+    game.reset_ai_caches()
+    _worker_game = game
+
+
+def _load_position(position, settings):
+    """装载任务的局面与主进程当前的搜索参数（难度切换、重新标定后随任务更新）"""
+    game = _worker_game
+    game.players = list(position['players'])
+    game.round_count = position['round_count']
+    for name, value in settings.items():
+        setattr(game, name, value)
+    return game
+
+
+def _local_deadline(deadline):
+    # 截止时间以墙钟传递，换算为本进程的 perf_counter
+    return None if deadline is None else time.perf_counter() + (deadline - time.time())
+
+
+def _wait_results(futures, deadline, cancelled):
+    """等待任务结果，直到全部完成、到达截止时刻（墙钟，可为 None）加回传余量，或 cancelled() 为真；
+    没有完成的任务取消排队，返回前不再等待"""
+    timeout_at = None if deadline is None else deadline + RESULT_GRACE_SECONDS
+    pending = futures
+    while pending:
+        timeout = CANCEL_POLL_SECONDS
+        if timeout_at is not None:
+            timeout = min(timeout, max(0.0, timeout_at - time.time()))
+        _, pending = wait(pending, timeout=timeout)
+        if cancelled() or (timeout_at is not None and time.time() >= timeout_at):
+            break
+    for future in pending:
+        future.cancel()
+
+
+def _followup_task(position, player, candidates, seeds, deadline, settings):
+    """按顺序为一组根走法计算最佳后续（与串行路径相同的下限剪枝与截止时间）"""
+    game = _load_position(position, settings)
+    game.move_deadline = _local_deadline(deadline)
+    try:
+        return game.evaluate_followups(
+            player, position['board'], position['move_count'], position['steps_left'], candidates, seeds=seeds
+        )
+    finally:
+        game.move_deadline = None
+
+
+def _deepening_task(position, player, from_pos, to_pos, deadline, first_deadline, settings):
+    """对单个根走法做迭代加深，返回每个完整搜完的层数对应的评估值。
+
+    与串行路径相同：第 1 层只在 first_deadline（本步截止时刻，可为 None）给出时受截止时间限制。
+    """
+    from .ai_logic import SearchTimeout
+
+    game = _load_position(position, settings)
+    game.prepare_transposition_table()
+    game.prepare_move_ordering()
+    board_state = position['board']
+    move_count_state = position['move_count']
+    game.zone_plan = game.plan_zone_objectives(player, board_state)
+    simulated, _ = game.apply_ai_move(
+        player, from_pos, to_pos, board_state, move_count_state, position['steps_left']
+    )
+    position_hash = game.compute_position_hash(board_state, move_count_state)
+    material = game.board_evaluator.material(player, board_state)
+    local_deadline = _local_deadline(deadline)
+    first_local_deadline = None if first_deadline is None else local_deadline
+
+    values = []
+    for depth in range(1, game.ai_search_max_depth + 1):
+        game.search_deadline = first_local_deadline if depth == 1 else local_deadline
+        try:
+            value = game._alphabeta_value(
+                player,
+                board_state,
+                move_count_state,
+                simulated['steps_left'],
+                depth=depth,
+                alpha=-10**9,
+                beta=10**9,
+                maximizing=False,
+                position_hash=position_hash,
+                material=material,
+            )
+        except SearchTimeout:
+            break
+        finally:
+            game.search_deadline = None
+        values.append(value)
+        if time.perf_counter() >= local_deadline:
+            break
+    return values
+
+
+class ParallelRootSearch:
+    """根节点并行：把互相独立的根走法分发给常驻工作进程，按原顺序合并结果。
+
+    每张地图创建一次进程池，工作进程初始化时缓存地形与资源等静态数据，
+    之后每个任务只传递当前棋盘、截止时间与搜索参数。
+
+    工作进程以 spawn 方式启动：主进程已有决策线程且初始化了 SDL，fork 出的子进程可能继承被占用的锁。
+    """
+
+    def __init__(self, game_class, static_state, worker_count):
+        self.worker_count = worker_count
+        self.executor = ProcessPoolExecutor(
+            max_workers=worker_count,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(game_class, static_state),
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def followups(self, position, player, candidates, seed, deadline, settings, cancelled):
+        """普通难度：并行计算各候选走法后的 (最佳后续得分, 后续走法)（结果与 candidates 顺序一致）。
+
+        候选按排名轮流分给各工作进程，每个进程按顺序计算并用本组已得最好总分剪枝；
+        deadline（墙钟时刻，可为 None）前或 cancelled() 为真前没有算完的候选结果为 None。
+        """
+        groups = [
+            list(range(start, len(candidates), self.worker_count))
+            for start in range(min(self.worker_count, len(candidates)))
+        ]
+        futures = [
+            self.executor.submit(
+                _followup_task,
+                position,
+                player,
+                [candidates[index] for index in group],
+                [seed + index for index in group],
+                deadline,
+                settings,
+            )
+            for group in groups
+        ]
+        _wait_results(futures, deadline, cancelled)
+        results = [None] * len(candidates)
+        for group, future in zip(groups, futures):
+            if future.done() and not future.cancelled():
+                for index, result in zip(group, future.result()):
+                    results[index] = result
+        return results
+
+    def deepen_root_moves(self, position, player, root_moves, deadline, first_deadline, settings, cancelled):
+        """困难难度：每个根走法独立迭代加深，返回各自完成的逐层评估值列表（与 root_moves 顺序一致）。
+
+        deadline 为加深的截止时刻，first_deadline 为第 1 层的截止时刻（可为 None，见 _deepening_task）；
+        first_deadline 前或 cancelled() 为真前没有返回的根走法结果为 None。
+        """
+        futures = [
+            self.executor.submit(
+                _deepening_task, position, player, from_pos, to_pos, deadline, first_deadline, settings
+            )
+            for _, from_pos, to_pos in root_moves
+        ]
+        _wait_results(futures, first_deadline, cancelled)
+        return [future.result() if future.done() and not future.cancelled() else None for future in futures]
+
+
+def make_search_position(board_state, move_count_state, steps_left, round_count, players, played):
+    """搜索用的局面快照：棋盘副本与回合状态（轮次、存活玩家、本轮已行动的玩家）"""
+    return {
+        'board': board_state.copy(),
+        'move_count': move_count_state.copy(),
+        'steps_left': steps_left,
+        'round_count': round_count,
+        'players': tuple(players),
+        'played': frozenset(played),
+    }
@@ -0,0 +1,132 @@
+from collections import namedtuple
+
+import numpy as np
+
+from ..config.constants import BOARD_SIZE
+
+
+PLAYER_SLOTS = 5  # 下标 0 为无主，1-4 为玩家
+
+# 走法图的扁平边表：src/dst/cost 为逐边数组；
+# incoming[c] 为落点是 c 的边编号，influence[c] 为格 c 变化时需要重算的 (落点, 边编号)。
+MoveEdges = namedtuple('MoveEdges', ['src', 'dst', 'cost', 'incoming', 'influence'])
+
+
+def build_move_edges(move_table):
+    cell_count = len(move_table)
+    src = np.concatenate(
+        [np.full(len(entries), index, dtype=np.int32) for index, entries in enumerate(move_table)]
+    )
+    dst = np.concatenate([entries[:, 0] for entries in move_table]).astype(np.int32)
+    cost = np.concatenate([entries[:, 1] for entries in move_table]).astype(np.int32)
+
+    order = np.argsort(dst, kind='stable')
+    bounds = np.searchsorted(dst[order], np.arange(cell_count + 1))
+    incoming = [order[bounds[index]:bounds[index + 1]] for index in range(cell_count)]
+
+    influence = []
+    for entries in move_table:
+        targets = entries[:, 0].astype(np.int32)
+        edge_ids = [incoming[target] for target in targets]
+        influence.append((targets, np.concatenate(edge_ids) if edge_ids else np.zeros(0, dtype=np.int64)))
+
+    return MoveEdges(src, dst, cost, incoming, influence)
+
+
+class ThreatField:
+    """威胁场：reach[p, c] 为玩家 p 的士兵一步可打到格 c 的最大血量。
+
+    查询时排除己方与目标格驻军所属玩家，结果与 get_max_enemy_threat_against 一致。
+    """
+
+    def __init__(self, edges, enemy_steps, owner, hp, reach):
+        self.edges = edges
+        self.enemy_steps = enemy_steps
+        self.owner = owner
+        self.hp = hp
+        self.reach = reach
+        self._ranked = None
+
+    @classmethod
+    def from_board(cls, board_state, edges, enemy_steps):
+        owner = board_state.owner.reshape(-1).astype(np.int32)
+        hp = board_state.hp.reshape(-1).astype(np.int32)
+        reach = np.zeros((PLAYER_SLOTS, owner.shape[0]), dtype=np.int32)
+        cls._accumulate(reach, edges, enemy_steps, owner, hp, None)
+        return cls(edges, enemy_steps, owner, hp, reach)
+
+    @staticmethod
+    def _accumulate(reach, edges, enemy_steps, owner, hp, edge_ids):
+        src = edges.src if edge_ids is None else edges.src[edge_ids]
+        dst = edges.dst if edge_ids is None else edges.dst[edge_ids]
+        cost = edges.cost if edge_ids is None else edges.cost[edge_ids]
+        src_owner = owner[src]
+        src_hp = hp[src]
+        active = (cost <= enemy_steps) & (src_owner > 0) & (src_hp > 0)
+        np.maximum.at(reach, (src_owner[active], dst[active]), src_hp[active])
+
+    def after_move(self, board_state, from_pos, to_pos):
+        """走子只改变起点与终点两格：复制后仅重算受这两格影响的落点列"""
+        owner = self.owner.copy()
+        hp = self.hp.copy()
+        reach = self.reach.copy()
+
+        touched_targets = []
+        touched_edges = []
+        for x, y in (from_pos, to_pos):
+            index = x * BOARD_SIZE + y
+            owner[index] = board_state.owner[x, y]
+            hp[index] = board_state.hp[x, y]
+            targets, edge_ids = self.edges.influence[index]
+            touched_targets.append(targets)
+            touched_edges.append(edge_ids)
+
+        reach[:, np.concatenate(touched_targets)] = 0
+        edge_ids = np.unique(np.concatenate(touched_edges))
+        self._accumulate(reach, self.edges, self.enemy_steps, owner, hp, edge_ids)
+        return ThreatField(self.edges, self.enemy_steps, owner, hp, reach)
+
+    def ranked_reach(self):
+        """批量打分用：返回 (最大值, 最大值来源格, 排除该来源后的次大值)，形状均为 (玩家, 格)。
+
+        某个走子移走或削弱来源格驻军时，该格对各落点的贡献可直接换成次大值；并列最大时次大值等于最大值。
+        """
+        if self._ranked is not None:
+            return self._ranked
+
+        edges = self.edges
+        src_owner = self.owner[edges.src]
+        src_hp = self.hp[edges.src]
+        active = np.nonzero((edges.cost <= self.enemy_steps) & (src_owner > 0) & (src_hp > 0))[0]
+        active_owner = src_owner[active]
+        active_dst = edges.dst[active]
+        active_hp = src_hp[active]
+
+        cell_count = self.owner.shape[0]
+        is_best = active_hp == self.reach[active_owner, active_dst]
+        chosen = np.full((PLAYER_SLOTS, cell_count), active.shape[0], dtype=np.int64)
+        order = np.arange(active.shape[0])
+        np.minimum.at(chosen, (active_owner[is_best], active_dst[is_best]), order[is_best])
+
+        best_src = np.full((PLAYER_SLOTS, cell_count), -1, dtype=np.int32)
+        has_best = chosen < active.shape[0]
+        best_src[has_best] = edges.src[active[chosen[has_best]]]
+
+        rest = np.ones(active.shape[0], dtype=bool)
+        rest[chosen[has_best]] = False
+        second = np.zeros((PLAYER_SLOTS, cell_count), dtype=np.int32)
+        np.maximum.at(second, (active_owner[rest], active_dst[rest]), active_hp[rest])
+
+        self._ranked = (self.reach, best_src, second)
+        return self._ranked
+
+    def threat_against(self, player, pos):
+        index = pos[0] * BOARD_SIZE + pos[1]
+        occupant = int(self.owner[index]) if self.hp[index] > 0 else 0
+        max_threat_hp = 0
+        for enemy, threat_hp in enumerate(self.reach[:, index].tolist()):
+            if enemy == 0 or enemy == player or enemy == occupant:
+                continue
+            if threat_hp > max_threat_hp:
+                max_threat_hp = threat_hp
+        return max_threat_hp
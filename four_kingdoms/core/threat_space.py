@@ -0,0 +1,289 @@
+import heapq
+import time
+
+import numpy as np
+
+from ..config.constants import BOARD_SIZE
+from .transposition import ZOBRIST_KEYS
+
+
+TSS_NODE_LIMIT = 2500  # 单次威胁空间搜索最多展开的节点数
+TSS_DEFENSE_DEPTH = 2  # 化解首都威胁时最多连走的步数
+
+_UNREACHABLE = 10**6
+
+
+def capital_reach_fields(move_sources, target_index):
+    """反向最短路：各格走到目标格所需的最少行动点 (cost) 与最少移动次数 (hops)，均为按格编号的列表"""
+    cell_count = BOARD_SIZE * BOARD_SIZE
+    cost = [_UNREACHABLE] * cell_count
+    cost[target_index] = 0
+    heap = [(0, target_index)]
+    while heap:
+        value, index = heapq.heappop(heap)
+        if value > cost[index]:
+            continue
+        for i, j, terrain_cost in move_sources[index]:
+            source = i * BOARD_SIZE + j
+            if value + terrain_cost < cost[source]:
+                cost[source] = value + terrain_cost
+                heapq.heappush(heap, (value + terrain_cost, source))
+
+    hops = [_UNREACHABLE] * cell_count
+    hops[target_index] = 0
+    frontier = [target_index]
+    while frontier:
+        next_frontier = []
+        for index in frontier:
+            for i, j, _ in move_sources[index]:
+                source = i * BOARD_SIZE + j
+                if hops[source] == _UNREACHABLE:
+                    hops[source] = hops[index] + 1
+                    next_frontier.append(source)
+        frontier = next_frontier
+    return cost, hops
+
+
+class ThreatSpaceSearch:
+    """威胁空间搜索：只展开在剩余行动点内逼近首都、攻击首都或清除首都周边守军的走法，
+    在本回合内寻找必然攻陷首都的走子序列（回合内对手不会行动，找到即为必胜）。
+
+    首都格归属一旦不再是原主人（攻入或同归于尽）即判定攻陷，与 move_soldier 的淘汰判定一致。
+    失败局面按 Zobrist 哈希记录，走子顺序不同的相同局面只搜一次。
+    超出节点上限或 deadline（time.perf_counter 时刻）到达时查询没有结论，抛出 ThreatSearchInconclusive：
+    调用方应按“未知”处理（交回常规搜索），不能当作“不存在攻陷序列”。
+    """
+
+    def __init__(self, game, node_limit=TSS_NODE_LIMIT, deadline=None):
+        self.game = game
+        self.node_limit = node_limit
+        self.deadline = deadline
+        self.nodes = 0
+
+    def _capital_targets(self, attacker, board_state, victims):
+        targets = []
+        for victim in victims:
+            if victim == attacker or victim not in self.game.capitals:
+                continue
+            x, y = self.game.capitals[victim]
+            if board_state.owner[x, y] != victim:
+                continue
+            cost, hops = self.game.capital_reach[victim]
+            targets.append((victim, (x, y), x * BOARD_SIZE + y, cost, hops))
+        return targets
+
+    def find_capture(self, attacker, board_state, move_count_state, steps_left, victims):
+        """返回攻陷 victims 中任一首都的走子序列 [(起点, 终点), ...]，证明不存在时返回 None；
+        超出节点上限或到达截止时间时抛出 ThreatSearchInconclusive"""
+        return self._find_capture(attacker, board_state, move_count_state, steps_left, victims)
+
+    def _find_capture(self, attacker, board_state, move_count_state, steps_left, victims):
+        targets = self._capital_targets(attacker, board_state, victims)
+        if not targets or steps_left <= 0:
+            return None
+        # 没有任何首都满足兵力/行动点的必要条件时不必进入搜索（常见情形，省去计算哈希）
+        units = self._movable_units(attacker, board_state, move_count_state)
+        if not any(self._reachable(board_state, units, steps_left, target) for target in targets):
+            return None
+        self.nodes = 0
+        board_hash, move_hash = ZOBRIST_KEYS.board_hash(board_state), ZOBRIST_KEYS.move_count_hash(move_count_state)
+        return self._search(attacker, board_state, move_count_state, steps_left, targets, board_hash, move_hash, set())
+
+    @staticmethod
+    def _movable_units(attacker, board_state, move_count_state):
+        """本回合仍可移动的士兵：[(格子编号, 血量, 剩余移动次数), ...]"""
+        hp_grid = board_state.hp
+        xs, ys = ((board_state.owner == attacker) & (hp_grid > 0) & (move_count_state < 3)).nonzero()
+        return [
+            (x * BOARD_SIZE + y, int(hp_grid[x, y]), 3 - int(move_count_state[x, y]))
+            for x, y in zip(xs.tolist(), ys.tolist())
+        ]
+
+    @staticmethod
+    def _reachable(board_state, units, steps_left, target):
+        """必要条件：能在剩余行动点与移动次数内走到首都的士兵，总血量要打得穿首都驻军。
+
+        按“每点血量所需行动点”从低到高做分数背包松弛，凑够驻军血量所需行动点是真实需求的下界，
+        超过剩余行动点即不可能攻陷（守军与路径冲突都只会让真实需求更高）。
+        """
+        _, (x, y), _, cost, hops = target
+        need = int(board_state.hp[x, y])
+        options = []
+        for source, source_hp, moves_left in units:
+            if cost[source] <= steps_left and hops[source] <= moves_left:
+                if need == 0:
+                    return True
+                options.append((cost[source] / source_hp, cost[source], source_hp))
+        options.sort()
+        spent = 0.0
+        for ratio, unit_cost, source_hp in options:
+            if source_hp >= need:
+                return spent + ratio * need <= steps_left
+            spent += unit_cost
+            need -= source_hp
+        return False
+
+    def _candidate_moves(self, attacker, board_state, move_count_state, steps_left, targets):
+        move_targets = self.game.move_targets
+        owner_grid = board_state.owner
+        hp_grid = board_state.hp
+        units = self._movable_units(attacker, board_state, move_count_state)
+        targets = [target for target in targets if self._reachable(board_state, units, steps_left, target)]
+        candidates = {}
+        for _, _, capital_index, cost, hops in targets:
+            # 起点到首都的最少行动点超过剩余行动点的士兵既攻不到首都，也够不着首都周边的守军
+            for source, source_hp, moves_left in units:
+                if cost[source] > steps_left:
+                    continue
+                x, y = divmod(source, BOARD_SIZE)
+                for tx, ty, terrain_cost in move_targets[source]:
+                    if terrain_cost > steps_left:
+                        continue
+                    target_owner = int(owner_grid[tx, ty])
+                    target_hp = int(hp_grid[tx, ty])
+                    if target_owner == attacker and target_hp > 0:
+                        continue
+                    target = tx * BOARD_SIZE + ty
+                    after = steps_left - terrain_cost
+                    if target == capital_index:
+                        priority = 0
+                    elif target_hp > 0 and target_owner > 0:
+                        # 清除守军：只攻打仍在剩余行动点范围内、且不会被反杀的敌军
+                        if cost[target] > after or source_hp < target_hp:
+                            continue
+                        priority = 1
+                    elif cost[target] < cost[source] and cost[target] <= after and hops[target] < moves_left:
+                        priority = 2
+                    else:
+                        continue
+                    key = ((x, y), (tx, ty))
+                    order = (priority, cost[target], -source_hp)
+                    if key not in candidates or order < candidates[key]:
+                        candidates[key] = order
+        return sorted(candidates, key=candidates.get)
+
+    def _search(self, attacker, board_state, move_count_state, steps_left, targets, board_hash, move_hash, failed):
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise _NodeLimit
+        if self.deadline is not None and (time.perf_counter() > self.deadline or self.game.search_cancelled()):
+            raise _Deadline
+        key = (board_hash, move_hash, steps_left)
+        if key in failed:
+            return None
+
+        game = self.game
+        for from_pos, to_pos in self._candidate_moves(attacker, board_state, move_count_state, steps_left, targets):
+            simulated, undo = game.apply_ai_move(attacker, from_pos, to_pos, board_state, move_count_state, steps_left)
+            if simulated is None:
+                continue
+            try:
+                if any(board_state.owner[pos[0], pos[1]] != victim for victim, pos, _, _, _ in targets):
+                    return [(from_pos, to_pos)]
+                if simulated['steps_left'] > 0:
+                    board_delta, move_delta = ZOBRIST_KEYS.move_delta(board_state, move_count_state, undo)
+                    line = self._search(
+                        attacker,
+                        board_state,
+                        move_count_state,
+                        simulated['steps_left'],
+                        targets,
+                        board_hash ^ board_delta,
+                        move_hash ^ move_delta,
+                        failed,
+                    )
+                    if line is not None:
+                        return [(from_pos, to_pos)] + line
+            finally:
+                game.undo_ai_move(board_state, move_count_state, undo)
+
+        failed.add(key)
+        return None
+
+    def find_defense(self, defender, board_state, move_count_state, steps_left, enemies, enemy_steps,
+                     depth=TSS_DEFENSE_DEPTH):
+        """己方首都在敌方下一回合可被必然攻陷时，找出 depth 步内使所有敌方都找不到攻陷序列的走子。
+
+        返回 (是否受威胁, 化解序列)；无法化解时序列为 None。敌方按各自满行动点、移动次数清零计算。
+        无法判断是否受威胁（超出节点上限或到达截止时间）时抛出 ThreatSearchInconclusive。
+        """
+        line = self._enemy_capture_line(defender, board_state, enemies, enemy_steps)
+        if line is None:
+            return False, None
+        return True, self._defend(defender, board_state, move_count_state, steps_left, enemies, enemy_steps, line, depth)
+
+    def _enemy_capture_line(self, defender, board_state, enemies, enemy_steps):
+        """任一敌方的攻陷序列，证明都不存在时返回 None；没有结论的查询异常直接向上传递"""
+        fresh_move_count = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+        for enemy in enemies:
+            line = self._find_capture(enemy, board_state, fresh_move_count, enemy_steps, [defender])
+            if line is not None:
+                return line
+        return None
+
+    def _defend(self, defender, board_state, move_count_state, steps_left, enemies, enemy_steps, line, depth):
+        """只尝试打断威胁序列的走法：攻击序列中的敌军、占住序列经过的格子，或进驻空着的首都"""
+        game = self.game
+        capital = game.capitals[defender]
+        cells = {capital}
+        for from_pos, to_pos in line:
+            cells.add(from_pos)
+            cells.add(to_pos)
+
+        owner_grid = board_state.owner
+        hp_grid = board_state.hp
+        candidates = []
+        xs, ys = ((owner_grid == defender) & (hp_grid > 0) & (move_count_state < 3)).nonzero()
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            source_hp = int(hp_grid[x, y])
+            for tx, ty, terrain_cost in game.move_targets[x * BOARD_SIZE + y]:
+                if terrain_cost > steps_left or (tx, ty) not in cells:
+                    continue
+                target_owner = int(owner_grid[tx, ty])
+                target_hp = int(hp_grid[tx, ty])
+                if target_hp > 0 and (target_owner == defender or source_hp < target_hp):
+                    continue
+                # 先攻击敌军，再按来源兵力从大到小占位
+                candidates.append((0 if target_hp > 0 else 1, -source_hp, (x, y), (tx, ty)))
+        candidates.sort()
+
+        for _, _, from_pos, to_pos in candidates:
+            simulated, undo = game.apply_ai_move(defender, from_pos, to_pos, board_state, move_count_state, steps_left)
+            if simulated is None:
+                continue
+            try:
+                try:
+                    next_line = self._enemy_capture_line(defender, board_state, enemies, enemy_steps)
+                except _NodeLimit:
+                    # 走子后是否仍受威胁没有结论：不算化解，也不再沿它继续
+                    continue
+                if next_line is None:
+                    return [(from_pos, to_pos)]
+                if depth > 1 and simulated['steps_left'] > 0:
+                    rest = self._defend(
+                        defender,
+                        board_state,
+                        move_count_state,
+                        simulated['steps_left'],
+                        enemies,
+                        enemy_steps,
+                        next_line,
+                        depth - 1,
+                    )
+                    if rest is not None:
+                        return [(from_pos, to_pos)] + rest
+            finally:
+                game.undo_ai_move(board_state, move_count_state, undo)
+        return None
+
+
+class ThreatSearchInconclusive(Exception):
+    """威胁空间搜索没有得出结论（超出节点上限或到达截止时间）"""
+
+
+class _NodeLimit(ThreatSearchInconclusive):
+    """威胁空间搜索超出节点上限"""
+
+
+class _Deadline(ThreatSearchInconclusive):
+    """威胁空间搜索到达截止时间"""
@@ -0,0 +1,101 @@
+import numpy as np
+
+from ..config.constants import BOARD_SIZE
+
+
+OWNER_SLOTS = 5  # 0 为无主，1-4 为玩家
+HP_SLOTS = 128  # 血量上限 99，留出余量
+MOVE_COUNT_SLOTS = 4  # 每回合最多移动 3 次
+
+BOUND_EXACT = 0
+BOUND_LOWER = 1
+BOUND_UPPER = 2
+
+
+class ZobristKeys:
+    """按格子的 (归属, 血量, 移动次数) 分配随机键，局面哈希为各键异或。
+
+    取值为 0 的键固定为 0，空棋盘与全零移动计数的哈希都为 0。
+    棋盘部分与移动计数部分分开维护，方便敌方反制时整体切换移动计数网格。
+    """
+
+    def __init__(self, seed=20240917):
+        rng = np.random.default_rng(seed)
+        cell_count = BOARD_SIZE * BOARD_SIZE
+        high = np.iinfo(np.int64).max
+        self.owner_keys = rng.integers(1, high, size=(cell_count, OWNER_SLOTS), dtype=np.int64)
+        self.hp_keys = rng.integers(1, high, size=(cell_count, HP_SLOTS), dtype=np.int64)
+        self.move_keys = rng.integers(1, high, size=(cell_count, MOVE_COUNT_SLOTS), dtype=np.int64)
+        self.owner_keys[:, 0] = 0
+        self.hp_keys[:, 0] = 0
+        self.move_keys[:, 0] = 0
+        self._cell_indices = np.arange(cell_count)
+        # 增量更新走 Python 热路径，预先转成嵌套列表
+        self._owner_rows = self.owner_keys.tolist()
+        self._hp_rows = self.hp_keys.tolist()
+        self._move_rows = self.move_keys.tolist()
+
+    def board_hash(self, board_state):
+        owner = board_state.owner.reshape(-1)
+        hp = np.minimum(board_state.hp.reshape(-1), HP_SLOTS - 1)
+        owner_hash = np.bitwise_xor.reduce(self.owner_keys[self._cell_indices, owner])
+        hp_hash = np.bitwise_xor.reduce(self.hp_keys[self._cell_indices, hp])
+        return int(owner_hash ^ hp_hash)
+
+    def move_count_hash(self, move_count_state):
+        move_count = np.minimum(move_count_state.reshape(-1), MOVE_COUNT_SLOTS - 1)
+        return int(np.bitwise_xor.reduce(self.move_keys[self._cell_indices, move_count]))
+
+    def move_delta(self, board_state, move_count_state, undo):
+        """由撤销记录与走子后的棋盘求两部分哈希的异或增量（撤销时再异或一次即可还原）"""
+        (x1, y1), (x2, y2), from_cell, to_cell, from_move_count, to_move_count = undo
+        board_delta = 0
+        move_delta = 0
+        for x, y, old_cell, old_move_count in ((x1, y1, from_cell, from_move_count), (x2, y2, to_cell, to_move_count)):
+            index = x * BOARD_SIZE + y
+            new_owner, new_hp, _, _ = board_state.cell(x, y)
+            new_hp = min(new_hp, HP_SLOTS - 1)
+            new_move_count = min(int(move_count_state[x, y]), MOVE_COUNT_SLOTS - 1)
+            board_delta ^= self._owner_rows[index][old_cell[0]] ^ self._owner_rows[index][new_owner]
+            board_delta ^= self._hp_rows[index][min(old_cell[1], HP_SLOTS - 1)] ^ self._hp_rows[index][new_hp]
+            move_delta ^= (
+                self._move_rows[index][min(int(old_move_count), MOVE_COUNT_SLOTS - 1)]
+                ^ self._move_rows[index][new_move_count]
+            )
+        return board_delta, move_delta
+
+
+ZOBRIST_KEYS = ZobristKeys()
+
+
+class TranspositionTable:
+    """定长置换表：按哈希低位分槽，每槽一条记录。
+
+    替换策略：空槽直接写入；旧搜索代留下的记录总是可被覆盖；
+    同一代内仅当新记录搜索深度不低于旧记录时覆盖（深度优先）。
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.slots[hash(key) % self.size]
+        if entry is None or entry[0] != key:
+            return None
+        return entry
+
+    def store(self, key, depth, value, bound, actions):
+        slot = hash(key) % self.size
+        entry = self.slots[slot]
+        if entry is not None and entry[0] != key and entry[5] == self.generation and entry[1] > depth:
+            return
+        self.slots[slot] = (key, depth, value, bound, actions, self.generation)
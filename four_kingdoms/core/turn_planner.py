@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+
+TURN_PLAN_UNITS = 8  # 参与整回合规划的士兵数（按首步最高分取前若干个）
+TURN_PLAN_BRANCHES = (2, 2, 1)  # 每个士兵连走第 1/2/3 步时保留的候选数
+TURN_PLAN_COMBO_LIMIT = 64  # 互相冲突的士兵合并成组后，组内组合数上限
+
+# moves 为 [(起点, 终点, 该步得分), ...]；cells 为链条经过的全部格子（含起点）
+MoveChain = namedtuple('MoveChain', ['moves', 'cost', 'value', 'cells'])
+
+
+def _conflict_groups(unit_chains):
+    """链条经过的格子有重叠的士兵合并为一组（并查集），组间的链条可以任意搭配"""
+    parent = list(range(len(unit_chains)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    owner_of_cell = {}
+    for index, chains in enumerate(unit_chains):
+        for chain in chains:
+            for cell in chain.cells:
+                other = owner_of_cell.setdefault(cell, index)
+                parent[find(other)] = find(index)
+
+    groups = {}
+    for index in range(len(unit_chains)):
+        groups.setdefault(find(index), []).append(index)
+    return list(groups.values())
+
+
+def _group_options(unit_chains, members, capacity):
+    """组内每个士兵至多选一条链、且所选链条两两不共用格子、总行动点不超过 capacity 的组合。
+
+    士兵按排名、各士兵的链条按得分从高到低先尝试选链再尝试跳过，超过上限截断时
+    舍弃的是跳过靠前（排名高）士兵的组合，保留最有希望的组合。
+    """
+    options = []
+    member_chains = [sorted(unit_chains[member], key=lambda chain: chain.value, reverse=True) for member in members]
+
+    def extend(position, chosen, cells, cost, value):
+        if len(options) >= TURN_PLAN_COMBO_LIMIT:
+            return
+        if position == len(members):
+            if chosen:
+                options.append((cost, value, list(chosen)))
+            return
+        for chain in member_chains[position]:
+            if cost + chain.cost > capacity or cells & chain.cells:
+                continue
+            chosen.append(chain)
+            extend(position + 1, chosen, cells | chain.cells, cost + chain.cost, value + chain.value)
+            chosen.pop()
+        extend(position + 1, chosen, cells, cost, value)
+
+    extend(0, [], frozenset(), 0, 0.0)
+    return options
+
+
+def solve_turn_knapsack(unit_chains, capacity):
+    """分组背包：每组至多选一个组合，总行动点不超过 capacity，使链条得分之和最大。
+
+    unit_chains[i] 为第 i 个士兵的候选链条（只收正分链条）；返回选中的链条，按得分从高到低排列。
+    """
+    # best[c] 为恰好花费 c 点行动点时的 (总分, 选中链条)
+    best = [None] * (capacity + 1)
+    best[0] = (0.0, [])
+    for members in _conflict_groups(unit_chains):
+        options = _group_options(unit_chains, members, capacity)
+        updated = list(best)
+        for spent, entry in enumerate(best):
+            if entry is None:
+                continue
+            for cost, value, chains in options:
+                total = spent + cost
+                if total > capacity:
+                    continue
+                candidate = (entry[0] + value, entry[1] + chains)
+                if updated[total] is None or candidate[0] > updated[total][0]:
+                    updated[total] = candidate
+        best = updated
+
+    _, chains = max((entry for entry in best if entry is not None), key=lambda entry: entry[0])
+    return sorted(chains, key=lambda chain: chain.value, reverse=True)
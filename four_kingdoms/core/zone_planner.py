@@ -0,0 +1,135 @@
+import numpy as np
+
+from ..config.constants import BOARD_SIZE, CITY_CAPITAL, CITY_MAJOR, CITY_SMALL, RESOURCE_GOLD_MINE
+from .influence_map import nearest_distance_field
+
+
+ZONE_OBJECTIVE_DEFEND = 0  # 回防受威胁的首都/金矿
+ZONE_OBJECTIVE_TAKE = 1  # 夺取某分区内的非己方城市/金矿/首都
+
+ZONE_PLAN_MAX_TAKE_ZONES = 2  # 每次规划最多选取的进攻分区数
+ZONE_DEFEND_RADIUS = 6  # 只从该距离内调兵回防
+ZONE_DEMAND_PER_TARGET = 6  # 每个待夺目标额外需要的兵力（血量）
+# 分区价值权重：首都 / 大城市 / 小城市 / 金矿
+ZONE_VALUE_CAPITAL = 5
+ZONE_VALUE_MAJOR_CITY = 3
+ZONE_VALUE_SMALL_CITY = 2
+ZONE_VALUE_MINE = 3
+
+
+def build_zone_grid(capitals, get_zone_owner):
+    """按首都划分分区（与地图生成的分区一致），返回扁平的分区归属数组"""
+    return np.array(
+        [get_zone_owner(x, y, capitals) for x in range(BOARD_SIZE) for y in range(BOARD_SIZE)],
+        dtype=np.int64,
+    )
+
+
+def build_target_values(city_grid, resource_map):
+    """各格作为战略目标的价值（扁平数组，非战略格为 0）"""
+    city = city_grid.reshape(-1)
+    values = np.select(
+        [city == CITY_CAPITAL, city == CITY_MAJOR, city == CITY_SMALL],
+        [ZONE_VALUE_CAPITAL, ZONE_VALUE_MAJOR_CITY, ZONE_VALUE_SMALL_CITY],
+        0,
+    )
+    return values + np.where(resource_map.reshape(-1) == RESOURCE_GOLD_MINE, ZONE_VALUE_MINE, 0)
+
+
+class ZonePlan:
+    """分区级战略计划：每个目标有一组目标格，己方每个士兵（按所在格）分配到一个目标。
+
+    goal_distance[k] 为各格到第 k 个目标的距离，最后一行为到任一目标的最近距离，
+    供未分配的士兵（含搜索中走到新格的士兵）使用。
+
+    key 标识计划内容：计划决定己方节点的候选裁剪，置换表按它区分不同计划下搜得的记录。
+    """
+
+    def __init__(self, player, objectives, goal_distance, unit_goal, strategic_cells):
+        self.player = player
+        self.objectives = objectives
+        self.goal_distance = goal_distance
+        self.unit_goal = unit_goal
+        self.strategic_cells = strategic_cells
+        self.key = hash((player, goal_distance.tobytes(), unit_goal.tobytes(), strategic_cells.tobytes()))
+
+    def relevant_edges(self, edges, board_state, edge_ids, min_keep):
+        """只保留与士兵目标相关的走法：靠近所分配目标的走法，以及吃子/夺取战略格等战术走法。
+
+        剩余走法不足 min_keep 时不做裁剪，避免战略层把战术搜索的候选压得过窄。
+        """
+        src = edges.src[edge_ids]
+        dst = edges.dst[edge_ids]
+        goal = self.unit_goal[src]
+        approach = self.goal_distance[goal, dst] < self.goal_distance[goal, src]
+        owner = board_state.owner.reshape(-1)[dst]
+        hp = board_state.hp.reshape(-1)[dst]
+        tactical = (owner != self.player) & (((owner > 0) & (hp > 0)) | self.strategic_cells[dst])
+        keep = approach | tactical
+        if np.count_nonzero(keep) < min_keep:
+            return edge_ids
+        return edge_ids[keep]
+
+
+def build_zone_plan(player, board_state, zone_grid, target_values, capital_mask, mine_mask, pressure):
+    """战略层：汇总各分区兵力与目标价值，选出回防与进攻目标，再按距离贪心给士兵分配目标。
+
+    target_values 为 build_target_values 的结果，pressure 为影响图的敌方压力。
+    没有任何目标时返回 None。
+    """
+    owner = board_state.owner.reshape(-1).astype(np.int64)
+    hp = board_state.hp.reshape(-1).astype(np.int64)
+    own_unit = (owner == player) & (hp > 0)
+    enemy_unit = (owner > 0) & (owner != player) & (hp > 0)
+    zone_count = int(zone_grid.max()) + 1
+    enemy_strength = np.bincount(zone_grid[enemy_unit], weights=hp[enemy_unit], minlength=zone_count)
+
+    # (优先级, 种类, 需求兵力, 目标格)
+    objectives = []
+    # 首都需有主才算目标，与战略距离图的目标定义一致
+    is_target = (target_values > 0) & (owner != player) & ((owner > 0) | ~capital_mask)
+    guarded = own_unit & (capital_mask | mine_mask) & (pressure > 0)
+    for cell in np.nonzero(guarded)[0].tolist():
+        demand = int(pressure[cell] - hp[cell]) + 1
+        if demand > 0:
+            objectives.append((10.0 * target_values[cell], ZONE_OBJECTIVE_DEFEND, demand, np.array([cell])))
+
+    zone_values = np.bincount(zone_grid[is_target], weights=target_values[is_target], minlength=zone_count)
+    zone_priority = zone_values / (1.0 + enemy_strength / 10.0)
+    for zone in np.argsort(-zone_priority, kind='stable')[:ZONE_PLAN_MAX_TAKE_ZONES].tolist():
+        if zone_values[zone] <= 0:
+            continue
+        targets = np.nonzero(is_target & (zone_grid == zone))[0]
+        demand = int(enemy_strength[zone]) + ZONE_DEMAND_PER_TARGET * targets.shape[0]
+        objectives.append((float(zone_priority[zone]), ZONE_OBJECTIVE_TAKE, demand, targets))
+
+    if not objectives:
+        return None
+    objectives.sort(key=lambda objective: objective[0], reverse=True)
+
+    goal_distance = np.empty((len(objectives) + 1, owner.shape[0]), dtype=np.int64)
+    for index, (_, _, _, targets) in enumerate(objectives):
+        target_xs, target_ys = np.divmod(targets, BOARD_SIZE)
+        goal_distance[index] = nearest_distance_field(target_xs, target_ys)
+    goal_distance[-1] = goal_distance[:-1].min(axis=0)
+
+    # 按优先级依次取最近的未分配士兵，直到兵力满足需求
+    unit_goal = np.full(owner.shape[0], len(objectives), dtype=np.int64)
+    units = np.nonzero(own_unit)[0]
+    assigned = np.zeros(units.shape[0], dtype=bool)
+    for index, (_, kind, demand, _) in enumerate(objectives):
+        distance = goal_distance[index, units]
+        supplied = 0
+        for unit in np.argsort(distance, kind='stable').tolist():
+            if supplied >= demand:
+                break
+            if assigned[unit]:
+                continue
+            if kind == ZONE_OBJECTIVE_DEFEND and distance[unit] > ZONE_DEFEND_RADIUS:
+                break
+            assigned[unit] = True
+            unit_goal[units[unit]] = index
+            supplied += int(hp[units[unit]])
+
+    objectives = [(kind, targets) for _, kind, _, targets in objectives]
+    return ZonePlan(player, objectives, goal_distance, unit_goal, target_values > 0)
@@ -1,3 +1,5 @@
+import random
+
 import pygame
 
 from ..config.constants import (
@@ -5,6 +7,7 @@ from ..config.constants import (
     AI_DIFFICULTY_EASY,
     AI_DIFFICULTY_HARD,
     AI_DIFFICULTY_LABELS,
+    AI_DIFFICULTY_MCTS,
     AI_DIFFICULTY_NORMAL,
     BOARD_PIXEL_SIZE,
     CHINESE_FONT_LARGE,
@@ -16,6 +19,7 @@ from ..config.constants import (
     MODE_HOTSEAT,
     MODE_LABELS,
     MODE_SINGLE_AI,
+    OPENING_BOOK_MAP_SEEDS,
     TILE_SIZE,
     WIDTH,
 )
@@ -35,6 +39,8 @@ class App:
         self.running = True
         self.pending_mode = None
         self.ai_difficulty = AI_DIFFICULTY_DEFAULT
+        # 经典地图：从固定编号的种子地图中抽取（开局库覆盖这些地图），否则每局随机生成
+        self.classic_maps = False
         self.mode_button_hotseat = pygame.Rect(WIDTH // 2 - 180, HEIGHT // 2 - 30, 360, 58)
         self.mode_button_ai = pygame.Rect(WIDTH // 2 - 180, HEIGHT // 2 + 46, 360, 58)
         self.map_buttons = [
@@ -48,9 +54,17 @@ class App:
             ai_difficulty = self.ai_difficulty
         if ai_difficulty in AI_DIFFICULTY_LABELS:
             self.ai_difficulty = ai_difficulty
-        self.game = self.game_class(mode, map_preset_id=map_preset_id, ai_difficulty=self.ai_difficulty)
+        self.game = self.game_class(
+            mode,
+            map_preset_id=map_preset_id,
+            ai_difficulty=self.ai_difficulty,
+            map_seed=self.pick_map_seed(),
+        )
         self.pending_mode = None
 
+    def pick_map_seed(self):
+        return random.randrange(OPENING_BOOK_MAP_SEEDS) if self.classic_maps else None
+
     def draw_text_with_shadow(self, font, text, pos, color, center=False):
         draw_text_with_shadow_shared(self.screen, font, text, pos, color, center=center)
 
@@ -86,7 +100,7 @@ class App:
         self.draw_mode_button(self.mode_button_ai, '2. 1人对战3个AI', '玩家1手动操作，玩家2/3/4由AI控制', hover_ai)
         self.draw_text_with_shadow(
             CHINESE_FONT_TINY,
-            f'AI难度: {AI_DIFFICULTY_LABELS[self.ai_difficulty]} (F1/F2/F3切换)',
+            f'AI难度: {AI_DIFFICULTY_LABELS[self.ai_difficulty]} (F1-F4切换)',
             (WIDTH // 2, self.mode_button_ai.bottom + 20),
             (176, 188, 206),
             center=True,
@@ -124,9 +138,13 @@ class App:
         help_text = '按键 1/2/3 选择关卡，Backspace 返回模式选择'
         if self.pending_mode == MODE_SINGLE_AI:
             help_text = (
-                f'按键 1/2/3 选择关卡，F1/F2/F3调难度({AI_DIFFICULTY_LABELS[self.ai_difficulty]})，Backspace 返回模式'
+                f'按键 1/2/3 选择关卡，F1-F4调难度({AI_DIFFICULTY_LABELS[self.ai_difficulty]})，Backspace 返回模式'
             )
         self.draw_text_with_shadow(CHINESE_FONT_TINY, help_text, (WIDTH // 2, panel.y + 96), (176, 188, 206), center=True)
+        map_kind = f'经典地图(共{OPENING_BOOK_MAP_SEEDS}张，AI有开局库)' if self.classic_maps else '随机生成'
+        self.draw_text_with_shadow(
+            CHINESE_FONT_TINY, f'地图: {map_kind} (C切换)', (WIDTH // 2, panel.y + 116), (176, 188, 206), center=True
+        )
 
         for idx, map_id in enumerate(MAP_PRESET_ORDER):
             preset = MAP_PRESETS[map_id]
@@ -180,15 +198,10 @@ class App:
         if game is None or not game.is_human_turn() or game.renderer.show_help:
             return
 
-        movable_units = []
-        for pos in game.get_player_soldiers(game.current_player):
-            if game.get_possible_moves_for(pos):
-                movable_units.append(pos)
-
+        movable_units = game.get_movable_soldiers(game.current_player)
         if not movable_units:
             return
 
-        movable_units.sort()
         if game.selected_pos in movable_units:
             current_idx = movable_units.index(game.selected_pos)
             next_pos = movable_units[(current_idx + 1) % len(movable_units)]
@@ -220,6 +233,8 @@ class App:
                                 self.ai_difficulty = AI_DIFFICULTY_NORMAL
                             elif event.key == pygame.K_F3:
                                 self.ai_difficulty = AI_DIFFICULTY_HARD
+                            elif event.key == pygame.K_F4:
+                                self.ai_difficulty = AI_DIFFICULTY_MCTS
                             elif event.key == pygame.K_ESCAPE:
                                 self.running = False
                         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -253,6 +268,10 @@ class App:
                                 self.ai_difficulty = AI_DIFFICULTY_NORMAL
                             elif event.key == pygame.K_F3:
                                 self.ai_difficulty = AI_DIFFICULTY_HARD
+                            elif event.key == pygame.K_F4:
+                                self.ai_difficulty = AI_DIFFICULTY_MCTS
+                            elif event.key == pygame.K_c:
+                                self.classic_maps = not self.classic_maps
                             elif event.key in (pygame.K_BACKSPACE, pygame.K_m):
                                 self.pending_mode = None
                             elif event.key == pygame.K_ESCAPE:
@@ -291,6 +310,7 @@ class App:
                             game.game_mode,
                             map_preset_id=getattr(game, 'map_preset_id', DEFAULT_MAP_PRESET),
                             ai_difficulty=getattr(game, 'ai_difficulty', self.ai_difficulty),
+                            map_seed=self.pick_map_seed(),
                         )
                         game = self.game
                         renderer = game.renderer
@@ -314,6 +334,10 @@ class App:
                         self.ai_difficulty = AI_DIFFICULTY_HARD
                         if game.game_mode == MODE_SINGLE_AI:
                             game.set_ai_difficulty(AI_DIFFICULTY_HARD)
+                    elif event.key == pygame.K_F4:
+                        self.ai_difficulty = AI_DIFFICULTY_MCTS
+                        if game.game_mode == MODE_SINGLE_AI:
+                            game.set_ai_difficulty(AI_DIFFICULTY_MCTS)
                     elif event.key in (pygame.K_m, pygame.K_BACKSPACE):
                         self.pending_mode = None
                         self.game = None
@@ -605,7 +605,7 @@ class Renderer:
 
         tips = '左键选择 右键取消 滚轮日志 ESC退出'
         if self.game_mode == MODE_SINGLE_AI:
-            tips = 'F1/F2/F3切换AI难度  M/Backspace返回模式'
+            tips = 'F1-F4切换AI难度  M/Backspace返回模式'
         self.draw_text_with_shadow(screen, CHINESE_FONT_TINY, tips, (ops_box.x + 14, ops_box.y + 194), (188, 194, 204))
 
         # 帮助弹窗
@@ -0,0 +1,46 @@
+import os
+import random
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pygame
+import pytest
+
+from four_kingdoms.config.constants import AI_DIFFICULTY_NORMAL
+
+
+@pytest.fixture(scope='session', autouse=True)
+def pygame_session():
+    pygame.init()
+    yield
+    pygame.quit()
+
+
+@pytest.fixture(autouse=True)
+def ai_budget_file(tmp_path, monkeypatch):
+    """标定结果写到临时目录，不读写用户目录下的真实文件；预先按参考机耗时写入，测试中不触发后台标定"""
+    from four_kingdoms.core import ai_budget
+
+    path = tmp_path / 'ai_budget.json'
+    monkeypatch.setattr(ai_budget, 'AI_BUDGET_PATH', str(path))
+    ai_budget.save_ai_budget(ai_budget.AI_REFERENCE_BATCH_MS)
+    return path
+
+
+@pytest.fixture
+def make_game():
+    """按难度创建四方全部由 AI 控制的对局（随机种子固定，结果可复现）"""
+    from four_kingdoms.core.game_core import Game
+
+    def factory(ai_difficulty=AI_DIFFICULTY_NORMAL, seed=1):
+        random.seed(seed)
+        np.random.seed(seed)
+        game = Game(ai_difficulty=ai_difficulty)
+        game.ai_players = {1, 2, 3, 4}
+        game.human_players = set()
+        return game
+
+    return factory
@@ -0,0 +1,67 @@
+"""测试用局面：AI 自对弈得到的中局局面，以及清空棋盘后手工摆放的残局"""
+
+from four_kingdoms.config.constants import BOARD_SIZE
+
+
+def advance(game, steps):
+    """由 AI 代走若干步，得到中局局面"""
+    for _ in range(steps):
+        if game.game_over:
+            break
+        moved = game.perform_ai_action()
+        if game.game_over:
+            break
+        if game.steps_left <= 0 or not moved:
+            game.next_player()
+
+
+def midgame_positions(game, turns, every):
+    """AI 自对弈，每隔 every 步记下 (当前玩家, 棋盘副本, 移动计数副本, 剩余行动点)"""
+    positions = []
+    for step in range(turns):
+        if game.game_over:
+            break
+        if step % every == 0:
+            positions.append(
+                (game.current_player, game.board.copy(), game.move_count_grid.copy(), game.steps_left)
+            )
+        moved = game.perform_ai_action()
+        if game.game_over:
+            break
+        if game.steps_left <= 0 or not moved:
+            game.next_player()
+    return positions
+
+
+def clear_units(game, players):
+    """清空全部归属与驻军（城市保留），players 的首都各留 1 点驻军"""
+    board = game.board
+    board.owner[:] = 0
+    board.hp[:] = 0
+    game.move_count_grid[:] = 0
+    for player in players:
+        x, y = game.capitals[player]
+        board[x, y] = [player, 1, board.city[x, y], 0]
+    return board
+
+
+def cheapest_sources(game, pos, exclude=()):
+    """能一步走到 pos 的格子，按行动点消耗从低到高"""
+    sources = game.move_sources[pos[0] * BOARD_SIZE + pos[1]]
+    return [(i, j) for i, j, _ in sorted(sources, key=lambda entry: entry[2]) if (i, j) not in exclude]
+
+
+def place(board, pos, player, hp):
+    board[pos[0], pos[1]] = [player, hp, board.city[pos[0], pos[1]], 0]
+
+
+def threatened_capital(game, with_defender):
+    """玩家 2 的 4 血士兵贴着玩家 1 的首都（1 血）；with_defender 时玩家 1 另有一个能吃掉它的 6 血士兵"""
+    board = clear_units(game, (1, 2))
+    capital = game.capitals[1]
+    attacker = cheapest_sources(game, capital)[0]
+    place(board, attacker, 2, 4)
+    if with_defender:
+        defender = cheapest_sources(game, attacker, exclude=(capital,))[0]
+        place(board, defender, 1, 6)
+    return board
@@ -0,0 +1,40 @@
+from four_kingdoms.config import constants
+from four_kingdoms.config.constants import AI_DIFFICULTY_HARD, AI_DIFFICULTY_MCTS, AI_DIFFICULTY_NORMAL
+from four_kingdoms.core import ai_budget
+from four_kingdoms.core.ai_budget import AI_REFERENCE_BATCH_MS, derive_ai_budget
+
+
+def test_budget_differs_per_difficulty():
+    budget = derive_ai_budget(AI_REFERENCE_BATCH_MS)
+    normal, hard, mcts = budget[AI_DIFFICULTY_NORMAL], budget[AI_DIFFICULTY_HARD], budget[AI_DIFFICULTY_MCTS]
+    assert normal != hard != mcts
+    for difficulty, settings in budget.items():
+        think_ms = constants.AI_TARGET_MOVE_LATENCY_MS[difficulty] - constants.AI_DEADLINE_MARGIN_MS
+        assert settings['ai_search_budget_ms'] == think_ms
+
+
+def test_budget_scales_with_machine_speed():
+    slow = derive_ai_budget(AI_REFERENCE_BATCH_MS * 4)
+    fast = derive_ai_budget(AI_REFERENCE_BATCH_MS / 4)
+    assert slow[AI_DIFFICULTY_NORMAL]['ai_normal_beam'] < fast[AI_DIFFICULTY_NORMAL]['ai_normal_beam']
+    assert slow[AI_DIFFICULTY_HARD]['ai_search_max_depth'] < fast[AI_DIFFICULTY_HARD]['ai_search_max_depth']
+    assert slow[AI_DIFFICULTY_MCTS]['ai_mcts_rollouts'] < fast[AI_DIFFICULTY_MCTS]['ai_mcts_rollouts']
+
+
+def test_budget_follows_latency_target(monkeypatch):
+    base = derive_ai_budget(AI_REFERENCE_BATCH_MS)
+    latency = dict(constants.AI_TARGET_MOVE_LATENCY_MS)
+    latency[AI_DIFFICULTY_HARD] *= 4
+    monkeypatch.setattr(ai_budget, 'AI_TARGET_MOVE_LATENCY_MS', latency)
+    longer = derive_ai_budget(AI_REFERENCE_BATCH_MS)
+    assert longer[AI_DIFFICULTY_HARD]['ai_search_budget_ms'] > base[AI_DIFFICULTY_HARD]['ai_search_budget_ms']
+    assert longer[AI_DIFFICULTY_HARD]['ai_search_max_depth'] > base[AI_DIFFICULTY_HARD]['ai_search_max_depth']
+    assert longer[AI_DIFFICULTY_NORMAL] == base[AI_DIFFICULTY_NORMAL]
+
+
+def test_saved_measurement_round_trips(ai_budget_file):
+    assert ai_budget.load_ai_budget() == derive_ai_budget(AI_REFERENCE_BATCH_MS)
+    ai_budget.save_ai_budget(AI_REFERENCE_BATCH_MS * 2)
+    assert ai_budget.load_ai_budget(str(ai_budget_file)) == derive_ai_budget(AI_REFERENCE_BATCH_MS * 2)
+    ai_budget_file.write_text('{', encoding='utf-8')
+    assert ai_budget.load_ai_budget() is None
@@ -0,0 +1,111 @@
+import time
+
+from four_kingdoms.config.constants import AI_DIFFICULTY_HARD
+
+
+def test_stop_background_ai_interrupts_running_search(make_game):
+    game = make_game(AI_DIFFICULTY_HARD)
+    game.opening_book_enabled = False
+    game.ai_search_budget_ms = 10000
+    game.ai_search_max_depth = 30
+    future = game.submit_ai_decision(game.current_player, time_budget_ms=10000)[1]
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    game.stop_background_ai()
+    assert time.perf_counter() - started < 1.0
+    assert future.done()
+    assert game.pending_ai_decision is None
+    # 中断只影响那次后台任务，之后的搜索照常进行
+    assert game.search_cancel is None
+    assert game.plan_ai_turn(game.current_player, time_budget_ms=50)
+
+
+def test_ponder_position_carries_round_state(make_game):
+    game = make_game()
+    game.ai_players = {2, 3, 4}
+    game.human_players = {1}
+    position = game.snapshot_search_position()
+    assert position['played'] == frozenset()
+
+    player, next_position = game._next_ponder_position(1, position, [])
+    assert player == 2
+    assert next_position['played'] == frozenset({1})
+    # 本轮已行动的玩家不同，预思考缓存不能混用
+    same_board = dict(next_position, played=frozenset())
+    assert game.ponder_key(2, next_position) != game.ponder_key(2, same_board)
+
+
+def test_reset_game_stops_background_decision_first(make_game):
+    game = make_game(AI_DIFFICULTY_HARD)
+    game.opening_book_enabled = False
+    game.ai_search_budget_ms = 10000
+    game.ai_search_max_depth = 30
+    future = game.submit_ai_decision(game.current_player, time_budget_ms=10000)[1]
+    time.sleep(0.05)
+
+    game.reset_game()
+    assert future.done()
+    assert game.pending_ai_decision is None
+    assert game.turn_plan is None
+
+
+def test_due_time_plays_fallback_when_worker_is_busy(make_game):
+    game = make_game(AI_DIFFICULTY_HARD)
+    game.opening_book_enabled = False
+    # 工作线程被占住，本步决策排不上：到执行时刻必须改走兜底计划
+    blocker = game.get_ai_decision_executor().submit(time.sleep, 2.0)
+    history = len(game.move_history)
+
+    started = time.perf_counter()
+    while len(game.move_history) == history and time.perf_counter() - started < 1.5:
+        game.maybe_run_ai_turn()
+        time.sleep(0.002)
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    blocker.result()
+
+    assert len(game.move_history) == history + 1
+    assert elapsed_ms < game.ai_move_latency_ms + 50
+
+
+def test_failed_background_decision_plays_fallback(make_game, caplog):
+    game = make_game(AI_DIFFICULTY_HARD)
+    game.opening_book_enabled = False
+
+    def failing_plan(*args, **kwargs):
+        raise RuntimeError('search failed')
+
+    game.plan_ai_turn = failing_plan
+    history = len(game.move_history)
+    started = time.perf_counter()
+    while len(game.move_history) == history and time.perf_counter() - started < 1.5:
+        game.maybe_run_ai_turn()
+        time.sleep(0.002)
+
+    # 异常不会传到主循环：记录下来并改走兜底计划
+    assert len(game.move_history) == history + 1
+    assert any(record.exc_info and record.exc_info[0] is RuntimeError for record in caplog.records)
+
+
+def test_search_reads_round_state_from_snapshot(make_game):
+    game = make_game()
+    player = game.current_player
+    position = game.snapshot_search_position()
+    seen = []
+    choose = game.choose_ai_action
+
+    def recording_choose(player, position=None):
+        seen.append((tuple(game.search_players()), game.search_round_count(), game.search_steps_per_turn()))
+        return choose(player, position=position)
+
+    game.choose_ai_action = recording_choose
+    # 主线程在后台规划期间淘汰玩家、推进轮次：搜索仍按提交时的快照计算
+    game.players = [player]
+    game.round_count = position['round_count'] + 20
+    assert game.plan_ai_turn(player, position)
+    assert seen == [(
+        tuple(position['players']),
+        position['round_count'],
+        game.steps_per_turn_for_round(position['round_count']),
+    )]
+    assert game.search_players() == [player]
@@ -0,0 +1,26 @@
+from positions import midgame_positions
+
+
+def test_batch_scores_match_scalar_scorer(make_game):
+    game = make_game(seed=3)
+    checked = 0
+    for player, board, move_count, steps_left in midgame_positions(game, 90, 15):
+        edge_ids, scores = game.score_ai_actions_batch(player, board, move_count, steps_left)
+        actions = game.enumerate_ai_actions(player, board, move_count, steps_left)
+        assert [game.edge_action(edge_id) for edge_id in edge_ids] == actions
+        for (from_pos, to_pos), batch_score in zip(actions, scores):
+            score, _ = game.score_ai_move(player, from_pos, to_pos, board, move_count, steps_left, add_noise=False)
+            assert score == batch_score
+            checked += 1
+    assert checked > 50
+
+
+def test_batch_scoring_leaves_position_untouched(make_game):
+    game = make_game(seed=3)
+    player, board, move_count, steps_left = midgame_positions(game, 31, 30)[-1]
+    board_before = board.copy()
+    move_count_before = move_count.copy()
+    game.score_ai_actions_batch(player, board, move_count, steps_left)
+    assert board.owner.tobytes() == board_before.owner.tobytes()
+    assert board.hp.tobytes() == board_before.hp.tobytes()
+    assert (move_count == move_count_before).all()
@@ -0,0 +1,41 @@
+import pickle
+
+import numpy as np
+
+from four_kingdoms.config.constants import BOARD_SIZE
+from four_kingdoms.core.compact_board import CompactBoard
+
+
+def test_compact_board_keeps_array_indexing():
+    reference = np.zeros((BOARD_SIZE, BOARD_SIZE, 4), dtype=int)
+    reference[2, 3] = [1, 7, 2, 0]
+    reference[5, 5, 1] = 120
+    board = CompactBoard.from_array(reference)
+
+    assert board[2, 3] == (1, 7, 2, 0)
+    assert board[5, 5, 1] == 120 and isinstance(board[5, 5, 1], int)
+    assert np.array_equal(np.asarray(board), reference)
+    assert np.array_equal(board[:, :, 0], reference[:, :, 0])
+    assert np.array_equal(board[[2, 5], [3, 5], 1], [7, 120])
+    assert not board[:, :, 3].any()
+
+    board[4, 4] = [3, 9, 1, 5]
+    board[4, 5, 0] = 2
+    board[4, 5, 3] = 8  # 兵种通道不再存储，写入被忽略
+    assert board.cell(4, 4) == (3, 9, 1, 0)
+    assert board[4, 5] == (2, 0, 0, 0)
+    # 血量按整数读取，相减不会按 uint8 回绕
+    assert board[2, 3, 1] - board[5, 5, 1] == -113
+
+
+def test_compact_board_copy_and_pickle_are_independent():
+    board = CompactBoard(BOARD_SIZE)
+    board[1, 1] = [2, 5, 0, 0]
+    copied = board.copy()
+    restored = pickle.loads(pickle.dumps(board))
+    board[1, 1, 1] = 9
+
+    assert copied[1, 1] == (2, 5, 0, 0)
+    assert restored[1, 1] == (2, 5, 0, 0)
+    restored[1, 1, 1] = 4
+    assert restored.hp[1, 1] == 4
@@ -0,0 +1,11 @@
+import numpy as np
+
+from positions import midgame_positions
+
+
+def test_score_terms_sum_to_batch_score(make_game):
+    game = make_game(seed=4)
+    player, board, move_count, steps_left = midgame_positions(game, 41, 40)[-1]
+    terms = {}
+    _, scores = game.score_ai_actions_batch(player, board, move_count, steps_left, terms=terms)
+    assert np.allclose(sum(terms.values()), scores)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from four_kingdoms.core.endgame import ENDGAME_WIN, END_TURN, EndgameSolver
+
+from positions import cheapest_sources, clear_units, place, threatened_capital
+
+
+def test_endgame_solver_proves_capital_capture(make_game):
+    game = make_game()
+    board = clear_units(game, (1, 2))
+    capital = game.capitals[2]
+    source = cheapest_sources(game, capital)[0]
+    place(board, source, 1, 5)
+
+    action, value, _ = EndgameSolver(game, time_budget_ms=2000).solve(
+        1, board, game.move_count_grid, 6, 8, (1, 2), frozenset()
+    )
+    assert action == (source, capital)
+    assert value >= ENDGAME_WIN // 2
+
+
+def test_endgame_solver_defends_or_proves_loss(make_game):
+    game = make_game()
+    board = threatened_capital(game, with_defender=True)
+    before = np.asarray(board)
+    action, value, depth = EndgameSolver(game, time_budget_ms=2000).solve(
+        1, board, game.move_count_grid, 6, 8, (1, 2), frozenset()
+    )
+    assert np.array_equal(np.asarray(board), before)
+    assert depth >= 2
+    assert action != END_TURN
+    assert value > -ENDGAME_WIN // 2
+
+    # 没有守军时首都必失，求解应证明败局
+    game.endgame_cache.clear()
+    board = threatened_capital(game, with_defender=False)
+    _, value, _ = EndgameSolver(game, time_budget_ms=2000).solve(
+        1, board, game.move_count_grid, 6, 8, (1, 2), frozenset()
+    )
+    assert value <= -ENDGAME_WIN // 2
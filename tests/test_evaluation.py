@@ -0,0 +1,58 @@
+from four_kingdoms.config.constants import BOARD_SIZE, RESOURCE_GOLD_MINE
+from four_kingdoms.core.evaluation import (
+    EVAL_CELL_WEIGHTS,
+    EVAL_CITY_WEIGHTS,
+    EVAL_HP_WEIGHTS,
+    EVAL_MINE_WEIGHTS,
+    RELATION_ENEMY,
+    RELATION_NONE,
+    RELATION_OWN,
+)
+
+from positions import advance
+
+
+def reference_material(game, player, board):
+    """逐格累加的评估，作为向量化实现的对照"""
+    total = 0
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            owner, hp, city, _ = board.cell(x, y)
+            if owner == 0:
+                relation = RELATION_NONE
+            else:
+                relation = RELATION_OWN if owner == player else RELATION_ENEMY
+            total += EVAL_CELL_WEIGHTS[relation] + EVAL_HP_WEIGHTS[relation] * hp
+            if city in EVAL_CITY_WEIGHTS:
+                total += EVAL_CITY_WEIGHTS[city][relation]
+            if game.resource_map[x, y] == RESOURCE_GOLD_MINE:
+                total += EVAL_MINE_WEIGHTS[relation]
+    return total
+
+
+def test_material_matches_cell_by_cell_reference(make_game):
+    game = make_game()
+    advance(game, 60)
+    for player in game.players:
+        assert game.board_evaluator.material(player, game.board) == reference_material(game, player, game.board)
+
+
+def test_make_unmake_tracks_material(make_game):
+    game = make_game()
+    advance(game, 60)
+    checked = 0
+    for player in game.players:
+        board = game.board
+        move_count = game.move_count_grid
+        material = game.board_evaluator.material(player, board)
+        steps_left = game.calculate_steps_per_turn()
+
+        for from_pos, to_pos in game.enumerate_ai_actions(player, board, move_count, steps_left):
+            simulated, undo = game.apply_ai_move(player, from_pos, to_pos, board, move_count, steps_left)
+            assert simulated is not None
+            material_delta = game.board_evaluator.move_delta(player, board, undo)
+            assert material + material_delta == game.board_evaluator.material(player, board)
+
+            game.undo_ai_move(board, move_count, undo)
+            checked += 1
+    assert checked > 20
@@ -0,0 +1,47 @@
+import math
+import random
+
+from positions import midgame_positions
+
+
+def test_followup_bound_never_below_exact_score(make_game):
+    game = make_game(seed=5)
+    for player, board, move_count, steps_left in midgame_positions(game, 90, 10):
+        if steps_left <= 0:
+            continue
+        edge_ids = game.enumerate_ai_action_edges(player, board, move_count, steps_left)
+        batch, head = game._batch_score_head(player, board, steps_left, edge_ids)
+        bounds = game._batch_score_upper_bound(player, board, batch, head.copy())
+        exact = game._batch_score_tail(player, board, batch, head.copy())
+        assert (bounds >= exact).all()
+
+
+def test_followup_estimate_matches_full_scoring(make_game):
+    game = make_game(seed=6)
+    for index, (player, board, move_count, steps_left) in enumerate(midgame_positions(game, 90, 10)):
+        random.seed(index)
+        best, action = game.estimate_best_followup(player, board, move_count, steps_left)
+
+        # 与全部走法精确打分、抽取同样的噪声后取最大值一致
+        random.seed(index)
+        edge_ids = game.enumerate_ai_action_edges(player, board, move_count, steps_left)
+        noise = game.draw_score_noise(edge_ids.shape[0])
+        _, scores = game.score_ai_actions_batch(player, board, move_count, steps_left, edge_ids=edge_ids)
+        if steps_left <= 0 or edge_ids.shape[0] == 0:
+            assert (best, action) == (0.0, None)
+            continue
+        totals = scores + noise
+        assert best == totals.max()
+        actions = [game.edge_action(edge_id) for edge_id in edge_ids]
+        assert totals[actions.index(action)] == best
+
+
+def test_followup_floor_returns_bound_without_exact_scoring(make_game):
+    game = make_game(seed=6)
+    player, board, move_count, steps_left = midgame_positions(game, 31, 30)[-1]
+    random.seed(0)
+    best, _ = game.estimate_best_followup(player, board, move_count, steps_left)
+    random.seed(0)
+    bound, action = game.estimate_best_followup(player, board, move_count, steps_left, floor=math.inf)
+    assert action is None
+    assert bound >= best
@@ -0,0 +1,60 @@
+import numpy as np
+
+from four_kingdoms.config.constants import BOARD_SIZE
+from four_kingdoms.core.ai_logic import INFLUENCE_DECAY
+
+from positions import cheapest_sources, clear_units, midgame_positions, place
+
+
+def test_unit_influence_decays_along_move_graph(make_game):
+    game = make_game()
+    board = game.board.copy()
+    board.owner[:] = 0
+    board.hp[:] = 0
+    x, y = game.capitals[1]
+    board[x, y] = [1, 8, board.city[x, y], 0]
+    influence = game.get_unit_influence(board)
+    index = x * BOARD_SIZE + y
+
+    assert influence[1, index] == 8
+    assert not influence[2:].any()
+    # 一步可达的格子按消耗衰减，且都不超过源强度
+    for tx, ty, cost in game.move_targets[index]:
+        assert influence[1, tx * BOARD_SIZE + ty] >= 8 * INFLUENCE_DECAY ** cost
+    assert influence[1].max() == 8
+
+
+def test_clean_capture_has_no_exposure(make_game):
+    game = make_game()
+    board = clear_units(game, (1, 2))
+    target = (BOARD_SIZE // 2, BOARD_SIZE // 2)
+    source = cheapest_sources(game, target)[0]
+    place(board, target, 2, 8)
+    place(board, source, 1, 10)
+
+    terms = {}
+    edge_ids, scores = game.score_ai_actions_batch(1, board, game.move_count_grid, 6, terms=terms)
+    actions = [game.edge_action(edge_id) for edge_id in edge_ids]
+    capture = actions.index((source, target))
+    # 被吃掉的守军与进攻方留在起点的影响都不应计入
+    assert terms['exposure'][capture] == 0
+    score, _ = game.score_ai_move(1, source, target, board, game.move_count_grid, 6, add_noise=False)
+    assert score == scores[capture]
+
+
+def test_exposure_matches_influence_on_board_after_move(make_game):
+    game = make_game(seed=3)
+    captures = 0
+    for player, board, move_count, steps_left in midgame_positions(game, 200, 10):
+        influence = game.get_influence_map(player, board)
+        for from_pos, to_pos in game.enumerate_ai_actions(player, board, move_count, steps_left):
+            simulated, undo = game.apply_ai_move(player, from_pos, to_pos, board, move_count, steps_left)
+            if simulated['attacker_survived']:
+                src = from_pos[0] * BOARD_SIZE + from_pos[1]
+                dst = to_pos[0] * BOARD_SIZE + to_pos[1]
+                after = game.get_influence_map(player, board)
+                expected = max(0.0, after.enemy_influence[dst] - after.own_influence[dst])
+                assert np.isclose(influence.exposure_after(src, dst, simulated['survivor_hp']), expected)
+                captures += simulated['target_player'] not in (0, player)
+            game.undo_ai_move(board, move_count, undo)
+    assert captures > 10
@@ -0,0 +1,26 @@
+import numpy as np
+
+from positions import advance
+
+
+def test_make_unmake_restores_board_and_move_count(make_game):
+    game = make_game()
+    advance(game, 60)
+    checked = 0
+    for player in game.players:
+        board = game.board
+        move_count = game.move_count_grid
+        board_before = board.copy()
+        move_count_before = move_count.copy()
+        steps_left = game.calculate_steps_per_turn()
+
+        for from_pos, to_pos in game.enumerate_ai_actions(player, board, move_count, steps_left):
+            simulated, undo = game.apply_ai_move(player, from_pos, to_pos, board, move_count, steps_left)
+            assert simulated is not None
+            assert simulated['steps_left'] < steps_left
+
+            game.undo_ai_move(board, move_count, undo)
+            assert np.array_equal(np.asarray(board), np.asarray(board_before))
+            assert np.array_equal(move_count, move_count_before)
+            checked += 1
+    assert checked > 20
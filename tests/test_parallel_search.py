@@ -0,0 +1,51 @@
+import threading
+import time
+
+from four_kingdoms.config.constants import AI_DIFFICULTY_HARD
+
+
+def hard_game_with_worker(make_game):
+    game = make_game(AI_DIFFICULTY_HARD)
+    game.ai_parallel_workers = 1
+    player = game.current_player
+    position = game.snapshot_search_position()
+    actions = game.enumerate_ai_actions(player, position['board'], position['move_count'], position['steps_left'])
+    root_moves = [(float(-index), from_pos, to_pos) for index, (from_pos, to_pos) in enumerate(actions[:3])]
+    return game, player, position, root_moves
+
+
+def test_parallel_deepening_returns_at_move_deadline(make_game):
+    game, player, position, root_moves = hard_game_with_worker(make_game)
+    try:
+        # 工作进程尚未启动完，本步截止时间已到：不等待结果，沿用根节点排序
+        game.move_deadline = time.perf_counter() + 0.05
+        started = time.perf_counter()
+        action, value = game._parallel_deepen_root_moves(player, position, root_moves, 50)
+        assert time.perf_counter() - started < 0.5
+        assert (action, value) == ((root_moves[0][1], root_moves[0][2]), root_moves[0][0])
+    finally:
+        game.move_deadline = None
+        game.shutdown_parallel_search()
+
+
+def test_parallel_deepening_stops_when_cancelled(make_game):
+    game, player, position, root_moves = hard_game_with_worker(make_game)
+    game.search_cancel = threading.Event()
+    try:
+        threading.Timer(0.05, game.search_cancel.set).start()
+        started = time.perf_counter()
+        action, _ = game._parallel_deepen_root_moves(player, position, root_moves, 10000)
+        assert time.perf_counter() - started < 0.5
+        assert action == (root_moves[0][1], root_moves[0][2])
+    finally:
+        game.search_cancel = None
+        game.shutdown_parallel_search()
+
+
+def test_parallel_deepening_compares_completed_depths(make_game):
+    game, player, position, root_moves = hard_game_with_worker(make_game)
+    try:
+        action, _ = game._parallel_deepen_root_moves(player, position, root_moves, 200)
+        assert action in [(from_pos, to_pos) for _, from_pos, to_pos in root_moves]
+    finally:
+        game.shutdown_parallel_search()
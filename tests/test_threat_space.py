@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from four_kingdoms.config.constants import BOARD_SIZE
+from four_kingdoms.core.threat_space import ThreatSearchInconclusive, ThreatSpaceSearch
+
+from positions import cheapest_sources, clear_units, place, threatened_capital
+
+
+def play_line(game, player, line, steps_left):
+    for from_pos, to_pos in line:
+        simulated, _ = game.apply_ai_move(player, from_pos, to_pos, game.board, game.move_count_grid, steps_left)
+        assert simulated is not None
+        steps_left = simulated['steps_left']
+
+
+def test_threat_space_search_finds_capture_sequence(make_game):
+    game = make_game()
+    board = clear_units(game, (1, 2))
+    capital = game.capitals[2]
+    first, second = cheapest_sources(game, capital)[:2]
+    board[capital[0], capital[1], 1] = 4
+    place(board, first, 1, 3)
+    place(board, second, 1, 3)
+    before = np.asarray(board)
+
+    line = ThreatSpaceSearch(game).find_capture(1, board, game.move_count_grid, 6, [2])
+    assert np.array_equal(np.asarray(board), before)
+    # 单兵打不穿 4 点驻军，需要两兵接力
+    assert line is not None and len(line) == 2
+    play_line(game, 1, line, 6)
+    assert board.owner[capital] == 1
+
+
+def test_threat_space_search_rejects_insufficient_force(make_game):
+    game = make_game()
+    board = clear_units(game, (1, 2))
+    capital = game.capitals[2]
+    board[capital[0], capital[1], 1] = 9
+    place(board, cheapest_sources(game, capital)[0], 1, 3)
+    assert ThreatSpaceSearch(game).find_capture(1, board, game.move_count_grid, 6, [2]) is None
+
+
+def test_threat_space_defense_breaks_capture_line(make_game):
+    game = make_game()
+    board = threatened_capital(game, with_defender=True)
+    fresh_move_count = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+    search = ThreatSpaceSearch(game)
+    assert search.find_capture(2, board, fresh_move_count, 6, [1]) is not None
+
+    threatened, line = search.find_defense(1, board, game.move_count_grid, 6, [2], 6)
+    assert threatened and line
+    play_line(game, 1, line, 6)
+    assert search.find_capture(2, board, fresh_move_count, 6, [1]) is None
+
+
+def test_threat_space_node_limit_is_not_a_proven_negative(make_game):
+    game = make_game()
+    board = clear_units(game, (1, 2))
+    capital = game.capitals[2]
+    first, second = cheapest_sources(game, capital)[:2]
+    board[capital[0], capital[1], 1] = 4
+    place(board, first, 1, 3)
+    place(board, second, 1, 3)
+    # 两兵接力才能攻下，只允许展开 1 个节点时得不出结论，不能报告“没有攻陷序列”
+    with pytest.raises(ThreatSearchInconclusive):
+        ThreatSpaceSearch(game, node_limit=1).find_capture(1, board, game.move_count_grid, 6, [2])
+
+    # 同样不能报告“首都安全”
+    board = threatened_capital(game, with_defender=True)
+    with pytest.raises(ThreatSearchInconclusive):
+        ThreatSpaceSearch(game, node_limit=0).find_defense(1, board, game.move_count_grid, 6, [2], 6)
@@ -0,0 +1,38 @@
+from four_kingdoms.core.transposition import ZOBRIST_KEYS, TranspositionTable
+
+from positions import advance
+
+
+def test_zobrist_delta_matches_full_rehash(make_game):
+    game = make_game()
+    advance(game, 60)
+    checked = 0
+    for player in game.players:
+        board = game.board
+        move_count = game.move_count_grid
+        board_hash = ZOBRIST_KEYS.board_hash(board)
+        move_hash = ZOBRIST_KEYS.move_count_hash(move_count)
+        steps_left = game.calculate_steps_per_turn()
+
+        for from_pos, to_pos in game.enumerate_ai_actions(player, board, move_count, steps_left):
+            _, undo = game.apply_ai_move(player, from_pos, to_pos, board, move_count, steps_left)
+            board_delta, move_delta = ZOBRIST_KEYS.move_delta(board, move_count, undo)
+            assert board_hash ^ board_delta == ZOBRIST_KEYS.board_hash(board)
+            assert move_hash ^ move_delta == ZOBRIST_KEYS.move_count_hash(move_count)
+            game.undo_ai_move(board, move_count, undo)
+            assert ZOBRIST_KEYS.board_hash(board) == board_hash
+            checked += 1
+    assert checked > 20
+
+
+def test_transposition_table_prefers_deeper_entries_within_a_search():
+    table = TranspositionTable(1)
+    table.new_search()
+    table.store('a', 3, 10, 0, ())
+    table.store('b', 2, 20, 0, ())
+    assert table.probe('a')[2] == 10 and table.probe('b') is None
+
+    # 新一代搜索可以覆盖旧记录
+    table.new_search()
+    table.store('b', 1, 20, 0, ())
+    assert table.probe('a') is None and table.probe('b')[2] == 20
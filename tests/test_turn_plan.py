@@ -0,0 +1,49 @@
+from four_kingdoms.config.constants import AI_DIFFICULTY_HARD, AI_DIFFICULTY_NORMAL
+
+
+def record_searches(game):
+    """包装 choose_ai_action，记录每次搜索的 [所选走法, *搜索评估过的后续走法]"""
+    searches = []
+    choose = game.choose_ai_action
+
+    def recording_choose(player, position=None):
+        action, score = choose(player, position=position)
+        searches.append([action] + list(game.search_line))
+        return action, score
+
+    game.choose_ai_action = recording_choose
+    return searches
+
+
+def play_turns_checking_searched(game, turns):
+    """执行若干个完整回合，断言每一步要么是本步搜索选出的走法，要么是此前搜索评估过的后续走法"""
+    searches = record_searches(game)
+    executed = 0
+    for _ in range(turns):
+        player = game.current_player
+        pending = []
+        while game.current_player == player and game.steps_left > 0 and not game.game_over:
+            searched_before = len(searches)
+            assert game.perform_ai_action()
+            if len(searches) > searched_before:
+                pending = list(searches[-1])
+            assert pending, '执行了搜索之外的走法'
+            assert game.last_move == pending.pop(0)
+            executed += 1
+        if game.game_over:
+            break
+        game.next_player()
+    return executed
+
+
+def test_hard_turn_plays_only_searched_moves(make_game):
+    game = make_game(AI_DIFFICULTY_HARD)
+    game.opening_book_enabled = False
+    assert play_turns_checking_searched(game, turns=6) > 6
+
+
+def test_normal_followup_comes_from_search(make_game):
+    game = make_game(AI_DIFFICULTY_NORMAL)
+    game.opening_book_enabled = False
+    game.turn_knapsack_enabled = False
+    assert play_turns_checking_searched(game, turns=6) > 6
@@ -0,0 +1,56 @@
+import itertools
+import math
+import random
+
+from four_kingdoms.core.turn_planner import TURN_PLAN_COMBO_LIMIT, MoveChain, solve_turn_knapsack
+
+
+def brute_force_knapsack(unit_chains, capacity):
+    best = 0.0
+    for choice in itertools.product(*[[None] + chains for chains in unit_chains]):
+        picked = [chain for chain in choice if chain is not None]
+        cells = [cell for chain in picked for cell in chain.cells]
+        if len(cells) == len(set(cells)) and sum(chain.cost for chain in picked) <= capacity:
+            best = max(best, sum(chain.value for chain in picked))
+    return best
+
+
+def test_turn_knapsack_matches_brute_force():
+    rng = random.Random(7)
+    trials = 0
+    while trials < 200:
+        unit_chains = []
+        for unit in range(rng.randint(1, 5)):
+            chains = []
+            for _ in range(rng.randint(0, 3)):
+                # 起点格各不相同，其余格子取自一个小范围，制造链条之间的冲突
+                cells = frozenset([('unit', unit)] + [rng.randrange(6) for _ in range(rng.randint(0, 2))])
+                chains.append(MoveChain([], rng.randint(1, 3), float(rng.randint(1, 40)), cells))
+            unit_chains.append(chains)
+        # 组合数超过上限时规划会截断，不再保证最优
+        if math.prod(len(chains) + 1 for chains in unit_chains) > TURN_PLAN_COMBO_LIMIT:
+            continue
+        trials += 1
+        capacity = rng.randint(1, 6)
+
+        chosen = solve_turn_knapsack(unit_chains, capacity)
+        cells = [cell for chain in chosen for cell in chain.cells]
+        assert len(cells) == len(set(cells))
+        assert sum(chain.cost for chain in chosen) <= capacity
+        assert sum(chain.value for chain in chosen) == brute_force_knapsack(unit_chains, capacity)
+
+
+def test_turn_knapsack_truncation_keeps_top_ranked_units():
+    # 相邻士兵的链条共用格子，整组组合数远超上限；排名第一的士兵得分最高，截断后仍须选中它
+    unit_chains = []
+    for unit in range(6):
+        value = 100.0 if unit == 0 else 1.0
+        unit_chains.append([
+            MoveChain([], 1, value, frozenset([('unit', unit), ('lane', unit)])),
+            MoveChain([], 1, value / 2, frozenset([('unit', unit), ('lane', unit + 1)])),
+        ])
+    assert math.prod(len(chains) + 1 for chains in unit_chains) > TURN_PLAN_COMBO_LIMIT
+
+    chosen = solve_turn_knapsack(unit_chains, 3)
+    assert unit_chains[0][0] in chosen
+    assert sum(chain.value for chain in chosen) == brute_force_knapsack(unit_chains, 3)